@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Time extractPalette on a 640x640 RGBA cover and on the 100x100 thumbnail
+
+Runs the pure-Python histogram, and the NumPy one too when NumPy is installed.
+
+    python3 benchmarks/bench_palette.py [--repeat 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import dynamic_island  # noqa: E402
+from dynamic_island import extractPalette  # noqa: E402
+
+
+def syntheticCover(width, height):
+    """RGBA bytes: a dark grey gradient with a red block, like a cover with a red title"""
+    pixels = bytearray(width * height * 4)
+    for y in range(height):
+        for x in range(width):
+            offset = (y * width + x) * 4
+            if width // 3 < x < width // 2 and height // 3 < y < height // 2:
+                pixels[offset:offset + 4] = bytes((220, 40, 60, 255))
+            else:
+                shade = (x + y) * 80 // (width + height)
+                pixels[offset:offset + 4] = bytes((shade, shade, shade, 255))
+    return bytes(pixels)
+
+
+def timePalette(pixels, width, height, repeat):
+    extractPalette(pixels, width, height)  # Warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        palette = extractPalette(pixels, width, height)
+    return (time.perf_counter() - started) / repeat * 1000, palette
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    options = parser.parse_args()
+
+    numpy = dynamic_island.numpy
+    paths = [("pure Python", None)] + ([("NumPy", numpy)] if numpy is not None else [])
+    for width, height in ((640, 640), (100, 100)):
+        pixels = syntheticCover(width, height)
+        for name, module in paths:
+            dynamic_island.numpy = module
+            milliseconds, palette = timePalette(pixels, width, height, options.repeat)
+            print(f"{width}x{height} {name}: {milliseconds:.2f} ms per palette, accent {palette.accent}")
+    dynamic_island.numpy = numpy
+    if numpy is None:
+        print("NumPy is not installed - vectorized path not timed")
+
+
+if __name__ == '__main__':
+    main()
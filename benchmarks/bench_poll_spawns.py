@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Subprocesses spawned per minute of media polling, before and after the script host
+
+Before: every tick ran each query as its own `osascript -e` process (the
+system volume, then the player script, plus an artwork url call on the
+MediaPlayer path). After: one combined poll query per tick, sent to the warm
+ScriptHost. Both sides run a stand-in interpreter (tests/script_host_stand_in.py)
+instead of osascript, so this runs anywhere; the spawn counts are what matter.
+
+    python3 benchmarks/bench_poll_spawns.py [--ticks 60]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dynamic_island import SPOTIFY_POLL_SCRIPT, ScriptHost  # noqa: E402
+
+STAND_IN = os.path.join(ROOT, 'tests', 'script_host_stand_in.py')
+
+# What one tick of the old updateMediaInfo ran, one process each
+BEFORE_TICKS = {
+    'spotify fallback': [
+        'output volume of (get volume settings)',
+        'tell application "System Events" ... Spotify state, track, position, duration',
+    ],
+    'MediaPlayer + artwork': [
+        'output volume of (get volume settings)',
+        'tell application "System Events" ... Spotify state, track, position, duration',
+        'tell application "Spotify" to return artwork url of current track',
+    ],
+}
+
+
+def runBefore(scripts, ticks):
+    spawns = 0
+    started = time.perf_counter()
+    for _ in range(ticks):
+        for script in scripts:
+            subprocess.run([sys.executable, STAND_IN, '-e', script], capture_output=True, text=True)
+            spawns += 1
+    return spawns, time.perf_counter() - started
+
+
+def runAfter(ticks):
+    host = ScriptHost(command=[sys.executable, STAND_IN])
+    started = time.perf_counter()
+    try:
+        for _ in range(ticks):
+            host.run(SPOTIFY_POLL_SCRIPT)
+        return host.spawnCount, host.requestCount, time.perf_counter() - started
+    finally:
+        host.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=60, help="ticks per minute (the old poll ran every second)")
+    options = parser.parse_args()
+    ticks = options.ticks
+
+    print(f"{ticks} ticks = one minute of polling at the old 1 s tick")
+    for name, scripts in BEFORE_TICKS.items():
+        spawns, elapsed = runBefore(scripts, ticks)
+        print(f"before ({name}): {spawns} spawns/min, {elapsed / ticks * 1000:.1f} ms per tick")
+    spawns, requests, elapsed = runAfter(ticks)
+    print(f"after (script host): {spawns} spawn in total, at startup only, "
+          f"{requests} requests, {elapsed / ticks * 1000:.1f} ms per tick")
+
+
+if __name__ == '__main__':
+    main()
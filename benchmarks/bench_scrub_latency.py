@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Latency of one progress-slider scrub, before and after seeking from the cached duration
+
+Before: every scrub asked the player for the track duration, turned the
+slider percentage into seconds and then set the position - two script round
+trips. After: the slider already works in seconds, so a scrub is one 'seek'
+command. Both go through SpotifyBackend on a registry driven directly, with a
+host that answers each script after a fixed delay instead of osascript.
+
+    python3 benchmarks/bench_scrub_latency.py [--latency 0.03] [--scrubs 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dynamic_island import PlayerRegistry, SpotifyBackend  # noqa: E402
+
+DURATION = 240.0
+
+
+class LatencyHost:
+    """Stands in for ScriptHost: every script takes `latency` seconds"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = 0
+
+    def run(self, script, timeout=None):
+        time.sleep(self.latency)
+        self.requests += 1
+        if "duration of current track" in script:
+            return str(DURATION * 1000)
+        return ""
+
+
+def scrubBefore(registry, backend, percent):
+    duration = float(backend.tell("return duration of current track")) / 1000
+    registry.command('seek', percent / 100 * duration)
+
+
+def scrubAfter(registry, backend, seconds):
+    registry.command('seek', seconds)
+
+
+def timeScrubs(scrub, registry, backend, values):
+    started = time.perf_counter()
+    for value in values:
+        scrub(registry, backend, value)
+    return (time.perf_counter() - started) / len(values) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.03, help="seconds per script round trip")
+    parser.add_argument('--scrubs', type=int, default=20)
+    options = parser.parse_args()
+
+    host = LatencyHost(options.latency)
+    backend = SpotifyBackend(host=host)
+    registry = PlayerRegistry([backend])
+    registry.probe(lambda bundleId: True)
+    registry.activate(backend.name)
+
+    percents = [index * 100 / options.scrubs for index in range(options.scrubs)]
+    before = timeScrubs(scrubBefore, registry, backend, percents)
+    beforeRequests, host.requests = host.requests, 0
+    after = timeScrubs(scrubAfter, registry, backend, [p / 100 * DURATION for p in percents])
+
+    print(f"{options.scrubs} scrubs at {options.latency * 1000:g} ms per round trip")
+    print(f"before (duration query + seek): {before:.1f} ms per scrub, {beforeRequests} scripts")
+    print(f"after (one seek): {after:.1f} ms per scrub, {host.requests} scripts")
+
+
+if __name__ == '__main__':
+    main()
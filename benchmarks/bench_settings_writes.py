@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Cost of 1000 rapid settings edits: synchronous rewrites versus SettingsStore
+
+Before: saveSettings rewrote the whole plist with a plain open(..., 'wb') on
+every edit, on the caller's thread. After: SettingsStore.set() only updates
+memory and arms one debounced, atomic write. The debounce timer is captured
+and fired by hand once the edits are done, so the time measured is what the
+editing thread pays plus the single write.
+
+    python3 benchmarks/bench_settings_writes.py [--edits 1000]
+"""
+
+import argparse
+import os
+import plistlib
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dynamic_island import SettingsStore  # noqa: E402
+
+PRESETS = {
+    "Programming": ["/Applications/Xcode.app", "/Applications/Terminal.app"],
+    "Chilling": ["/Applications/Spotify.app"],
+    "Debugging": [],
+    "Focus Mode": []
+}
+
+
+def quickAppPaths(edit):
+    return [f"/Applications/App{edit % 7}.app", "", "/Applications/Safari.app", ""]
+
+
+def runBefore(path, edits):
+    started = time.perf_counter()
+    for edit in range(edits):
+        with open(path, 'wb') as f:
+            plistlib.dump({'quickAppPaths': quickAppPaths(edit), 'presetApps': PRESETS}, f)
+    return time.perf_counter() - started, edits
+
+
+def runAfter(path, edits):
+    timers = []
+    store = SettingsStore(path, schedule=lambda delay, function, *args: timers.append((function, args)),
+                          run=lambda function, *args: function(*args))
+    started = time.perf_counter()
+    for edit in range(edits):
+        store.set('quickAppPaths', quickAppPaths(edit))
+        store.set('presetApps', PRESETS)
+    for function, args in timers:
+        function(*args)  # The debounce timer firing
+    elapsed = time.perf_counter() - started
+    with open(path, 'rb') as f:
+        assert plistlib.load(f)['quickAppPaths'] == quickAppPaths(edits - 1)
+    return elapsed, store.stats()['writes']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--edits', type=int, default=1000)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        elapsed, writes = runBefore(os.path.join(directory, 'before.plist'), options.edits)
+        print(f"before (rewrite per edit): {elapsed * 1000:.2f} ms, {writes} writes")
+        elapsed, writes = runAfter(os.path.join(directory, 'after.plist'), options.edits)
+        print(f"after (SettingsStore): {elapsed * 1000:.2f} ms, {writes} write")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,2546 @@ Dynamic Island for macOS - Clean Version
 Optimized for performance with anti-spam protection
 """
 
+import collections
+import copy
+import hashlib
+import heapq
+import http.client
+import itertools
+import json
+import os
+import plistlib
+import select
+import subprocess
+import tempfile
+import threading
+import time
+import traceback
+import urllib.parse
+
+
+# ---------------------------------------------------------------------------
+# AppleScript host - one warm osascript process instead of a spawn per call
+# ---------------------------------------------------------------------------
+
+class ScriptHostError(Exception):
+    """Raised when the script host could not run a script"""
+
+
+class ScriptHostTimeout(ScriptHostError):
+    """Raised when the script host did not answer before the deadline"""
+
+
+class ScriptHostExited(ScriptHostError):
+    """Raised when the interpreter died, or could not be started or written to"""
+
+
+# JXA program run by the long-lived osascript process. It reads one JSON
+# request per line from stdin ({"id": n, "script": "..."}), runs the AppleScript
+# source through NSAppleScript (compiled once and kept per source string) and
+# writes one JSON reply per line to stdout ({"id": n, "ok": true, "result": "..."}).
+SCRIPT_HOST_SOURCE = r'''
+ObjC.import('Foundation');
+var stdin = $.NSFileHandle.fileHandleWithStandardInput;
+var stdout = $.NSFileHandle.fileHandleWithStandardOutput;
+var compiled = {};
+var buffer = '';
+
+function reply(message) {
+    var line = JSON.stringify(message) + '\n';
+    stdout.writeData($(line).dataUsingEncoding($.NSUTF8StringEncoding));
+}
+
+function runScript(source) {
+    var script = compiled[source];
+    if (!script) {
+        script = $.NSAppleScript.alloc.initWithSource($(source));
+        var compileError = Ref();
+        if (!script.compileAndReturnError(compileError)) {
+            throw new Error(ObjC.unwrap(compileError[0].objectForKey('NSAppleScriptErrorMessage')));
+        }
+        compiled[source] = script;
+    }
+    var error = Ref();
+    var result = script.executeAndReturnError(error);
+    if (result.isNil()) {
+        throw new Error(ObjC.unwrap(error[0].objectForKey('NSAppleScriptErrorMessage')));
+    }
+    var text = result.stringValue;
+    return text.isNil() ? '' : ObjC.unwrap(text);
+}
+
+while (true) {
+    var data = stdin.availableData;
+    if (data.length == 0) {
+        break;  // Parent closed the pipe
+    }
+    buffer += ObjC.unwrap($.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding));
+    var newline;
+    while ((newline = buffer.indexOf('\n')) >= 0) {
+        var line = buffer.slice(0, newline);
+        buffer = buffer.slice(newline + 1);
+        if (!line) {
+            continue;
+        }
+        var request = JSON.parse(line);
+        try {
+            reply({id: request.id, ok: true, result: runScript(request.script)});
+        } catch (e) {
+            reply({id: request.id, ok: false, error: String(e)});
+        }
+    }
+}
+'''
+
+
+class ScriptRequest:
+    """One script sent to the host and the caller waiting for its reply"""
+
+    def __init__(self, requestId, script):
+        self.requestId = requestId
+        self.line = json.dumps({'id': requestId, 'script': script}) + '\n'
+        self.done = threading.Event()
+        self.reply = None
+        self.process = None
+        self.startedAt = None  # When the interpreter got to it - scripts run one at a time
+
+
+class ScriptHost:
+    """Long-lived script interpreter that AppleScript snippets are sent to over a pipe
+
+    Requests and replies are framed as one JSON object per line and matched by id,
+    so several threads can share the host. The interpreter runs one script at a
+    time, so a deadline counts from when the script starts running, not from when
+    it was queued behind others. A script that overruns its deadline kills the
+    interpreter (it is most likely stuck on an Apple event); scripts queued behind
+    it are handed to a fresh one. Any executable that speaks the same line
+    protocol can be passed as `command`, which is how the host is exercised off macOS.
+    """
+
+    def __init__(self, command=None, timeout=2.0, now=time.monotonic):
+        self.command = command or ['osascript', '-l', 'JavaScript', '-e', SCRIPT_HOST_SOURCE]
+        self.timeout = timeout
+        self.now = now
+        self.lock = threading.Lock()  # Guards process, pending and counters
+        self.process = None
+        self.pending = {}  # request id -> ScriptRequest
+        self.requestIds = itertools.count(1)
+        self.spawnCount = 0
+        self.requestCount = 0
+        self.timeoutCount = 0
+        self.resentCount = 0
+
+    def ensureRunning(self):
+        """Start the interpreter if it is not running (call with lock held)"""
+        if self.process and self.process.poll() is None:
+            return self.process
+
+        process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            bufsize=1
+        )
+        self.process = process
+        self.spawnCount += 1
+        threading.Thread(target=self.readReplies, args=(process,), daemon=True).start()
+        print(f"[HOST] Started script host (pid {process.pid}, spawn #{self.spawnCount})", flush=True)
+        return process
+
+    def queuedOn(self, process):
+        """Requests waiting on process, in the order it runs them (call with lock held)"""
+        return sorted((request for request in self.pending.values() if request.process is process),
+                      key=lambda request: request.requestId)
+
+    def sendLocked(self, request):
+        """Write request to the interpreter, starting one if needed (call with lock held)"""
+        process = self.ensureRunning()
+        if not self.queuedOn(process):
+            request.startedAt = self.now()  # Nothing ahead of it
+        request.process = process
+        self.pending[request.requestId] = request
+        process.stdin.write(request.line)
+        process.stdin.flush()
+
+    def readReplies(self, process):
+        """Route reply lines from one interpreter process to the waiting callers"""
+        for line in process.stdout:
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                continue
+            with self.lock:
+                request = self.pending.pop(reply.get('id'), None)
+                queued = self.queuedOn(process)
+                if queued and queued[0].startedAt is None:
+                    queued[0].startedAt = self.now()  # The interpreter moves on to the next script
+            if request:
+                request.reply = reply
+                request.done.set()
+
+        # Interpreter exited - fail whatever was still waiting on it
+        with self.lock:
+            if self.process is process:
+                self.process = None
+            waiting = [self.pending.pop(request.requestId) for request in self.queuedOn(process)]
+        for request in waiting:
+            request.reply = {'ok': False, 'exited': True, 'error': 'script host exited'}
+            request.done.set()
+
+    def run(self, script, timeout=None):
+        """Run AppleScript source and return its result as a string"""
+        timeout = self.timeout if timeout is None else timeout
+
+        with self.lock:
+            request = ScriptRequest(next(self.requestIds), script)
+            self.requestCount += 1
+            try:
+                self.sendLocked(request)
+            except (OSError, ValueError) as e:
+                self.pending.pop(request.requestId, None)
+                self.killLocked()
+                raise ScriptHostExited(f"could not reach script host: {e}")
+
+        while True:
+            with self.lock:
+                startedAt = request.startedAt
+            wait = timeout if startedAt is None else startedAt + timeout - self.now()
+            if request.done.wait(max(0.0, wait)):
+                break
+            with self.lock:
+                if self.pending.get(request.requestId) is not request:
+                    break  # Answered or failed just now
+                if request.startedAt is None or self.now() - request.startedAt < timeout:
+                    continue  # Still queued behind other scripts - its deadline has not started
+                self.pending.pop(request.requestId)
+                self.timeoutCount += 1
+                # A hung Apple event blocks every later request, so start over
+                self.restartLocked(request.process)
+            raise ScriptHostTimeout(f"script host did not answer within {timeout}s")
+
+        request.done.wait()
+        reply = request.reply
+        if not reply.get('ok'):
+            error = reply.get('error', 'unknown error')
+            raise ScriptHostExited(error) if reply.get('exited') else ScriptHostError(error)
+        return reply.get('result', '')
+
+    def restartLocked(self, process):
+        """Kill a stuck interpreter and resend what was queued behind it (call with lock held)"""
+        queued = self.queuedOn(process)
+        if self.process is process:
+            self.killLocked()
+        for request in queued:
+            del self.pending[request.requestId]
+            request.startedAt = None
+        for request in queued:
+            try:
+                self.sendLocked(request)
+                self.resentCount += 1
+            except (OSError, ValueError) as e:
+                self.pending.pop(request.requestId, None)
+                request.reply = {'ok': False, 'exited': True, 'error': f"could not reach script host: {e}"}
+                request.done.set()
+
+    def killLocked(self):
+        """Terminate the interpreter (call with lock held)"""
+        if self.process:
+            try:
+                self.process.kill()
+            except OSError:
+                pass
+            self.process = None
+
+    def stop(self):
+        """Shut the interpreter down"""
+        with self.lock:
+            self.killLocked()
+
+
+# ---------------------------------------------------------------------------
+# Player poll queries - volume, player state and artwork in one reply per tick
+# ---------------------------------------------------------------------------
+
+POLL_FIELD_SEPARATOR = "\x1f"  # ASCII unit separator, never part of a track name
+
+# Player poll queries, compiled once by the script host and reused for every tick.
+# Each returns the system volume plus the player's state in one reply of
+# key=value fields joined by POLL_FIELD_SEPARATOR, see parsePollReply().
+SPOTIFY_POLL_SCRIPT = '''
+set fieldSeparator to character id 31
+set reply to "volume=" & (output volume of (get volume settings))
+if application id "com.spotify.client" is running then
+    tell application "Spotify"
+        set playerState to player state as string
+        if playerState is "playing" or playerState is "paused" then
+            return reply & fieldSeparator & "player=spotify" & fieldSeparator & "state=" & playerState ¬
+                & fieldSeparator & "track=" & (name of current track) ¬
+                & fieldSeparator & "artist=" & (artist of current track) ¬
+                & fieldSeparator & "position=" & player position ¬
+                & fieldSeparator & "duration=" & ((duration of current track) / 1000) ¬
+                & fieldSeparator & "artwork=" & (artwork url of current track) ¬
+                & fieldSeparator & "trackId=" & (id of current track)
+        end if
+    end tell
+end if
+return reply & fieldSeparator & "player=none"
+'''
+
+MUSIC_POLL_SCRIPT = '''
+set fieldSeparator to character id 31
+set reply to "volume=" & (output volume of (get volume settings))
+if application id "com.apple.Music" is running then
+    tell application "Music"
+        set playerState to player state as string
+        if playerState is "playing" or playerState is "paused" then
+            return reply & fieldSeparator & "player=music" & fieldSeparator & "state=" & playerState ¬
+                & fieldSeparator & "track=" & (name of current track) ¬
+                & fieldSeparator & "artist=" & (artist of current track) ¬
+                & fieldSeparator & "position=" & player position ¬
+                & fieldSeparator & "duration=" & (duration of current track) ¬
+                & fieldSeparator & "trackId=" & (persistent ID of current track)
+        end if
+    end tell
+end if
+return reply & fieldSeparator & "player=none"
+'''
+
+SYSTEM_VOLUME_SCRIPT = 'return "volume=" & (output volume of (get volume settings))'
+
+# Player state reported while a backend's circuit breaker is open
+PLAYER_UNRESPONSIVE = "unresponsive"
+
+# Values used for any field the reply is missing or that does not parse
+POLL_DEFAULTS = {
+    'volume': None,
+    'player': "none",
+    'state': "stopped",
+    'track': "",
+    'artist': "",
+    'position': 0.0,
+    'duration': 0.0,
+    'artwork': "",
+    'trackId': ""
+}
+
+
+def parsePollReply(text):
+    """Parse a player poll reply into a dict, falling back to POLL_DEFAULTS per field"""
+    info = dict(POLL_DEFAULTS)
+    for field in (text or "").strip().split(POLL_FIELD_SEPARATOR):
+        key, separator, value = field.partition("=")
+        key = key.strip()
+        if not separator or key not in POLL_DEFAULTS:
+            continue
+        value = value.strip()
+        try:
+            if key == 'volume':
+                info[key] = int(float(value.replace(",", ".")))
+            elif key in ('position', 'duration'):
+                # Reals can come back with the locale's decimal comma
+                info[key] = max(0.0, float(value.replace(",", ".")))
+            else:
+                info[key] = value
+        except ValueError:
+            pass
+
+    # "missing value" is what AppleScript prints for absent properties
+    for key in ('track', 'artist', 'artwork', 'trackId'):
+        if info[key] == "missing value":
+            info[key] = ""
+    return info
+
+
+# ---------------------------------------------------------------------------
+# Event-driven now playing - player distributed notifications
+# ---------------------------------------------------------------------------
+
+# Distributed notifications posted by the players on every state change,
+# mapped to the player name used in poll replies
+PLAYER_NOTIFICATIONS = {
+    "com.spotify.client.PlaybackStateChanged": "spotify",
+    "com.apple.Music.playerInfo": "music"
+}
+
+MEDIA_SAFETY_POLL_INTERVAL = 10.0  # Seconds between polls when notifications drive updates
+NOTIFICATIONS_FRESH_FOR = 600.0  # A notification this recent shows they are arriving (longer than most tracks)
+
+
+def parsePlayerNotification(name, userInfo):
+    """Turn a player notification payload into poll-style info (see POLL_DEFAULTS)
+
+    The position is None when the payload does not carry one (Music never does).
+    """
+    info = dict(POLL_DEFAULTS)
+    info['player'] = PLAYER_NOTIFICATIONS.get(name, "none")
+
+    state = str(userInfo.get("Player State", "")).lower()
+    info['state'] = state if state in ("playing", "paused") else "stopped"
+    if info['state'] == "stopped":
+        return info
+
+    info['track'] = str(userInfo.get("Name") or "")
+    info['artist'] = str(userInfo.get("Artist") or "")
+    info['trackId'] = str(userInfo.get("Track ID") or userInfo.get("Persistent ID") or "")
+
+    # Both players report the duration in milliseconds
+    try:
+        info['duration'] = max(0.0, float(userInfo.get("Duration") or userInfo.get("Total Time") or 0) / 1000)
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        info['position'] = max(0.0, float(userInfo["Playback Position"]))
+    except (KeyError, TypeError, ValueError):
+        info['position'] = None
+    return info
+
+
+class NowPlayingNotificationSource:
+    """Now-playing source that only updates when a player posts a notification
+
+    `emitter` is anything with addObserverForName_handler_(name, handler) and
+    removeObservers(); handlers are called as handler(name, userInfo). The app
+    wires it to NSDistributedNotificationCenter, a fake emitter drives it in tests.
+    """
+
+    def __init__(self, emitter, now=time.monotonic):
+        self.emitter = emitter
+        self.now = now
+        self.listener = None
+        self.info = None  # Last known poll-style info
+        self.eventCount = 0
+        self.lastEventTime = None
+
+    def start(self, listener):
+        """Subscribe to the player notifications and report changes to listener(info)"""
+        self.listener = listener
+        for name in PLAYER_NOTIFICATIONS:
+            self.emitter.addObserverForName_handler_(name, self.handleNotification)
+
+    def stop(self):
+        """Unsubscribe from the player notifications"""
+        self.emitter.removeObservers()
+        self.listener = None
+
+    def handleNotification(self, name, userInfo):
+        """Merge one notification into the current state and pass it on"""
+        info = parsePlayerNotification(name, userInfo or {})
+        previous = self.info
+
+        if info['position'] is None:
+            # Keep the last known position while the track stays the same
+            sameTrack = previous and previous['trackId'] == info['trackId'] and previous['track'] == info['track']
+            info['position'] = previous['position'] if sameTrack else 0.0
+
+        # Notifications carry neither volume nor artwork, keep what we know
+        if previous:
+            info['volume'] = previous['volume']
+            if previous['trackId'] == info['trackId']:
+                info['artwork'] = previous['artwork']
+
+        self.info = info
+        self.eventCount += 1
+        self.lastEventTime = self.now()
+        if self.listener:
+            self.listener(info)
+
+    def update(self, info):
+        """Record polled info so later notifications merge against fresh values"""
+        self.info = dict(info)
+
+    def isActive(self, freshFor=NOTIFICATIONS_FRESH_FOR):
+        """True if a notification arrived recently - subscribing alone proves nothing"""
+        return self.lastEventTime is not None and self.now() - self.lastEventTime <= freshFor
+
+
+# ---------------------------------------------------------------------------
+# Running applications - cached set kept current by workspace notifications
+# ---------------------------------------------------------------------------
+
+APP_LAUNCHED_NOTIFICATION = "NSWorkspaceDidLaunchApplicationNotification"
+APP_TERMINATED_NOTIFICATION = "NSWorkspaceDidTerminateApplicationNotification"
+
+
+class RunningAppTracker:
+    """Set of running app bundle ids, seeded once and then updated from launch/terminate notifications
+
+    `source` provides runningBundleIds() for the seed plus the emitter interface
+    (addObserverForName_handler_ / removeObservers) with handlers called as
+    handler(name, {'bundleId': ...}). The app wires it to NSWorkspace, tests
+    can use a fake source.
+    """
+
+    def __init__(self, source, listener=None):
+        self.source = source
+        self.listener = listener  # listener(bundleId, running) on every change
+        self.lock = threading.Lock()
+        self.running = set()
+        self.launches = 0
+        self.terminations = 0
+
+    def start(self):
+        """Subscribe first, then seed, so no launch between the two is missed"""
+        self.source.addObserverForName_handler_(APP_LAUNCHED_NOTIFICATION, self.handleNotification)
+        self.source.addObserverForName_handler_(APP_TERMINATED_NOTIFICATION, self.handleNotification)
+        seed = set(bundleId for bundleId in self.source.runningBundleIds() if bundleId)
+        with self.lock:
+            self.running |= seed
+
+    def stop(self):
+        self.source.removeObservers()
+
+    def handleNotification(self, name, userInfo):
+        bundleId = userInfo.get('bundleId')
+        if not bundleId:
+            return
+        running = name == APP_LAUNCHED_NOTIFICATION
+        with self.lock:
+            if running:
+                self.running.add(bundleId)
+                self.launches += 1
+            else:
+                self.running.discard(bundleId)
+                self.terminations += 1
+        if self.listener:
+            self.listener(bundleId, running)
+
+    def isRunning(self, bundleId):
+        with self.lock:
+            return bundleId in self.running
+
+
+# ---------------------------------------------------------------------------
+# Player backends - one interface per player, picked once by a registry
+# ---------------------------------------------------------------------------
+
+class PlayerBackend:
+    """Interface for a media player the island can show and control
+
+    snapshot() returns poll-style info (see POLL_DEFAULTS). Commands a backend
+    cannot perform are left out of `capabilities` and never sent to it.
+    """
+
+    name = "none"
+    bundleId = None
+    capabilities = frozenset()  # Any of: transport, seek, volume, artwork
+    queryTimeout = 1.5  # Deadline for a poll; a hung player fails it and feeds the circuit breaker
+    commandTimeout = 0.5  # Deadline for a command, counted from when the script host starts it
+
+    def __init__(self, host=None, tracker=None):
+        self.host = host
+        self.tracker = tracker  # RunningAppTracker consulted before any query
+
+    def probe(self, isInstalled):
+        """Return True if this player can be used on this machine"""
+        return self.bundleId is not None and isInstalled(self.bundleId)
+
+    def isRunning(self):
+        """Cached answer to whether the player is running (True if nothing tracks it)"""
+        if self.tracker is None or self.bundleId is None:
+            return True
+        return self.tracker.isRunning(self.bundleId)
+
+    def snapshot(self):
+        raise NotImplementedError
+
+    def systemSnapshot(self):
+        """Poll-style info with only the system volume filled in"""
+        return parsePollReply(self.host.run(SYSTEM_VOLUME_SCRIPT, timeout=self.queryTimeout))
+
+    def playPause(self):
+        raise NotImplementedError
+
+    def nextTrack(self):
+        raise NotImplementedError
+
+    def previousTrack(self):
+        raise NotImplementedError
+
+    def seek(self, seconds):
+        raise NotImplementedError
+
+    def setVolume(self, volume):
+        """Set the system output volume (0-100) - shared by every player"""
+        self.host.run(f'set volume output volume {int(volume)}', timeout=self.commandTimeout)
+
+    def artwork(self):
+        """Current artwork - a URL string, or an image for backends that hand one over"""
+        return ""
+
+
+class AppleScriptPlayerBackend(PlayerBackend):
+    """Player driven through its AppleScript dictionary on the script host"""
+
+    appName = ""
+    pollScript = ""
+    capabilities = frozenset({'transport', 'seek', 'volume'})
+
+    def tell(self, command, timeout=None):
+        return self.host.run(f'tell application "{self.appName}" to {command}',
+                             timeout=timeout or self.commandTimeout)
+
+    def snapshot(self):
+        if not self.isRunning():
+            # Not running - don't pay for a player query
+            return self.systemSnapshot()
+        return parsePollReply(self.host.run(self.pollScript, timeout=self.queryTimeout))
+
+    def playPause(self):
+        self.tell("playpause")
+
+    def nextTrack(self):
+        self.tell("next track")
+
+    def previousTrack(self):
+        self.tell("previous track")
+
+    def seek(self, seconds):
+        self.tell(f"set player position to {max(0.0, seconds):.2f}")
+
+
+class SpotifyBackend(AppleScriptPlayerBackend):
+    name = "spotify"
+    bundleId = "com.spotify.client"
+    appName = "Spotify"
+    pollScript = SPOTIFY_POLL_SCRIPT
+    capabilities = frozenset({'transport', 'seek', 'volume', 'artwork'})
+
+    def artwork(self):
+        url = self.tell("return artwork url of current track").strip()
+        return url if url.startswith("http") else ""
+
+
+class MusicBackend(AppleScriptPlayerBackend):
+    name = "music"
+    bundleId = "com.apple.Music"
+    appName = "Music"
+    pollScript = MUSIC_POLL_SCRIPT
+
+
+# ---------------------------------------------------------------------------
+# Circuit breaker - stop asking a player that keeps timing out
+# ---------------------------------------------------------------------------
+
+class PlayerUnresponsive(ScriptHostError):
+    """Raised instead of calling a backend whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker guarding calls into one backend
+
+    After `failureThreshold` failures in a row the breaker opens and calls are
+    refused without touching the player. Once the backoff delay has passed a
+    single trial call is let through (half-open): success closes the breaker,
+    failure opens it again with the delay doubled up to `maxDelay`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failureThreshold=2, baseDelay=2.0, maxDelay=60.0, now=time.monotonic):
+        self.failureThreshold = failureThreshold
+        self.baseDelay = baseDelay
+        self.maxDelay = maxDelay
+        self.now = now
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.delay = baseDelay
+        self.openUntil = 0.0
+        self.trialInFlight = False
+        self.trips = 0
+        self.refused = 0
+
+    def allow(self):
+        """True if a call may go ahead now"""
+        with self.lock:
+            if self.state == self.OPEN and self.now() >= self.openUntil:
+                self.state = self.HALF_OPEN
+                self.trialInFlight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self.trialInFlight:
+                self.trialInFlight = True
+                return True
+            self.refused += 1
+            return False
+
+    def recordSuccess(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.delay = self.baseDelay
+            self.trialInFlight = False
+
+    def releaseTrial(self):
+        """The trial call ended without telling whether the player answers - let another through"""
+        with self.lock:
+            self.trialInFlight = False
+
+    def recordFailure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failureThreshold:
+                self.state = self.OPEN
+                self.openUntil = self.now() + self.delay
+                self.delay = min(self.delay * 2, self.maxDelay)
+                self.trialInFlight = False
+                self.trips += 1
+
+    def isTripped(self):
+        """True while the breaker is open or only letting a trial through"""
+        with self.lock:
+            return self.state != self.CLOSED
+
+    def stats(self):
+        with self.lock:
+            return {'state': self.state, 'failures': self.failures, 'trips': self.trips,
+                    'refused': self.refused, 'retryIn': max(0.0, self.openUntil - self.now())}
+
+
+class PlayerRegistry:
+    """Probes the player backends once and then queries only the active one
+
+    While nothing is playing each tick asks the next available backend in turn,
+    so a tick never costs more than one query. activate() switches straight to
+    a player, e.g. when its notification arrives. Every call goes through the
+    backend's circuit breaker; while it is open, snapshot() reports the player
+    as unresponsive instead of waiting on it.
+    """
+
+    COMMAND_CAPABILITIES = {
+        'playPause': 'transport',
+        'nextTrack': 'transport',
+        'previousTrack': 'transport',
+        'seek': 'seek',
+        'setVolume': 'volume'
+    }
+
+    def __init__(self, backends, breakerFactory=CircuitBreaker):
+        self.backends = list(backends)
+        self.breakers = {backend.name: breakerFactory() for backend in self.backends}
+        self.available = []
+        self.active = None
+        self.nextCandidate = 0
+
+    def call(self, backend, method, *args):
+        """Call a backend method through its circuit breaker"""
+        breaker = self.breakers[backend.name]
+        if not breaker.allow():
+            raise PlayerUnresponsive(f"{backend.name} is not responding")
+        try:
+            result = getattr(backend, method)(*args)
+        except (ScriptHostTimeout, ScriptHostExited):
+            # Only a player that does not answer counts against it
+            breaker.recordFailure()
+            if breaker.isTripped():
+                print(f"[PLAYER] {backend.name} unresponsive, breaker {breaker.stats()}")
+            raise
+        except ScriptHostError:
+            breaker.recordSuccess()  # An error reply still came back promptly
+            raise
+        except Exception:
+            breaker.releaseTrial()
+            raise
+        breaker.recordSuccess()
+        return result
+
+    def unresponsiveSnapshot(self, backend):
+        """Poll-style info saying backend is not answering"""
+        info = dict(POLL_DEFAULTS)
+        info.update(player=backend.name, state=PLAYER_UNRESPONSIVE)
+        return info
+
+    def probe(self, isInstalled):
+        """Find out once which backends can be used"""
+        self.available = []
+        for backend in self.backends:
+            try:
+                usable = backend.probe(isInstalled)
+            except Exception as e:
+                print(f"[PLAYER] Probing {backend.name} failed: {e}")
+                usable = False
+            if usable:
+                self.available.append(backend)
+                print(f"[PLAYER] {backend.name} available: {', '.join(sorted(backend.capabilities)) or 'read only'}")
+        return self.available
+
+    def backendNamed(self, name):
+        for backend in self.available:
+            if backend.name == name:
+                return backend
+        return None
+
+    def activate(self, name):
+        """Make the named backend the one that is polled and commanded"""
+        backend = self.backendNamed(name)
+        if backend:
+            self.active = backend
+
+    def notified(self, info):
+        """Follow a player notification; True if it is about what the island should show
+
+        A player that starts playing takes over. Anything else only counts from
+        the active player - Music posting "Stopped" as it quits must not blank
+        the island while Spotify plays.
+        """
+        active = self.active
+        if info['state'] != "playing" and (active is None or active.name != info['player']):
+            return False
+        self.activate(info['player'])
+        return True
+
+    def snapshot(self):
+        """Query the active backend (or the next candidate while nothing plays)"""
+        if not self.available:
+            return dict(POLL_DEFAULTS)
+
+        # Only running players are worth asking
+        candidates = [backend for backend in self.available if backend.isRunning()] or self.available
+        backend = self.active
+        if backend not in candidates:
+            backend = candidates[self.nextCandidate % len(candidates)]
+        try:
+            info = self.call(backend, 'snapshot')
+        except ScriptHostError:
+            if not self.breakers[backend.name].isTripped():
+                raise
+            # Stay on this player so it shows up again as soon as it answers
+            self.active = backend
+            return self.unresponsiveSnapshot(backend)
+
+        if info['player'] == "none" or not info['track']:
+            # Nothing playing there - try the next backend on the next tick
+            self.active = None
+            self.nextCandidate = (candidates.index(backend) + 1) % len(candidates)
+        else:
+            self.active = backend
+        return info
+
+    def commandTarget(self, name):
+        """The backend a command would be sent to right now, or None"""
+        backend = self.active
+        if backend is None and name == 'setVolume':
+            # Volume is system wide, any backend can set it
+            backend = next((b for b in self.available if 'volume' in b.capabilities), None)
+        if backend is None or self.COMMAND_CAPABILITIES[name] not in backend.capabilities:
+            return None
+        return backend
+
+    def command(self, name, *args, target=None):
+        """Send a command to target, or to the active backend if it supports it"""
+        backend = target or self.commandTarget(name)
+        if backend is None:
+            print(f"[PLAYER] No active player for {name}")
+            return False
+        self.call(backend, name, *args)
+        return True
+
+
+# ---------------------------------------------------------------------------
+# Player command queue - one ordered queue and one worker per player
+# ---------------------------------------------------------------------------
+
+PlayerCommand = collections.namedtuple('PlayerCommand', 'target name args issuedAt deadline')
+
+
+class PlayerCommandQueue:
+    """Runs player commands in the order they were issued, one at a time per player
+
+    Redundant commands still waiting are merged on submit: two play/pause
+    toggles with no track change between them cancel out (a volume change or
+    seek in between is kept), a volume change replaces any queued one, and a
+    seek replaces a seek right before it. A command that waited longer than its
+    timeout is dropped instead of surprising the user late (and reported to
+    onFailure like a failed one); the script host bounds how long a running
+    command can take.
+    """
+
+    TIMEOUTS = {
+        'playPause': 2.0,
+        'nextTrack': 2.0,
+        'previousTrack': 2.0,
+        'seek': 1.0,
+        'setVolume': 1.0
+    }
+    DEFAULT_TIMEOUT = 2.0
+
+    def __init__(self, execute, now=time.monotonic, onFailure=None, log=print):
+        self.execute = execute  # execute(target, name, args) - raises on failure
+        self.now = now
+        self.onFailure = onFailure  # onFailure(command, error), on the worker thread
+        self.log = log
+        self.condition = threading.Condition()
+        self.queues = {}  # target -> deque of PlayerCommand
+        self.workers = {}  # target -> Thread
+        self.issued = 0
+        self.executed = 0
+        self.merged = 0
+        self.expired = 0
+        self.failed = 0
+
+    def submit(self, target, name, *args):
+        """Queue name(*args) for target behind everything already queued for it"""
+        now = self.now()
+        command = PlayerCommand(target, name, args, now, now + self.TIMEOUTS.get(name, self.DEFAULT_TIMEOUT))
+        with self.condition:
+            self.issued += 1
+            queue = self.queues.setdefault(target, collections.deque())
+            if not self.mergeLocked(queue, command):
+                queue.append(command)
+            if target not in self.workers:
+                worker = threading.Thread(target=self.work, args=(target,),
+                                          name=f"commands-{getattr(target, 'name', target)}", daemon=True)
+                self.workers[target] = worker
+                worker.start()
+            self.condition.notify_all()
+
+    def mergeLocked(self, queue, command):
+        """Fold command into the queued ones; True if nothing needs to be appended"""
+        last = queue[-1] if queue else None
+        if command.name == 'playPause':
+            # Toggle, toggle - nothing to do, unless a track change sits between them
+            for queued in reversed(queue):
+                if queued.name == 'playPause':
+                    queue.remove(queued)
+                    self.merged += 2
+                    return True
+                if PlayerRegistry.COMMAND_CAPABILITIES.get(queued.name) == 'transport':
+                    break
+            return False
+        if command.name == 'seek' and last is not None and last.name == 'seek':
+            queue.pop()
+            self.merged += 1
+        elif command.name == 'setVolume':
+            # System volume does not depend on the track, so any queued change is stale
+            for queued in [queued for queued in queue if queued.name == 'setVolume']:
+                queue.remove(queued)
+                self.merged += 1
+        return False
+
+    def work(self, target):
+        queue = self.queues[target]
+        while True:
+            with self.condition:
+                while not queue:
+                    self.condition.wait()
+                command = queue.popleft()
+                expired = self.now() > command.deadline
+                if expired:
+                    self.expired += 1
+            if expired:
+                self.log(f"[PLAYER] Dropped {command.name}, waited longer than its timeout")
+                if self.onFailure:
+                    self.onFailure(command, TimeoutError(f"{command.name} waited longer than its timeout"))
+                continue
+            try:
+                self.execute(command.target, command.name, command.args)
+                with self.condition:
+                    self.executed += 1
+            except Exception as e:
+                with self.condition:
+                    self.failed += 1
+                self.log(f"[PLAYER] {command.name} failed: {e}")
+                if self.onFailure:
+                    self.onFailure(command, e)
+
+    def pendingCount(self):
+        with self.condition:
+            return sum(len(queue) for queue in self.queues.values())
+
+    def stats(self):
+        """Issued versus executed command counters"""
+        with self.condition:
+            return {
+                'issued': self.issued,
+                'executed': self.executed,
+                'merged': self.merged,
+                'expired': self.expired,
+                'failed': self.failed,
+                'pending': sum(len(queue) for queue in self.queues.values())
+            }
+
+
+# ---------------------------------------------------------------------------
+# Adaptive polling - intervals chosen from playback state and island visibility
+# ---------------------------------------------------------------------------
+
+class AdaptivePollScheduler:
+    """Chooses how long each polled source waits before its next tick
+
+    Media polls run fast only while the island is expanded and something is
+    playing, slow down while collapsed or paused, and back off exponentially
+    while no player is running. Decisions are logged whenever they change.
+    """
+
+    EXPANDED_PLAYING_INTERVAL = 2.0  # PlaybackClock fills in the position between polls
+    IDLE_INTERVAL = 5.0
+    NOT_RUNNING_BASE_INTERVAL = 2.0
+    NOT_RUNNING_MAX_INTERVAL = 60.0
+
+    def __init__(self, log=print):
+        self.log = log
+        self.expanded = False
+        self.notRunningPolls = 0  # Consecutive polls that found no player
+        self.decisions = {}  # source -> (interval, reason) last logged
+
+    def setExpanded(self, expanded):
+        """Record whether the island is currently expanded"""
+        if expanded != self.expanded:
+            self.expanded = expanded
+            self.log(f"[SCHED] island {'expanded' if expanded else 'collapsed'}")
+
+    def decide(self, source, interval, reason):
+        """Log a decision if it differs from the last one for this source"""
+        if self.decisions.get(source) != (interval, reason):
+            self.decisions[source] = (interval, reason)
+            shown = "suspended" if interval is None else f"{interval:g}s"
+            self.log(f"[SCHED] {source}: {shown} ({reason})")
+        return interval
+
+    def mediaInterval(self, info, notificationsActive=False):
+        """Seconds until the next media poll given the latest poll-style info"""
+        if info is None or info['player'] == "none":
+            # No player running - back off until one shows up
+            interval = min(self.NOT_RUNNING_MAX_INTERVAL,
+                           self.NOT_RUNNING_BASE_INTERVAL * (2 ** self.notRunningPolls))
+            if interval < self.NOT_RUNNING_MAX_INTERVAL:
+                self.notRunningPolls += 1  # Stop at the cap so the power never overflows
+            return self.decide("media", interval, "player not running")
+
+        self.notRunningPolls = 0
+        playing = info['state'] == "playing"
+        if self.expanded and playing:
+            return self.decide("media", self.EXPANDED_PLAYING_INTERVAL, "expanded, playing")
+
+        interval = self.IDLE_INTERVAL
+        if notificationsActive:
+            # Player notifications report changes, polling is only a safety net
+            interval = max(interval, MEDIA_SAFETY_POLL_INTERVAL)
+        reason = "paused" if not playing else "collapsed"
+        return self.decide("media", interval, reason)
+
+    def clockInterval(self, now):
+        """Seconds until the date/time labels next need redrawing, None while hidden"""
+        if not self.expanded:
+            return self.decide("clock", None, "collapsed")
+        # Wake just after the minute flips instead of drifting on a fixed 60 s timer
+        interval = 60.0 - now.second - now.microsecond / 1e6 + 0.05
+        self.decide("clock", 60.0, "next minute")
+        return interval
+
+
+# ---------------------------------------------------------------------------
+# Runtime - one background thread with a timer heap for every delayed job
+# ---------------------------------------------------------------------------
+
+class RuntimeJob:
+    """Handle for a job scheduled on a Runtime"""
+
+    def __init__(self, when, sequence, function, args):
+        self.when = when
+        self.sequence = sequence
+        self.function = function
+        self.args = args
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.when, self.sequence) < (other.when, other.sequence)
+
+    def cancel(self):
+        """Drop the job if it has not run yet"""
+        self.cancelled = True
+
+
+class Runtime:
+    """Single scheduler thread that owns every periodic and delayed job
+
+    Jobs run one at a time on the runtime thread in due order. Periodic work
+    re-arms itself with callLater() at the end of each run, so steady state
+    creates no threads. Jobs must not block - a poll, an `open` launch or a
+    disk write goes to backgroundWork - or every other timer waits behind them.
+    runPending() runs whatever is due without the thread, which lets tests
+    drive the runtime with a fake clock.
+    """
+
+    def __init__(self, now=time.monotonic):
+        self.now = now
+        self.condition = threading.Condition()
+        self.heap = []
+        self.sequence = itertools.count()
+        self.thread = None
+        self.stopped = False
+        self.jobsRun = 0
+
+    def callLater(self, delay, function, *args):
+        """Run function(*args) on the runtime thread after delay seconds"""
+        with self.condition:
+            job = RuntimeJob(self.now() + max(0.0, delay), next(self.sequence), function, args)
+            heapq.heappush(self.heap, job)
+            self.condition.notify()
+        return job
+
+    def callSoon(self, function, *args):
+        """Run function(*args) on the runtime thread as soon as possible"""
+        return self.callLater(0.0, function, *args)
+
+    def start(self):
+        """Start the runtime thread (only once)"""
+        with self.condition:
+            if self.thread is None:
+                self.stopped = False
+                self.thread = threading.Thread(target=self.loop, name="DynamicIslandRuntime", daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        """Stop the runtime thread after the job it is running"""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+
+    def popDue(self):
+        """Pop the next due job, or return the seconds to wait for one (call with lock held)"""
+        while self.heap and self.heap[0].cancelled:
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return None, None
+        delay = self.heap[0].when - self.now()
+        if delay > 0:
+            return None, delay
+        return heapq.heappop(self.heap), 0.0
+
+    def runJob(self, job):
+        try:
+            job.function(*job.args)
+        except Exception as e:
+            print(f"[RUNTIME] Job {getattr(job.function, '__name__', job.function)} failed: {e}")
+            traceback.print_exc()
+        self.jobsRun += 1
+
+    def runPending(self):
+        """Run every job that is due now and return how many ran"""
+        count = 0
+        while True:
+            with self.condition:
+                job, _ = self.popDue()
+            if job is None:
+                return count
+            self.runJob(job)
+            count += 1
+
+    def loop(self):
+        while True:
+            with self.condition:
+                job, delay = self.popDue()
+                while job is None and not self.stopped:
+                    self.condition.wait(delay)
+                    job, delay = self.popDue()
+                if self.stopped:
+                    self.thread = None
+                    return
+            self.runJob(job)
+
+
+class WorkerPool:
+    """Fixed set of threads for the blocking jobs runtime timers hand off
+
+    Jobs run in submit order on whichever worker is free. The threads are
+    started on the first submit and live as long as the app, so handing work
+    off creates no threads in steady state.
+    """
+
+    def __init__(self, workers=2, name="worker"):
+        self.size = workers
+        self.name = name
+        self.condition = threading.Condition()
+        self.jobs = collections.deque()  # (function, args)
+        self.threads = []
+        self.submitted = 0
+        self.completed = 0
+
+    def submit(self, function, *args):
+        """Run function(*args) on a worker thread"""
+        with self.condition:
+            self.jobs.append((function, args))
+            self.submitted += 1
+            while len(self.threads) < self.size:
+                thread = threading.Thread(target=self.work, name=f"{self.name}-{len(self.threads)}", daemon=True)
+                self.threads.append(thread)
+                thread.start()
+            self.condition.notify()
+
+    def work(self):
+        while True:
+            with self.condition:
+                while not self.jobs:
+                    self.condition.wait()
+                function, args = self.jobs.popleft()
+            try:
+                function(*args)
+            except Exception as e:
+                print(f"[WORKER] Job {getattr(function, '__name__', function)} failed: {e}")
+                traceback.print_exc()
+            with self.condition:
+                self.completed += 1
+
+    def stats(self):
+        with self.condition:
+            return {'threads': len(self.threads), 'submitted': self.submitted,
+                    'completed': self.completed, 'queued': len(self.jobs)}
+
+
+# Shared runtime for the whole app, started when the app finishes launching,
+# and the workers its timers hand blocking jobs to
+runtime = Runtime()
+backgroundWork = WorkerPool(workers=2, name="background")
+
+
+# ---------------------------------------------------------------------------
+# Playback clock - smooth position between sparse polls
+# ---------------------------------------------------------------------------
+
+class PlaybackClock:
+    """Extrapolates the playback position from the last sample for every display frame
+
+    A new sample only moves the anchor when it disagrees with the extrapolated
+    position by more than `threshold` seconds (treated as a seek), when the rate
+    changes (play/pause) or when the track changes. Small disagreements are
+    ignored so the bar never jitters backwards between polls.
+    """
+
+    SEEK_THRESHOLD = 1.5
+
+    def __init__(self, now=time.monotonic, threshold=SEEK_THRESHOLD):
+        self.now = now
+        self.threshold = threshold
+        self.anchorPosition = 0.0
+        self.anchorTime = None
+        self.rate = 0.0
+        self.duration = 0.0
+        self.trackId = None
+        self.corrections = 0  # Samples treated as seeks
+
+    def sample(self, position, rate=1.0, duration=None, trackId=None):
+        """Feed a polled position, return True if the anchor was moved"""
+        if duration is not None:
+            self.duration = duration
+
+        if self.anchorTime is not None and trackId == self.trackId and rate == self.rate:
+            if abs(position - self.position()) <= self.threshold:
+                return False
+            self.corrections += 1  # Too far off to be drift - treat it as a seek
+
+        self.anchorPosition = position
+        self.anchorTime = self.now()
+        self.rate = rate
+        self.trackId = trackId
+        return True
+
+    def position(self):
+        """Extrapolated position in seconds, clamped to the track duration"""
+        if self.anchorTime is None:
+            return 0.0
+        position = self.anchorPosition + (self.now() - self.anchorTime) * self.rate
+        if self.duration > 0:
+            position = min(position, self.duration)
+        return max(0.0, position)
+
+    def fraction(self):
+        """Extrapolated position as a fraction of the duration (0 when unknown)"""
+        if self.duration <= 0:
+            return 0.0
+        return self.position() / self.duration
+
+    def isRunning(self):
+        return self.anchorTime is not None and self.rate > 0
+
+
+PROGRESS_FRAME_INTERVAL = 1 / 30  # Progress slider redraws while expanded and playing
+
+
+# ---------------------------------------------------------------------------
+# Now playing snapshots - immutable state diffed before touching any view
+# ---------------------------------------------------------------------------
+
+class NowPlayingState(collections.namedtuple('NowPlayingState', [
+        'trackId', 'title', 'artist', 'state', 'position', 'duration', 'volume', 'artworkKey'])):
+    """Immutable snapshot of what is playing, produced by every poll or notification"""
+
+    __slots__ = ()
+
+    @classmethod
+    def fromPollInfo(cls, info):
+        """Build a snapshot from poll-style info (see POLL_DEFAULTS)"""
+        if not info['track']:
+            state = PLAYER_UNRESPONSIVE if info['state'] == PLAYER_UNRESPONSIVE else IDLE_NOW_PLAYING.state
+            return IDLE_NOW_PLAYING._replace(volume=info['volume'], state=state)
+        return cls(
+            trackId=info['trackId'] or info['track'],
+            title=info['track'],
+            artist=info['artist'],
+            state=info['state'],
+            position=info['position'],
+            duration=info['duration'],
+            volume=info['volume'],
+            artworkKey=info['artwork']
+        )
+
+    @property
+    def isPlaying(self):
+        return self.state == "playing"
+
+
+IDLE_NOW_PLAYING = NowPlayingState(
+    trackId="", title="", artist="", state="stopped", position=0.0, duration=0.0, volume=None, artworkKey="")
+
+# Artwork keys with this prefix name an image MediaPlayer handed over instead of a URL
+NOW_PLAYING_ARTWORK_PREFIX = "nowplaying:"
+
+# Pool key for restoring the previous launch's artwork, which is not known until the disk cache is read
+LAST_ARTWORK_KEY = "last-artwork"
+
+
+def diffNowPlaying(old, new):
+    """Return {field: value} for every field of new that differs from old (all of them if old is None)"""
+    if old is None:
+        return new._asdict()
+    return {field: value for field, value in zip(new._fields, new) if getattr(old, field) != value}
+
+
+# ---------------------------------------------------------------------------
+# Optimistic transport - commands shown at once, reconciled with polls
+# ---------------------------------------------------------------------------
+
+TransportExpectation = collections.namedtuple('TransportExpectation', 'command check overlay deadline')
+
+
+class OptimisticTransport:
+    """What the views show while player commands are on their way
+
+    Every command immediately yields a predicted NowPlayingState and an
+    expectation about what the player will report. Polled snapshots confirm an
+    expectation once they match it; until then, for up to `grace` seconds, the
+    prediction is laid over the (possibly older) polled values. After the grace
+    window the poll wins, and a failed command rolls back to the polled truth.
+    Main thread only.
+    """
+
+    GRACE = 3.0
+    SEEK_TOLERANCE = 2.0  # Seconds between the requested and the reported position
+
+    def __init__(self, now=time.monotonic, grace=GRACE):
+        self.now = now
+        self.grace = grace
+        self.truth = None  # Last polled NowPlayingState
+        self.shown = IDLE_NOW_PLAYING  # Last state handed to the views
+        self.expectations = {}  # field -> TransportExpectation
+        self.predicted = 0
+        self.confirmed = 0
+        self.overruled = 0
+        self.rolledBack = 0
+
+    def expect(self, field, command, check, overlay):
+        self.expectations[field] = TransportExpectation(command, check, overlay, self.now() + self.grace)
+
+    def predict(self, command, *args):
+        """Apply a command locally and return the state to show right away"""
+        shown = self.shown
+        started = self.now()
+        if command == 'playPause':
+            state = "paused" if shown.isPlaying else "playing"
+            self.expect('state', command, lambda polled: polled.state == state, lambda: {'state': state})
+            predicted = shown._replace(state=state)
+        elif command in ('nextTrack', 'previousTrack'):
+            trackId = shown.trackId
+            self.expect('trackId', command, lambda polled: polled.trackId != trackId, lambda: {'position': 0.0})
+            predicted = shown._replace(position=0.0)
+        elif command == 'seek':
+            position, playing = args[0], shown.isPlaying
+            def expectedPosition():
+                return position + (self.now() - started if playing else 0.0)
+            self.expect('position', command,
+                        lambda polled: abs(polled.position - expectedPosition()) <= self.SEEK_TOLERANCE,
+                        lambda: {'position': expectedPosition()})
+            predicted = shown._replace(position=position)
+        elif command == 'setVolume':
+            volume = args[0]
+            self.expect('volume', command,
+                        lambda polled: polled.volume is not None and abs(polled.volume - volume) <= 1,
+                        lambda: {'volume': volume})
+            predicted = shown._replace(volume=volume)
+        else:
+            return None
+        self.predicted += 1
+        self.shown = predicted
+        return predicted
+
+    def reconcile(self, polled):
+        """Fold a polled snapshot with the pending expectations into the state to show"""
+        self.truth = polled
+        now = self.now()
+        state = polled
+        for field, expectation in list(self.expectations.items()):
+            if expectation.check(polled):
+                self.confirmed += 1
+                del self.expectations[field]
+            elif now > expectation.deadline:
+                self.overruled += 1  # The player never got there - believe the poll
+                del self.expectations[field]
+            else:
+                state = state._replace(**expectation.overlay())
+        self.shown = state
+        return state
+
+    def fail(self, command):
+        """Drop what command predicted; returns the state to show, or None if nothing changed"""
+        fields = [field for field, expectation in self.expectations.items() if expectation.command == command]
+        if not fields:
+            return None
+        for field in fields:
+            del self.expectations[field]
+        self.rolledBack += 1
+        return self.reconcile(self.truth) if self.truth is not None else None
+
+    def stats(self):
+        return {
+            'predicted': self.predicted,
+            'confirmed': self.confirmed,
+            'overruled': self.overruled,
+            'rolledBack': self.rolledBack,
+            'pending': len(self.expectations)
+        }
+
+
+# ---------------------------------------------------------------------------
+# Main-thread queue - view mutations coalesced into one hop per batch
+# ---------------------------------------------------------------------------
+
+class MainThreadQueue:
+    """Collects view mutations from any thread and applies them on the main thread in batches
+
+    Every mutation has a key; submitting again under the same key before the
+    batch is drained replaces the earlier mutation. The first submit of a batch
+    posts one drain straight to the main thread through `post` (which runs a
+    callable there), and everything submitted until the main thread gets to it
+    rides along, so a burst of updates costs one hop and waits on no other thread.
+    """
+
+    def __init__(self, post):
+        self.post = post
+        self.lock = threading.Lock()
+        self.pending = collections.OrderedDict()  # key -> (function, args)
+        self.hopScheduled = False
+        self.submitted = 0
+        self.replaced = 0
+        self.applied = 0
+        self.hops = 0
+
+    def submit(self, key, function, *args):
+        """Queue function(*args) for the next drain, replacing any pending mutation for key"""
+        with self.lock:
+            if key in self.pending:
+                self.replaced += 1
+                del self.pending[key]  # Re-queued at the end so it runs after older mutations
+            self.pending[key] = (function, args)
+            self.submitted += 1
+            if not self.hopScheduled:
+                self.hopScheduled = True
+                self.post(self.drain)
+
+    def drain(self):
+        """Apply every queued mutation (main thread)"""
+        with self.lock:
+            batch = self.pending
+            self.pending = collections.OrderedDict()
+            self.hopScheduled = False
+        self.hops += 1
+        for key, (function, args) in batch.items():
+            try:
+                function(*args)
+            except Exception as e:
+                print(f"[MAIN] Mutation {key} failed: {e}")
+            self.applied += 1
+
+    def stats(self):
+        """Submitted versus applied mutation counters"""
+        with self.lock:
+            return {
+                'submitted': self.submitted,
+                'replaced': self.replaced,
+                'applied': self.applied,
+                'hops': self.hops,
+                'pending': len(self.pending)
+            }
+
+
+# ---------------------------------------------------------------------------
+# Coalescing command channel - rate limited slider commands, final value always sent
+# ---------------------------------------------------------------------------
+
+class CoalescingChannel:
+    """Sends the newest pushed value at most `rate` times per second
+
+    The first push after a quiet period goes out right away (leading edge).
+    Pushes that arrive while a send is scheduled just replace the pending value,
+    and whatever is pending when the slot comes up is sent (trailing edge), so
+    the value the user let go at is always delivered and stale ones are dropped.
+    `send` runs on the scheduler's thread.
+    """
+
+    def __init__(self, send, rate=10, now=time.monotonic, schedule=None, name="channel"):
+        self.send = send
+        self.interval = 1.0 / rate
+        self.now = now
+        self.schedule = schedule or runtime.callLater
+        self.name = name
+        self.lock = threading.Lock()
+        self.pendingValue = None
+        self.hasPending = False
+        self.scheduled = False
+        self.lastSent = None
+        self.pushed = 0
+        self.sent = 0
+        self.superseded = 0
+        self.failed = 0
+
+    def push(self, value):
+        """Offer a new value; it or a newer one will be sent"""
+        with self.lock:
+            self.pushed += 1
+            if self.hasPending:
+                self.superseded += 1  # Never sent - replaced by a newer value
+            self.pendingValue = value
+            self.hasPending = True
+            if self.scheduled:
+                return
+            self.scheduled = True
+            elapsed = self.interval if self.lastSent is None else self.now() - self.lastSent
+            delay = max(0.0, self.interval - elapsed)
+        self.schedule(delay, self.flush)
+
+    def flush(self):
+        """Send whatever is pending (scheduler thread)"""
+        with self.lock:
+            self.scheduled = False
+            if not self.hasPending:
+                return
+            value = self.pendingValue
+            self.pendingValue = None
+            self.hasPending = False
+            self.lastSent = self.now()
+        try:
+            self.send(value)
+            with self.lock:
+                self.sent += 1
+        except Exception as e:
+            with self.lock:
+                self.failed += 1
+            print(f"[{self.name.upper()}] Send failed: {e}")
+
+    def stats(self):
+        with self.lock:
+            return {
+                'pushed': self.pushed,
+                'sent': self.sent,
+                'superseded': self.superseded,
+                'failed': self.failed,
+                'pending': self.hasPending
+            }
+
+
+# ---------------------------------------------------------------------------
+# Action rate limiter - token buckets per button, policies per kind of action
+# ---------------------------------------------------------------------------
+
+RatePolicy = collections.namedtuple('RatePolicy', 'burst refillPerSecond')
+
+
+class ActionRateLimiter:
+    """Token bucket per action; each kind of action has its own burst and refill rate
+
+    An action may run while its bucket holds a token. Buckets refill
+    continuously on a monotonic clock, so a quick double skip is fine while a
+    held-down button or a repeated preset launch is turned away. Thread safe.
+    """
+
+    POLICIES = {
+        'transport': RatePolicy(burst=3, refillPerSecond=2.0),  # Skips - a few in a row, then 2/s
+        'quickApp': RatePolicy(burst=1, refillPerSecond=1.0),  # One app - 1/s like the old cooldown
+        'preset': RatePolicy(burst=1, refillPerSecond=0.2)  # Opens several apps - once every 5 s
+    }
+    DEFAULT_POLICY = RatePolicy(burst=1, refillPerSecond=1.0)
+
+    def __init__(self, policies=None, now=time.monotonic):
+        self.policies = dict(self.POLICIES if policies is None else policies)
+        self.now = now
+        self.lock = threading.Lock()
+        self.buckets = {}  # action -> [tokens, updatedAt]
+        self.allowed = collections.Counter()
+        self.rejected = collections.Counter()
+
+    def allow(self, action, kind=None):
+        """Take a token for action (limited by kind's policy); False if it should be ignored"""
+        policy = self.policies.get(kind or action, self.DEFAULT_POLICY)
+        now = self.now()
+        with self.lock:
+            bucket = self.buckets.get(action)
+            if bucket is None:
+                bucket = self.buckets[action] = [float(policy.burst), now]
+            else:
+                bucket[0] = min(policy.burst, bucket[0] + (now - bucket[1]) * policy.refillPerSecond)
+                bucket[1] = now
+            if bucket[0] < 1.0:
+                self.rejected[action] += 1
+                return False
+            bucket[0] -= 1.0
+            self.allowed[action] += 1
+            return True
+
+    def stats(self):
+        """Allowed and rejected counts per action"""
+        with self.lock:
+            return {'allowed': dict(self.allowed), 'rejected': dict(self.rejected)}
+
+
+# ---------------------------------------------------------------------------
+# Artwork memory cache - LRU bounded by a byte budget
+# ---------------------------------------------------------------------------
+
+class ArtworkMemoryCache:
+    """LRU cache for artwork keyed by URL or track id, bounded by a byte budget
+
+    Values can be anything (raw bytes, decoded images); callers pass the size
+    they want charged against the budget when it is not simply len(value).
+    """
+
+    DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, maxBytes=DEFAULT_MAX_BYTES):
+        self.maxBytes = maxBytes
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()  # key -> (value, size), oldest first
+        self.totalBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evictedBytes = 0
+
+    def get(self, key):
+        """Return the cached value (marking it recently used) or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """Store a value, evicting least recently used entries to stay within budget"""
+        size = len(value) if size is None else size
+        with self.lock:
+            if key in self.entries:
+                self.totalBytes -= self.entries.pop(key)[1]
+            if size > self.maxBytes:
+                return False  # Would evict everything and still not fit
+            self.entries[key] = (value, size)
+            self.totalBytes += size
+            while self.totalBytes > self.maxBytes:
+                _, (_, evictedSize) = self.entries.popitem(last=False)
+                self.totalBytes -= evictedSize
+                self.evictions += 1
+                self.evictedBytes += evictedSize
+            return True
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def stats(self):
+        """Hit, miss and eviction counters for dashboards"""
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.totalBytes,
+                'maxBytes': self.maxBytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'evictedBytes': self.evictedBytes
+            }
+
+
+# ---------------------------------------------------------------------------
+# Artwork disk cache - content addressed files under ~/Library/Caches
+# ---------------------------------------------------------------------------
+
+def writeFileAtomically(path, data):
+    """Write bytes to path through a temp file and rename, so readers never see half a file"""
+    directory = os.path.dirname(path)
+    fd, tempPath = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tempPath, path)
+    except BaseException:
+        try:
+            os.unlink(tempPath)
+        except OSError:
+            pass
+        raise
+
+
+class DiskArtworkCache:
+    """Artwork bytes on disk, named by a hash of the URL, with a size cap and TTL
+
+    A compact JSON index (file name -> size, stored, last used, metadata such
+    as HTTP validators and the artwork palette) answers lookups and drives
+    eviction without scanning the directory. It also remembers the last
+    artwork shown so it can be displayed straight away at startup. Expired entries with HTTP validators are kept for a while so they
+    can be revalidated with a conditional request instead of downloaded again.
+    """
+
+    DEFAULT_DIRECTORY = os.path.expanduser("~/Library/Caches/com.dynamicisland/artwork")
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    DEFAULT_TTL = 30 * 24 * 60 * 60  # 30 days
+    INDEX_NAME = "index.json"
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, maxBytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL, now=time.time):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.ttl = ttl
+        self.now = now
+        self.lock = threading.Lock()
+        self.entries = {}  # file name -> [size, storedAt, lastUsed(, metadata)]
+        self.lastKey = None
+        self.totalBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self.loadIndex()
+
+    def nameFor(self, key):
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def pathFor(self, name):
+        return os.path.join(self.directory, name)
+
+    def loadIndex(self):
+        try:
+            with open(self.pathFor(self.INDEX_NAME), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self.entries = {name: list(entry) for name, entry in index.get('entries', {}).items()}
+            self.lastKey = index.get('lastKey')
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            # Damaged index - rebuild it from the files with a single directory scan
+            print(f"[ART] Rebuilding artwork cache index: {e}")
+            self.entries = {}
+            now = self.now()
+            for name in os.listdir(self.directory):
+                if len(name) == 40 and not name.startswith("."):
+                    self.entries[name] = [os.path.getsize(self.pathFor(name)), now, now]
+        self.totalBytes = sum(entry[0] for entry in self.entries.values())
+
+    def saveIndex(self):
+        """Persist the index (call with lock held)"""
+        index = {'version': 1, 'lastKey': self.lastKey, 'entries': self.entries}
+        writeFileAtomically(self.pathFor(self.INDEX_NAME), json.dumps(index, separators=(',', ':')).encode('utf-8'))
+
+    def removeLocked(self, name):
+        entry = self.entries.pop(name, None)
+        if entry:
+            self.totalBytes -= entry[0]
+        try:
+            os.unlink(self.pathFor(name))
+        except OSError:
+            pass
+
+    def readLocked(self, name):
+        """Read the file for name in one go, forgetting the entry if it is gone"""
+        # The decoder needs the whole image as bytes anyway, so a single read()
+        # of these small files beats mapping them and copying the mapping out
+        try:
+            with open(self.pathFor(name), 'rb') as f:
+                data = f.read()
+        except OSError:
+            data = None
+        if not data:
+            # File vanished or is empty - forget it
+            self.removeLocked(name)
+            self.saveIndex()
+            return None
+        self.entries[name][2] = self.now()  # Persisted with the next index write
+        return data
+
+    def isExpired(self, entry, now):
+        """Past the TTL; entries with validators get a second TTL to be revalidated"""
+        age = now - entry[1]
+        metadata = entry[3] if len(entry) > 3 else {}
+        revalidatable = metadata.get('etag') or metadata.get('lastModified')
+        return age > self.ttl * 2 or (age > self.ttl and not revalidatable)
+
+    def get(self, key):
+        """Return the cached bytes for key, or None if missing or past the TTL"""
+        name = self.nameFor(key)
+        with self.lock:
+            entry = self.entries.get(name)
+            now = self.now()
+            if entry is not None and now - entry[1] > self.ttl:
+                if self.isExpired(entry, now):
+                    self.removeLocked(name)
+                    self.saveIndex()
+                entry = None  # Stale but revalidatable entries stay for validatorsFor()
+            data = self.readLocked(name) if entry is not None else None
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return data
+
+    def metadataFor(self, key):
+        """Metadata dict stored next to key's bytes (empty if none)"""
+        with self.lock:
+            entry = self.entries.get(self.nameFor(key))
+            return dict(entry[3]) if entry is not None and len(entry) > 3 else {}
+
+    def validatorsFor(self, key):
+        """(etag, lastModified) stored with key, for a conditional request"""
+        metadata = self.metadataFor(key)
+        return metadata.get('etag'), metadata.get('lastModified')
+
+    def revalidated(self, key):
+        """The server said 304 - start a fresh TTL and return the stored bytes"""
+        name = self.nameFor(key)
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                return None
+            entry[1] = self.now()
+            data = self.readLocked(name)
+            if data is not None:
+                self.saveIndex()
+            return data
+
+    def put(self, key, data, **metadata):
+        """Store bytes for key atomically and evict down to the size cap
+
+        Keyword arguments (etag, lastModified, palette, ...) are kept in the index
+        entry; None values are left out.
+        """
+        name = self.nameFor(key)
+        with self.lock:
+            if len(data) > self.maxBytes:
+                return False
+            writeFileAtomically(self.pathFor(name), data)
+            if name in self.entries:
+                self.totalBytes -= self.entries[name][0]
+            now = self.now()
+            self.entries[name] = [len(data), now, now]
+            metadata = {field: value for field, value in metadata.items() if value is not None}
+            if metadata:
+                self.entries[name].append(metadata)
+            self.totalBytes += len(data)
+            self.evictLocked(keep=name)
+            self.saveIndex()
+            return True
+
+    def evictLocked(self, keep=None):
+        """Drop expired entries, then least recently used ones until under the cap"""
+        now = self.now()
+        for name in [name for name, entry in self.entries.items() if self.isExpired(entry, now)]:
+            self.removeLocked(name)
+            self.evictions += 1
+        for name in sorted(self.entries, key=lambda name: self.entries[name][2]):
+            if self.totalBytes <= self.maxBytes:
+                break
+            if name != keep:
+                self.removeLocked(name)
+                self.evictions += 1
+
+    def setLastKey(self, key):
+        """Remember the artwork currently on screen for the next launch"""
+        with self.lock:
+            if key != self.lastKey:
+                self.lastKey = key
+                self.saveIndex()
+
+    def lastEntry(self):
+        """(key, bytes) of the artwork shown last, or (None, None)"""
+        key = self.lastKey
+        if not key:
+            return None, None
+        data = self.get(key)
+        return (key, data) if data is not None else (None, None)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.totalBytes,
+                'maxBytes': self.maxBytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+# ---------------------------------------------------------------------------
+# Artwork download pool - bounded workers, one fetch per URL, stale results dropped
+# ---------------------------------------------------------------------------
+
+class ArtworkDownloadPool:
+    """A few worker threads that fetch artwork, merging requests for the same key
+
+    Every request is tagged with a generation number. Only callbacks from the
+    latest generation run, so a slow download for a skipped track can never
+    replace the cover of the track that followed it. Queued fetches whose
+    waiters are all stale are cancelled before they start.
+    """
+
+    def __init__(self, workers=2, log=print):
+        self.workerCount = workers
+        self.log = log
+        self.condition = threading.Condition()
+        self.pending = collections.deque()  # (key, fetch) waiting for a worker
+        self.inflight = {}  # key -> [(generation, callback)], queued or running
+        self.generation = 0
+        self.workers = []
+        self.requested = 0
+        self.fetched = 0
+        self.merged = 0
+        self.stale = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    def advance(self):
+        """Start a new generation without fetching, e.g. when artwork came from elsewhere"""
+        with self.condition:
+            self.generation += 1
+            return self.generation
+
+    def request(self, key, fetch, callback):
+        """Run fetch() once for key on a worker and pass its result to callback
+
+        Returns the generation of this request. callback(result) runs on the
+        worker thread, and only if no newer request was made meanwhile.
+        """
+        with self.condition:
+            self.generation += 1
+            generation = self.generation
+            self.requested += 1
+            waiters = self.inflight.get(key)
+            if waiters is not None:
+                waiters.append((generation, callback))
+                self.merged += 1
+                return generation
+            self.inflight[key] = [(generation, callback)]
+            self.pending.append((key, fetch))
+            if len(self.workers) < self.workerCount:
+                worker = threading.Thread(target=self.work, name=f"artwork-{len(self.workers)}", daemon=True)
+                self.workers.append(worker)
+                worker.start()
+            self.condition.notify()
+            return generation
+
+    def work(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                key, fetch = self.pending.popleft()
+                if all(generation != self.generation for generation, _ in self.inflight[key]):
+                    # Nobody wants this any more - skip the download entirely
+                    self.stale += len(self.inflight.pop(key))
+                    self.cancelled += 1
+                    continue
+            try:
+                result = fetch()
+                error = None
+            except Exception as e:
+                result, error = None, e
+            with self.condition:
+                waiters = self.inflight.pop(key)
+                current = [callback for generation, callback in waiters if generation == self.generation]
+                self.stale += len(waiters) - len(current)
+                if error is None:
+                    self.fetched += 1
+                else:
+                    self.failed += 1
+            if error is not None:
+                self.log(f"[ART] Download error for {key}: {error}")
+                continue
+            for callback in current:
+                try:
+                    callback(result)
+                except Exception as e:
+                    self.log(f"[ART] Artwork callback failed: {e}")
+                    traceback.print_exc()
+
+    def stats(self):
+        with self.condition:
+            return {
+                'workers': len(self.workers),
+                'requested': self.requested,
+                'fetched': self.fetched,
+                'merged': self.merged,
+                'stale': self.stale,
+                'cancelled': self.cancelled,
+                'failed': self.failed,
+                'queued': len(self.pending)
+            }
+
+
+# ---------------------------------------------------------------------------
+# Artwork fetcher - persistent connections per host and conditional requests
+# ---------------------------------------------------------------------------
+
+class ArtworkFetchError(Exception):
+    """Artwork could not be fetched (bad status, too many redirects, bad URL)"""
+
+
+ArtworkFetchResult = collections.namedtuple('ArtworkFetchResult', 'status body etag lastModified notModified')
+
+
+class ArtworkFetcher:
+    """Fetch artwork over kept-alive http.client connections, one idle pool per host
+
+    Passing the validators of a cached copy turns the request into a conditional
+    one; a 304 comes back with notModified set and an empty body. Safe to share
+    between threads - a connection is only ever used by the thread that took it.
+    """
+
+    MAX_REDIRECTS = 3
+
+    def __init__(self, timeout=3.0, maxIdlePerHost=2, userAgent="DynamicIsland"):
+        self.timeout = timeout
+        self.maxIdlePerHost = maxIdlePerHost
+        self.userAgent = userAgent
+        self.lock = threading.Lock()
+        self.idle = {}  # (scheme, host, port) -> [HTTPConnection]
+        self.requests = 0
+        self.connectionsOpened = 0
+        self.connectionsReused = 0
+        self.notModified = 0
+        self.bytesReceived = 0
+        self.totalTimeToFirstByte = 0.0
+        self.lastTimeToFirstByte = None
+
+    def connectionKey(self, url):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ArtworkFetchError(f"unsupported artwork URL: {url}")
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        return (parts.scheme, parts.hostname, port), path
+
+    def acquire(self, key):
+        """An idle connection for key, or a new one; returns (connection, reused)"""
+        with self.lock:
+            connections = self.idle.get(key)
+            if connections:
+                self.connectionsReused += 1
+                return connections.pop(), True
+            self.connectionsOpened += 1
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout), False
+        return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+
+    def release(self, key, connection):
+        with self.lock:
+            connections = self.idle.setdefault(key, [])
+            if len(connections) < self.maxIdlePerHost:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def fetch(self, url, etag=None, lastModified=None):
+        """GET url, conditionally if validators are given, following a few redirects"""
+        for _ in range(self.MAX_REDIRECTS + 1):
+            status, body, headers = self.request(url, etag, lastModified)
+            if status in (301, 302, 303, 307, 308) and headers.get('Location'):
+                url = urllib.parse.urljoin(url, headers['Location'])
+                continue
+            if status == 304:
+                with self.lock:
+                    self.notModified += 1
+                return ArtworkFetchResult(status, b"", etag, lastModified, True)
+            if status != 200:
+                raise ArtworkFetchError(f"HTTP {status} for {url}")
+            return ArtworkFetchResult(status, body, headers.get('ETag'), headers.get('Last-Modified'), False)
+        raise ArtworkFetchError(f"too many redirects for {url}")
+
+    def request(self, url, etag=None, lastModified=None):
+        """One GET on a pooled connection; returns (status, body, headers)"""
+        key, path = self.connectionKey(url)
+        headers = {'User-Agent': self.userAgent, 'Accept': 'image/*'}
+        if etag:
+            headers['If-None-Match'] = etag
+        if lastModified:
+            headers['If-Modified-Since'] = lastModified
+        while True:
+            connection, reused = self.acquire(key)
+            start = time.monotonic()
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                timeToFirstByte = time.monotonic() - start
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if reused:
+                    continue  # The server dropped an idle keep-alive connection - retry on a fresh one
+                raise
+            break
+        with self.lock:
+            self.requests += 1
+            self.bytesReceived += len(body)
+            self.totalTimeToFirstByte += timeToFirstByte
+            self.lastTimeToFirstByte = timeToFirstByte
+        if response.will_close:
+            connection.close()
+        else:
+            self.release(key, connection)
+        return response.status, body, response.headers
+
+    def close(self):
+        with self.lock:
+            connections = [c for pool in self.idle.values() for c in pool]
+            self.idle.clear()
+        for connection in connections:
+            connection.close()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'connectionsOpened': self.connectionsOpened,
+                'connectionsReused': self.connectionsReused,
+                'notModified': self.notModified,
+                'bytesReceived': self.bytesReceived,
+                'lastTimeToFirstByte': self.lastTimeToFirstByte,
+                'averageTimeToFirstByte': self.totalTimeToFirstByte / self.requests if self.requests else None
+            }
+
+
+# ---------------------------------------------------------------------------
+# Artwork palette - accent colors quantized once per artwork
+# ---------------------------------------------------------------------------
+
+try:
+    import numpy  # Optional - vectorizes palette extraction when installed
+except ImportError:
+    numpy = None
+
+ArtworkPalette = collections.namedtuple('ArtworkPalette', 'colors accent')  # RGB tuples in 0..1
+CachedArtwork = collections.namedtuple('CachedArtwork', 'image palette backdrop', defaults=(None,))  # What the artwork caches hold
+
+PALETTE_SAMPLE_GRID = 48  # Roughly this many samples per side, whatever the bitmap size
+PALETTE_ACCENT_CANDIDATES = 16
+
+
+def paletteHistogramPython(pixels, width, height, bytesPerRow, channels, step):
+    """{bin: [count, sumR, sumG, sumB]} over every step-th pixel, 4 bits per channel"""
+    bins = {}
+    for y in range(0, height, step):
+        start = y * bytesPerRow
+        for offset in range(start, start + width * channels, step * channels):
+            if channels == 4 and pixels[offset + 3] < 128:
+                continue  # Transparent margin
+            r, g, b = pixels[offset], pixels[offset + 1], pixels[offset + 2]
+            key = (r >> 4) << 8 | (g >> 4) << 4 | (b >> 4)
+            entry = bins.get(key)
+            if entry is None:
+                bins[key] = [1, r, g, b]
+            else:
+                entry[0] += 1
+                entry[1] += r
+                entry[2] += g
+                entry[3] += b
+    return bins
+
+
+def paletteHistogramNumpy(pixels, width, height, bytesPerRow, channels, step):
+    """Same histogram as paletteHistogramPython, vectorized"""
+    rows = numpy.frombuffer(pixels, dtype=numpy.uint8, count=bytesPerRow * height).reshape(height, bytesPerRow)
+    sample = rows[::step, :width * channels].reshape(-1, width, channels)[:, ::step, :].reshape(-1, channels)
+    if channels == 4:
+        sample = sample[sample[:, 3] >= 128]
+    r, g, b = (sample[:, i].astype(numpy.int64) for i in range(3))
+    keys = (r >> 4) << 8 | (g >> 4) << 4 | (b >> 4)
+    counts = numpy.bincount(keys, minlength=4096)
+    sums = [numpy.bincount(keys, weights=channel, minlength=4096) for channel in (r, g, b)]
+    return {int(key): [int(counts[key]), sums[0][key], sums[1][key], sums[2][key]]
+            for key in numpy.nonzero(counts)[0]}
+
+
+def extractPalette(pixels, width, height, bytesPerRow=None, channels=4, colors=3):
+    """Quantize a subsample of an RGB(A) bitmap into its main colors and an accent
+
+    The accent is the most saturated of the popular colors, so a mostly black
+    cover with a red title still themes red. Returns None for an empty bitmap.
+    """
+    bytesPerRow = bytesPerRow or width * channels
+    step = max(1, max(width, height) // PALETTE_SAMPLE_GRID)
+    histogram = paletteHistogramNumpy if numpy is not None else paletteHistogramPython
+    bins = sorted(histogram(pixels, width, height, bytesPerRow, channels, step).values(),
+                  key=lambda entry: entry[0], reverse=True)
+    if not bins:
+        return None
+    total = sum(entry[0] for entry in bins)
+    means = [(count, (r / count / 255.0, g / count / 255.0, b / count / 255.0)) for count, r, g, b in bins]
+
+    # Main colors - most populous bins that are visibly different from each other
+    chosen = []
+    for _, color in means:
+        if all(sum(abs(a - b) for a, b in zip(color, other)) > 0.25 for other in chosen):
+            chosen.append(color)
+            if len(chosen) == colors:
+                break
+
+    # Accent - saturation weighted by how much of the cover uses it
+    def accentScore(item):
+        count, color = item
+        high, low = max(color), min(color)
+        if high < 0.2:
+            return 0.0
+        return (high - low) / high * (count / total) ** 0.5
+    accent = max(means[:PALETTE_ACCENT_CANDIDATES], key=accentScore)[1]
+    roundColor = lambda color: tuple(round(c, 4) for c in color)
+    return ArtworkPalette(tuple(roundColor(color) for color in chosen), roundColor(accent))
+
+
+def paletteFromJson(value):
+    """Rebuild an ArtworkPalette stored in the disk cache index, or None"""
+    try:
+        colors, accent = value
+        return ArtworkPalette(tuple(tuple(color) for color in colors), tuple(accent))
+    except (TypeError, ValueError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Artwork backdrop blur - separable box blur, three passes approximate a Gaussian
+# ---------------------------------------------------------------------------
+
+def boxBlurLine(values, radius):
+    """Box blur of one row or column, edges clamped"""
+    window = 2 * radius + 1
+    padded = [values[0]] * radius + list(values) + [values[-1]] * radius
+    total = sum(padded[:window])
+    blurred = []
+    for i in range(len(values)):
+        blurred.append(total // window)
+        if i + window < len(padded):
+            total += padded[i + window] - padded[i]
+    return blurred
+
+
+def boxBlurPython(pixels, width, height, channels, radius, passes):
+    """Blur tightly packed 8-bit pixels by slicing out each row and column channel"""
+    data = bytearray(pixels)
+    stride = width * channels
+    for _ in range(passes):
+        for y in range(height):
+            for channel in range(channels):
+                start = y * stride + channel
+                data[start:start + stride:channels] = bytes(boxBlurLine(data[start:start + stride:channels], radius))
+        for x in range(width):
+            for channel in range(channels):
+                start = x * channels + channel
+                data[start::stride] = bytes(boxBlurLine(data[start::stride], radius))
+    return bytes(data)
+
+
+def boxBlurNumpy(pixels, width, height, channels, radius, passes):
+    """Same blur as boxBlurPython using running sums along each axis"""
+    image = numpy.frombuffer(pixels, dtype=numpy.uint8, count=width * height * channels)
+    image = image.reshape(height, width, channels).astype(numpy.float32)
+    window = 2 * radius + 1
+    for _ in range(passes):
+        for axis in (1, 0):
+            padding = [(0, 0)] * 3
+            padding[axis] = (radius + 1, radius)
+            sums = numpy.cumsum(numpy.pad(image, padding, mode='edge'), axis=axis)
+            length = sums.shape[axis]
+            image = (numpy.take(sums, numpy.arange(window, length), axis=axis) -
+                     numpy.take(sums, numpy.arange(0, length - window), axis=axis)) / window
+    return numpy.clip(image + 0.5, 0, 255).astype(numpy.uint8).tobytes()
+
+
+def blurPixels(pixels, width, height, channels=4, radius=3, passes=3):
+    """Gaussian-like blur of tightly packed 8-bit pixels (NumPy when available)"""
+    if radius < 1 or not width or not height:
+        return bytes(pixels)
+    blur = boxBlurNumpy if numpy is not None else boxBlurPython
+    return blur(pixels, width, height, channels, radius, passes)
+
+
+# ---------------------------------------------------------------------------
+# Settings store - reads from memory, debounced atomic writes in the background
+# ---------------------------------------------------------------------------
+
+SETTINGS_PATH = os.path.expanduser("~/Library/Preferences/com.dynamicisland.plist")
+
+
+def fileSignature(path):
+    """(mtime, size, inode) of path - changes on every write or replace - or None if missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class SettingsStore:
+    """App settings kept in memory and persisted to a plist off the main thread
+
+    get() never touches the disk. set() marks the store dirty and schedules one
+    write `debounce` seconds later, so a burst of edits costs a single write.
+    Writes go through a temp file, fsync and rename, so a crash leaves either
+    the old or the new file. Call flush() on quit to write anything pending.
+    watch() reloads the file when someone else changes it and tells a listener
+    which keys changed.
+    """
+
+    DEBOUNCE = 0.5
+    RETRY_DELAY = 5.0  # After a failed write
+
+    def __init__(self, path=SETTINGS_PATH, debounce=DEBOUNCE, schedule=None, run=None):
+        self.path = path
+        self.debounce = debounce
+        self.schedule = schedule or runtime.callLater
+        self.run = run or backgroundWork.submit  # The write itself blocks, so it runs off the timer thread
+        self.lock = threading.Lock()
+        self.writeLock = threading.Lock()  # One writer at a time, newest snapshot last
+        self.values = {}
+        self.dirty = False
+        self.edits = 0
+        self.writes = 0
+        self.reloads = 0
+        self.writtenSignature = None  # (mtime, size, inode) of our last write
+        self.watcher = None
+        self.listener = None
+        self.load()
+
+    def read(self):
+        """The values in the plist: {} if there is none, None if it can't be parsed"""
+        try:
+            with open(self.path, 'rb') as f:
+                values = plistlib.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"[SETTINGS] Could not read {self.path}: {e}")
+            return None
+        if not isinstance(values, dict):
+            print(f"[SETTINGS] Ignoring {self.path}, it does not hold a dictionary")
+            return None
+        return values
+
+    def load(self):
+        """Read the plist into memory, keeping defaults if it is missing or damaged"""
+        values = self.read()
+        with self.lock:
+            self.values = values if values is not None else {}
+
+    def get(self, key, default=None):
+        """A copy of the value for key, so callers can't change the store behind its back"""
+        with self.lock:
+            return copy.deepcopy(self.values.get(key, default))
+
+    def set(self, key, value):
+        """Update key in memory and schedule a debounced write"""
+        with self.lock:
+            self.values[key] = copy.deepcopy(value)
+            self.edits += 1
+            if self.dirty:
+                return  # The write already scheduled will pick this up
+            self.dirty = True
+        self.schedule(self.debounce, self.run, self.flush)
+
+    def flush(self):
+        """Write pending changes now (background thread, or on quit)"""
+        with self.writeLock:
+            with self.lock:
+                if not self.dirty:
+                    return False
+                data = plistlib.dumps(self.values)
+                self.dirty = False
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                writeFileAtomically(self.path, data)
+            except Exception as e:
+                print(f"[SETTINGS] Saving failed: {e}")
+                with self.lock:
+                    self.dirty = True
+                self.schedule(self.RETRY_DELAY, self.run, self.flush)
+                return False
+            self.writtenSignature = fileSignature(self.path)
+            if self.watcher:
+                self.watcher.acknowledge()  # Our own write is not an outside change
+            self.writes += 1
+            return True
+
+    def watch(self, listener, watcher=None):
+        """Reload on outside changes and call listener(changedKeys) (watcher or runtime thread)"""
+        self.listener = listener
+        if self.watcher is None:
+            self.watcher = watcher or FileChangeWatcher(self.path, self.reload)
+            self.watcher.start()
+
+    def reload(self):
+        """Re-read the file; the file wins over edits not written yet
+
+        A file that can't be parsed is most likely still being written, so the
+        current values stay until the next change to it. A deleted file also
+        keeps them: settings only fall back to defaults at launch, and the next
+        edit writes the file again.
+        """
+        with self.writeLock:
+            signature = fileSignature(self.path)
+            if signature == self.writtenSignature:
+                return set()  # Still the file we wrote - memory may already be newer
+            if signature is None:
+                print(f"[SETTINGS] {self.path} was removed, keeping the current settings")
+                return set()
+            new = self.read()
+            if new is None:
+                return set()  # Half written or damaged - wait for the next change
+            with self.lock:
+                old = self.values
+                self.values = new
+                self.dirty = False
+                self.reloads += 1
+        changed = {key for key in set(old) | set(new) if old.get(key) != new.get(key)}
+        if changed:
+            print(f"[SETTINGS] Reloaded, changed: {', '.join(sorted(changed))}")
+            if self.listener:
+                self.listener(changed)
+        return changed
+
+    def stats(self):
+        with self.lock:
+            return {'edits': self.edits, 'writes': self.writes, 'reloads': self.reloads, 'dirty': self.dirty}
+
+
+# ---------------------------------------------------------------------------
+# File change watcher - kqueue vnode events, mtime + size polling as fallback
+# ---------------------------------------------------------------------------
+
+class FileChangeWatcher:
+    """Calls `callback` whenever a file's (mtime, size, inode) signature changes
+
+    Where select.kqueue exists (macOS) a thread sleeps in kqueue until the file
+    is written, renamed or deleted, and re-opens it after an atomic replace.
+    Elsewhere, or while the file does not exist, the signature is polled every
+    `interval` seconds (timer on the runtime, stat on a worker). acknowledge()
+    records a change made by this process so it is not reported back.
+    """
+
+    INTERVAL = 2.0
+
+    def __init__(self, path, callback, interval=INTERVAL, schedule=None, run=None, useKqueue=None):
+        self.path = path
+        self.callback = callback
+        self.interval = interval
+        self.schedule = schedule or runtime.callLater
+        self.run = run or backgroundWork.submit
+        self.useKqueue = hasattr(select, 'kqueue') if useKqueue is None else useKqueue
+        self.lock = threading.Lock()
+        self.known = None
+        self.running = False
+        self.changes = 0
+
+    def signature(self):
+        return fileSignature(self.path)
+
+    def start(self):
+        self.known = self.signature()
+        self.running = True
+        if self.useKqueue:
+            threading.Thread(target=self.watchKqueue, name="settings-watcher", daemon=True).start()
+        else:
+            self.schedule(self.interval, self.poll)
+
+    def stop(self):
+        self.running = False
+
+    def acknowledge(self):
+        """The file was just changed by us - take its signature as known"""
+        with self.lock:
+            self.known = self.signature()
+
+    def check(self):
+        """Report a change if the signature moved since last time"""
+        current = self.signature()
+        with self.lock:
+            if current == self.known:
+                return False
+            self.known = current
+            self.changes += 1
+        try:
+            self.callback()
+        except Exception as e:
+            print(f"[SETTINGS] Change callback failed: {e}")
+            traceback.print_exc()
+        return True
+
+    def poll(self):
+        """mtime + size fallback - the timer hands the stat and any reload to a worker"""
+        if self.running:
+            self.run(self.pollOnce)
+
+    def pollOnce(self):
+        self.check()
+        self.schedule(self.interval, self.poll)
+
+    def watchKqueue(self):
+        """Wait for vnode events on the file (watcher thread)"""
+        queue = select.kqueue()
+        fflags = (select.KQ_NOTE_WRITE | select.KQ_NOTE_EXTEND | select.KQ_NOTE_ATTRIB |
+                  select.KQ_NOTE_DELETE | select.KQ_NOTE_RENAME)
+        try:
+            while self.running:
+                try:
+                    fd = os.open(self.path, getattr(os, 'O_EVTONLY', os.O_RDONLY))
+                except OSError:
+                    # Not there (yet) - fall back to a slow stat until it appears
+                    time.sleep(self.interval)
+                    self.check()
+                    continue
+                try:
+                    queue.control([select.kevent(fd, filter=select.KQ_FILTER_VNODE,
+                                                 flags=select.KQ_EV_ADD | select.KQ_EV_CLEAR, fflags=fflags)], 0)
+                    self.check()  # Anything that happened while the file was closed
+                    while self.running:
+                        # The timeout only lets stop() take effect
+                        events = queue.control(None, 1, self.interval)
+                        if not events:
+                            continue
+                        self.check()
+                        if events[0].fflags & (select.KQ_NOTE_DELETE | select.KQ_NOTE_RENAME):
+                            break  # Replaced atomically - watch the new file
+                finally:
+                    os.close(fd)
+        finally:
+            queue.close()
+
+
 try:
     from AppKit import (NSWindow, NSApplication, NSScreen, NSView, NSColor, NSBezierPath,
                         NSRect, NSPoint, NSSize, NSWindowStyleMaskBorderless,
@@ -11,17 +2551,25 @@ try:
                         NSTrackingActiveAlways, NSTrackingInVisibleRect, NSHapticFeedbackManager,
                         NSPointInRect, NSAnimationContext, NSTextField, NSFont, NSTextAlignmentCenter,
                         NSButton, NSBox, NSImage, NSWorkspace, NSImageView, NSSlider, NSData, NSPopUpButton,
-                        NSOpenPanel, NSScrollView, NSTextView, NSURL, NSGradient, NSShadow, NSVisualEffectView)
+                        NSOpenPanel, NSScrollView, NSTextView, NSURL, NSGradient, NSShadow, NSVisualEffectView,
+                        NSNotificationCenter, NSDistributedNotificationCenter, NSBitmapImageRep,
+                        NSGraphicsContext, NSDeviceRGBColorSpace, NSImageInterpolationHigh,
+                        NSCompositingOperationSourceOver, NSBitmapImageFileTypePNG, NSZeroRect)
     import objc
     import subprocess
     import time
     import threading
     import random
-    import urllib.request
     import os
     from datetime import datetime, timedelta
     from PyObjCTools import AppHelper
     
+    # Every view mutation made off the main thread goes through this queue
+    mainThreadQueue = MainThreadQueue(post=AppHelper.callAfter)
+
+    # Settings are read from memory and written in the background, see SettingsStore
+    settingsStore = SettingsStore()
+
     # Import macOS Media Remote Framework
     try:
         from MediaPlayer import (MPNowPlayingInfoCenter, MPMediaItemPropertyTitle,
@@ -33,6 +2581,164 @@ try:
         MEDIA_FRAMEWORK_AVAILABLE = True
     except ImportError:
         MEDIA_FRAMEWORK_AVAILABLE = False
+
+    ARTWORK_POINT_SIZE = 50  # albumArt is 50x50 points
+    ARTWORK_BACKING_SCALE = 2  # Rendered at 2x so it stays sharp on Retina
+
+    def imageByteCost(image):
+        """Approximate decoded size of an NSImage, charged against the artwork cache budget"""
+        pixels = sum(rep.pixelsWide() * rep.pixelsHigh() for rep in image.representations())
+        if not pixels:
+            size = image.size()
+            pixels = size.width * size.height
+        return max(1, int(pixels * 4))
+
+    BACKDROP_SIZE = (700, 130)  # Expanded panel, in points
+    BACKDROP_DOWNSCALE = 5  # Blurred at 1/5 size and stretched - a blur has no detail to lose
+    BACKDROP_BLUR_RADIUS = 3  # In downscaled pixels, three passes
+
+    def newBitmap(pixelsWide, pixelsHigh):
+        """Tightly packed 8-bit RGBA bitmap, so its bytes can be handed to the blur as is"""
+        return NSBitmapImageRep.alloc().initWithBitmapDataPlanes_pixelsWide_pixelsHigh_bitsPerSample_samplesPerPixel_hasAlpha_isPlanar_colorSpaceName_bytesPerRow_bitsPerPixel_(
+            None, pixelsWide, pixelsHigh, 8, 4, True, False, NSDeviceRGBColorSpace, pixelsWide * 4, 32)
+
+    def bitmapBuffer(rep):
+        """Writable view of a bitmap's pixel bytes"""
+        length = rep.bytesPerRow() * rep.pixelsHigh()
+        data = rep.bitmapData()
+        if hasattr(data, 'as_buffer'):
+            data = data.as_buffer(length)  # PyObjC hands raw pointers back as a varlist
+        return data, length
+
+    def renderIntoBitmap(image, pixelsWide, pixelsHigh, fill=False):
+        """Draw image centered into a new bitmap, aspect fit (or fill) - safe off the main thread"""
+        rep = newBitmap(pixelsWide, pixelsHigh)
+        size = image.size()
+        scales = (pixelsWide / max(size.width, 1), pixelsHigh / max(size.height, 1))
+        fit = max(scales) if fill else min(scales)
+        width, height = size.width * fit, size.height * fit
+        context = NSGraphicsContext.graphicsContextWithBitmapImageRep_(rep)
+        NSGraphicsContext.saveGraphicsState()
+        try:
+            NSGraphicsContext.setCurrentContext_(context)
+            context.setImageInterpolation_(NSImageInterpolationHigh)
+            image.drawInRect_fromRect_operation_fraction_(
+                NSMakeRect((pixelsWide - width) / 2, (pixelsHigh - height) / 2, width, height),
+                NSZeroRect, NSCompositingOperationSourceOver, 1.0)
+            context.flushGraphics()
+        finally:
+            NSGraphicsContext.restoreGraphicsState()
+        return rep
+
+    def makeArtworkThumbnail(image, pointSize=ARTWORK_POINT_SIZE, scale=ARTWORK_BACKING_SCALE):
+        """Render image once into a small bitmap at the display size (safe off the main thread)
+
+        The source image can be dropped afterwards, only the thumbnail pixels stay alive.
+        """
+        pixels = int(pointSize * scale)
+        thumbnail = NSImage.alloc().initWithSize_(NSSize(pointSize, pointSize))
+        thumbnail.addRepresentation_(renderIntoBitmap(image, pixels, pixels))
+        return thumbnail
+
+    def makeArtworkBackdrop(thumbnail):
+        """Blurred, panel sized backdrop for a thumbnail - computed once, drawn as a plain image"""
+        width, height = (side // BACKDROP_DOWNSCALE for side in BACKDROP_SIZE)
+        rep = renderIntoBitmap(thumbnail, width, height, fill=True)
+        data, length = bitmapBuffer(rep)
+        data[:length] = blurPixels(bytes(data[:length]), width, height, 4, BACKDROP_BLUR_RADIUS)
+        backdrop = NSImage.alloc().initWithSize_(NSSize(*BACKDROP_SIZE))
+        backdrop.addRepresentation_(rep)
+        return backdrop
+
+    def thumbnailFromBytes(imageBytes):
+        """Decode encoded image bytes straight into a display sized thumbnail, or None"""
+        image = NSImage.alloc().initWithData_(NSData.dataWithBytes_length_(imageBytes, len(imageBytes)))
+        if not image or not image.isValid():
+            return None
+        return makeArtworkThumbnail(image)
+
+    def thumbnailPalette(thumbnail):
+        """Palette of a thumbnail made by makeArtworkThumbnail, read straight from its bitmap"""
+        rep = thumbnail.representations()[0]
+        data, length = bitmapBuffer(rep)
+        return extractPalette(bytes(data[:length]), rep.pixelsWide(), rep.pixelsHigh(),
+                              rep.bytesPerRow(), rep.samplesPerPixel())
+
+    def cachedArtworkFromThumbnail(thumbnail, palette=None):
+        """Bundle a thumbnail with its palette and blurred backdrop (artwork worker)
+
+        The palette is only extracted if the disk cache had none.
+        """
+        if palette is None:
+            palette = thumbnailPalette(thumbnail)
+        return CachedArtwork(thumbnail, palette, makeArtworkBackdrop(thumbnail))
+
+    def cachedArtworkCost(cached):
+        """Bytes a CachedArtwork keeps resident, for the memory cache budget"""
+        cost = imageByteCost(cached.image)
+        if cached.backdrop is not None:
+            cost += imageByteCost(cached.backdrop)
+        return cost
+
+    SLIDER_BORDER_RGBA = (0.4, 0.4, 0.45, 0.8)  # Without artwork
+
+    def sliderBorderColor(palette):
+        """CGColor for the slider pill borders - the artwork accent, lifted so it shows on black"""
+        if palette is None or palette.accent is None:
+            return NSColor.colorWithRed_green_blue_alpha_(*SLIDER_BORDER_RGBA).CGColor()
+        r, g, b = palette.accent
+        lift = 0.45 / max(r, g, b, 0.45)  # Dark accents are brightened, bright ones kept
+        lift = max(lift, 1.0)
+        return NSColor.colorWithRed_green_blue_alpha_(min(1.0, r * lift), min(1.0, g * lift),
+                                                      min(1.0, b * lift), SLIDER_BORDER_RGBA[3]).CGColor()
+
+    def thumbnailBytes(thumbnail):
+        """PNG bytes of a thumbnail made by makeArtworkThumbnail, for the disk cache"""
+        data = thumbnail.representations()[0].representationUsingType_properties_(NSBitmapImageFileTypePNG, {})
+        return bytes(data) if data is not None else None
+
+    def isApplicationInstalled(bundleId):
+        """Return True if Launch Services knows an app with this bundle id"""
+        return NSWorkspace.sharedWorkspace().URLForApplicationWithBundleIdentifier_(bundleId) is not None
+
+    class MediaPlayerBackend(PlayerBackend):
+        """System now playing info from the MediaPlayer framework (read only)"""
+
+        name = "mediaplayer"
+        capabilities = frozenset({'volume', 'artwork'})
+
+        def __init__(self, host=None, tracker=None):
+            PlayerBackend.__init__(self, host, tracker)
+            self.artworkObject = None
+
+        def probe(self, isInstalled):
+            return MEDIA_FRAMEWORK_AVAILABLE
+
+        def snapshot(self):
+            info = self.systemSnapshot()
+            nowPlaying = MPNowPlayingInfoCenter.defaultCenter().nowPlayingInfo()
+            print(f"[DEBUG] nowPlaying: {nowPlaying is not None}", flush=True)
+            title = nowPlaying.get(MPMediaItemPropertyTitle, "") if nowPlaying else ""
+            if not title:
+                return info
+
+            # Hand the artwork object over by key so it is only rendered when it changes
+            self.artworkObject = nowPlaying.get(MPMediaItemPropertyArtwork)
+            playbackRate = nowPlaying.get(MPNowPlayingInfoPropertyPlaybackRate, 0)
+            info.update(
+                player=self.name,
+                state="playing" if playbackRate > 0 else "paused",
+                track=title,
+                artist=nowPlaying.get(MPMediaItemPropertyArtist, "") or "",
+                position=float(nowPlaying.get(MPNowPlayingInfoPropertyElapsedPlaybackTime, 0) or 0),
+                duration=float(nowPlaying.get(MPMediaItemPropertyPlaybackDuration, 0) or 0),
+                trackId=title,
+                artwork=NOW_PLAYING_ARTWORK_PREFIX + title if self.artworkObject else ""
+            )
+            return info
+
+        def artwork(self):
+            return self.artworkObject
     
     class SettingsWindow(NSWindow):
         """Settings window"""
@@ -65,6 +2771,7 @@ try:
                 contentFrame = NSMakeRect(0, 0, frame.size.width, 900)
                 contentView = SettingsView.alloc().initWithFrame_controlPanel_(contentFrame, controlPanel)
                 contentView.parent = self
+                self.settingsView = contentView  # Refreshed when settings change on disk
                 scrollView.setDocumentView_(contentView)
 
                 self.setContentView_(scrollView)
@@ -437,23 +3144,113 @@ try:
             """Quit the entire application"""
             NSApplication.sharedApplication().terminate_(None)
 
+    class DistributedNotificationEmitter(NSObject):
+        """Forwards distributed notifications to Python handlers on the main thread"""
+
+        def init(self):
+            self = objc.super(DistributedNotificationEmitter, self).init()
+            if self:
+                self.handlers = {}
+            return self
+
+        def addObserverForName_handler_(self, name, handler):
+            """Call handler(name, userInfo) whenever the named notification is posted"""
+            self.handlers[name] = handler
+            self.notificationCenter().addObserver_selector_name_object_(
+                self,
+                objc.selector(self.notificationReceived_, signature=b'v@:@'),
+                name,
+                None
+            )
+
+        def removeObservers(self):
+            """Stop listening for every notification"""
+            self.notificationCenter().removeObserver_(self)
+            self.handlers = {}
+
+        def notificationCenter(self):
+            return NSDistributedNotificationCenter.defaultCenter()
+
+        def userInfoFromNotification_(self, notification):
+            userInfo = notification.userInfo()
+            return dict(userInfo) if userInfo else {}
+
+        def notificationReceived_(self, notification):
+            handler = self.handlers.get(notification.name())
+            if handler:
+                handler(notification.name(), self.userInfoFromNotification_(notification))
+
+    class WorkspaceAppSource(DistributedNotificationEmitter):
+        """Running applications plus their launch/terminate notifications from NSWorkspace"""
+
+        def notificationCenter(self):
+            return NSWorkspace.sharedWorkspace().notificationCenter()
+
+        def userInfoFromNotification_(self, notification):
+            userInfo = notification.userInfo()
+            app = userInfo.objectForKey_("NSWorkspaceApplicationKey") if userInfo else None
+            return {'bundleId': app.bundleIdentifier() if app else None}
+
+        def runningBundleIds(self):
+            return [app.bundleIdentifier() for app in NSWorkspace.sharedWorkspace().runningApplications()]
+
     class ControlPanelView(NSView):
         """Main control panel with buttons"""
         
         def initWithFrame_(self, frame):
             self = objc.super(ControlPanelView, self).initWithFrame_(frame)
             if self:
-                self.lastClickTime = {}  # Anti-spam tracking
+                self.rateLimiter = ActionRateLimiter()  # Anti-spam - token buckets per button
                 self.lastVolumeSliderTouch = 0  # Track when user last touched volume slider
                 self.lastProgressSliderTouch = 0  # Track when user last touched progress slider
-                self.lastSeekCommandTime = 0  # Track actual seek command execution
-                self.lastVolumeCommandTime = 0  # Track actual volume command execution
-                self.pendingSeekValue = None  # Store pending seek value
-                self.pendingVolumeValue = None  # Store pending volume value
+                # Player commands run in order, one worker per player
+                self.commandQueue = PlayerCommandQueue(self.executePlayerCommand_name_arguments_,
+                                                       onFailure=self.playerCommandFailed_error_)
+                self.transport = OptimisticTransport()  # Commands show at once, polls reconcile them
+                # Slider drags are coalesced - at most N commands a second, the release value always sent
+                self.seekChannel = CoalescingChannel(self.sendSeek_, rate=10, name="seek")
+                self.volumeChannel = CoalescingChannel(self.sendVolume_, rate=20, name="volume")
+                self.scriptHost = ScriptHost()  # Warm osascript shared by polls and commands
+                self.nowPlayingSource = None  # Player notification source, set up with the media player
+                self.mediaJob = None  # Next scheduled media poll on the runtime
+                self.mediaPollRunning = False  # A poll is out on a background worker (runtime thread)
+                self.mediaPollAgain = False  # Someone asked for a poll while one was running
+                self.lastPolledTrackId = None
+                self.playbackClock = PlaybackClock()  # Extrapolates position between polls
+                self.progressJob = None  # Next progress slider frame on the runtime
+                self.nowPlayingState = None  # Last NowPlayingState applied to the views (main thread)
+                self.artworkCache = ArtworkMemoryCache()  # Decoded artwork by URL or track key
+                try:
+                    self.artworkDiskCache = DiskArtworkCache()  # Downloaded artwork bytes across launches
+                except OSError as e:
+                    print(f"[ART] Disk cache unavailable: {e}")
+                    self.artworkDiskCache = None
+                self.artworkPool = ArtworkDownloadPool()  # Bounded, single-flight artwork downloads
+                self.artworkFetcher = ArtworkFetcher()  # Kept-alive connections to the artwork hosts
+                # Running apps are tracked from workspace notifications instead of asking
+                # System Events on every tick
+                self.runningApps = RunningAppTracker(WorkspaceAppSource.alloc().init(), self.runningAppChanged_running_)
+                self.runningApps.start()
+                self.players = PlayerRegistry([  # Probed once, then only the active one is queried
+                    SpotifyBackend(self.scriptHost, self.runningApps),
+                    MusicBackend(self.scriptHost, self.runningApps),
+                    MediaPlayerBackend(self.scriptHost, self.runningApps)
+                ])
+                self.pollScheduler = AdaptivePollScheduler()  # Picks media/clock intervals
+                self.clockJob = None  # Next scheduled date/time redraw on the runtime
                 self.setupControls()
             return self
         
         def setupControls(self):
+            # Blurred album art behind the whole panel - a precomputed image, so redraws cost nothing extra
+            self.artworkBackdrop = NSImageView.alloc().initWithFrame_(NSMakeRect(0, 0, *BACKDROP_SIZE))
+            self.artworkBackdrop.setImageScaling_(1)  # Axes independently - it is already panel shaped
+            self.artworkBackdrop.setAlphaValue_(0.35)  # Dimmed so labels stay readable
+            self.artworkBackdrop.setWantsLayer_(True)
+            self.artworkBackdrop.layer().setCornerRadius_(30)  # Same as the expanded island
+            self.artworkBackdrop.layer().setMasksToBounds_(True)
+            self.addSubview_(self.artworkBackdrop)
+
             # Quick Access section - moved left 30px
             quickAccessLabel = NSTextField.alloc().initWithFrame_(NSMakeRect(25, 93, 80, 18))
             quickAccessLabel.setStringValue_("Quick Access")
@@ -471,8 +3268,9 @@ try:
             iconSize = 40
             spacing = 45
             
-            # Load settings from persistent storage
+            # Load settings from persistent storage and follow outside edits to the file
             self.loadSettings()
+            settingsStore.watch(self.settingsDidChange_)
 
             # Initialize empty if no settings loaded
             if not hasattr(self, 'quickAppPaths') or not self.quickAppPaths:
@@ -602,7 +3400,7 @@ try:
             knobThickness = 4  # Actual circular knob size
             self.progressSlider = NSSlider.alloc().initWithFrame_(NSMakeRect(452, 39, 218, frameHeight))
             self.progressSlider.setMinValue_(0)
-            self.progressSlider.setMaxValue_(100)
+            self.progressSlider.setMaxValue_(100)  # Seconds - set to the track duration as it arrives
             self.progressSlider.setDoubleValue_(0)
             self.progressSlider.setContinuous_(True)  # Fire events continuously while dragging
             self.progressSlider.setTarget_(self)
@@ -622,7 +3420,7 @@ try:
             self.progressSlider.layer().setMasksToBounds_(False)
             # Add a border to make it look like a hollow pill
             self.progressSlider.layer().setBorderWidth_(1.5)
-            self.progressSlider.layer().setBorderColor_(NSColor.colorWithRed_green_blue_alpha_(0.4, 0.4, 0.45, 0.8).CGColor())
+            self.progressSlider.layer().setBorderColor_(sliderBorderColor(None))
             self.progressSlider.layer().setBackgroundColor_(NSColor.clearColor().CGColor())  # Transparent background
 
             self.addSubview_(self.progressSlider)
@@ -653,10 +3451,11 @@ try:
             self.volumeSlider.layer().setMasksToBounds_(False)
             # Add a border to make it look like a hollow pill
             self.volumeSlider.layer().setBorderWidth_(1.5)
-            self.volumeSlider.layer().setBorderColor_(NSColor.colorWithRed_green_blue_alpha_(0.4, 0.4, 0.45, 0.8).CGColor())
+            self.volumeSlider.layer().setBorderColor_(sliderBorderColor(None))
             self.volumeSlider.layer().setBackgroundColor_(NSColor.clearColor().CGColor())  # Transparent background
 
             self.addSubview_(self.volumeSlider)
+            self.showLastArtwork()  # Needs the sliders for the palette borders
             
             # Media control buttons - under the slider
             # Previous button - double triangles - moved right 10px, down 5px
@@ -689,6 +3488,17 @@ try:
             self.nextBtn.setAction_(objc.selector(self.nextTrack_, signature=b'v@:@'))
             self.addSubview_(self.nextBtn)
             
+            # Find out once which players are installed
+            self.players.probe(isApplicationInstalled)
+
+            # Player notifications drive now-playing updates, the poll is only a safety net
+            try:
+                self.nowPlayingSource = NowPlayingNotificationSource(DistributedNotificationEmitter.alloc().init())
+                self.nowPlayingSource.start(self.nowPlayingChanged_)
+            except Exception as e:
+                print(f"Player notifications unavailable, polling only: {e}")
+                self.nowPlayingSource = None
+
             # Start updating media info
             self.updateMediaInfo()
         
@@ -818,353 +3628,406 @@ try:
             """Update date and time display"""
             def update():
                 now = datetime.now()
-                yesterday = now - timedelta(days=1)
-                tomorrow = now + timedelta(days=1)
-                
-                self.todayDate.setStringValue_(str(int(now.strftime("%d"))))
-                self.yesterdayDate.setStringValue_(str(int(yesterday.strftime("%d"))))
-                self.tomorrowDate.setStringValue_(str(int(tomorrow.strftime("%d"))))
-                self.timeLabel.setStringValue_(now.strftime("%I:%M"))
-                self.dayLabel.setStringValue_(now.strftime("%A"))
+                mainThreadQueue.submit('dateTime', self.drawDateTime_, now)
                 
-                # Schedule next update in 60 seconds
-                threading.Timer(60.0, self.updateDateTime).start()
-            
-            threading.Thread(target=update).start()
+                # Schedule the next redraw for the next minute, or suspend while collapsed
+                interval = self.pollScheduler.clockInterval(now)
+                if interval is not None:
+                    self.clockJob = runtime.callLater(interval, update)
+
+            # Restart the chain on the runtime thread so only one redraw is ever pending
+            def restart():
+                if self.clockJob:
+                    self.clockJob.cancel()
+                update()
+
+            runtime.callSoon(restart)
         
         def updateMediaInfo(self):
             """Update media info from system Now Playing"""
-            def update():
+            def poll():
+                """Query the player and publish the result (background worker)"""
                 print("[DEBUG] update() called", flush=True)
+                info = None
                 try:
-                    # Update volume slider to current system volume (only if not recently touched)
-                    volume_script = 'output volume of (get volume settings)'
-                    volume_result = subprocess.run(['osascript', '-e', volume_script], capture_output=True, text=True)
-                    if volume_result.stdout.strip():
-                        try:
-                            current_volume = int(volume_result.stdout.strip())
-                            # Only update if user hasn't touched slider in last 5 seconds
-                            if time.time() - self.lastVolumeSliderTouch > 5.0:
-                                self.volumeSlider.setDoubleValue_(current_volume)
-                        except:
-                            pass
-                    if MEDIA_FRAMEWORK_AVAILABLE:
-                        # Get system-wide now playing info
-                        infoCenter = MPNowPlayingInfoCenter.defaultCenter()
-                        nowPlaying = infoCenter.nowPlayingInfo()
-                        print(f"[DEBUG] nowPlaying: {nowPlaying is not None}", flush=True)
-
-                        if nowPlaying:
-                            # Get track info
-                            title = nowPlaying.get(MPMediaItemPropertyTitle, "")
-                            artist = nowPlaying.get(MPMediaItemPropertyArtist, "")
-                            playbackRate = nowPlaying.get(MPNowPlayingInfoPropertyPlaybackRate, 0)
-                            elapsed = nowPlaying.get(MPNowPlayingInfoPropertyElapsedPlaybackTime, 0)
-                            duration = nowPlaying.get(MPMediaItemPropertyPlaybackDuration, 0)
-                            print(f"[DEBUG] title: '{title}'", flush=True)
-
-                            if title:
-                                self.songTitle.setStringValue_(title)
-                                
-                                # Check if title wraps to multiple lines and adjust artist position
-                                # Move down 8px for every 20 characters
-                                lines = (len(title) // 20) + (1 if len(title) % 20 > 0 else 0)
-                                artistFrame = self.artistName.frame()
-                                artistFrame.origin.y = 81 - (8 * (lines - 1))  # Base position minus 8px per extra line
-                                self.artistName.setFrame_(artistFrame)
-                                
-                                self.artistName.setStringValue_(artist[:15] if artist else "")
-                                
-                                # Update play/pause button
-                                if playbackRate > 0:
-                                    self.playBtn.setTitle_("❚❚")
-                                else:
-                                    self.playBtn.setTitle_("▶")
-                                
-                                # Update progress slider (only if not recently touched)
-                                if duration > 0:
-                                    percentage = (elapsed / duration) * 100
-                                    # Only update if user hasn't touched slider in last 5 seconds
-                                    if time.time() - self.lastProgressSliderTouch > 5.0:
-                                        self.progressSlider.setDoubleValue_(percentage)
-                                
-                                # Get album artwork if available
-                                artwork = nowPlaying.get(MPMediaItemPropertyArtwork)
-                                print(f"[ART] nowPlaying artwork: {artwork}", flush=True)
-                                if artwork:
-                                    image = artwork.imageWithSize_(NSSize(60, 60))
-                                    print(f"[ART] Got image from nowPlaying: {image}")
-                                    if image:
-                                        self.albumArt.setImage_(image)
-                                        print(f"[ART] Set image from nowPlaying")
-                                else:
-                                    # No artwork from nowPlayingCenter - try Spotify AppleScript
-                                    print("[ART] No artwork from nowPlayingCenter, trying Spotify...")
-                                    try:
-                                        result = subprocess.run(['osascript', '-e',
-                                            'tell application "Spotify" to return artwork url of current track'],
-                                            capture_output=True, text=True, timeout=0.5)
-                                        artworkUrl = result.stdout.strip()
-                                        print(f"[ART] Spotify artwork URL: '{artworkUrl}'")
-                                        if artworkUrl and artworkUrl.startswith('http'):
-                                            print(f"[ART] URL valid, checking cache...")
-                                            # Cache check
-                                            if not hasattr(self, 'lastArtworkUrl') or self.lastArtworkUrl != artworkUrl:
-                                                self.lastArtworkUrl = artworkUrl
-                                                print(f"[ART] Starting download thread...")
-                                                def downloadArtwork():
-                                                    try:
-                                                        print(f"[ART] Downloading from {artworkUrl}")
-                                                        with urllib.request.urlopen(artworkUrl, timeout=3) as response:
-                                                            imageBytes = response.read()
-                                                            print(f"[ART] Downloaded {len(imageBytes)} bytes")
-                                                            imageData = NSData.dataWithBytes_length_(imageBytes, len(imageBytes))
-                                                            image = NSImage.alloc().initWithData_(imageData)
-                                                            if image:
-                                                                print(f"[ART] Created NSImage, setting to albumArt view")
-                                                                self.albumArt.setImage_(image)
-                                                                print(f"[ART] Done!")
-                                                            else:
-                                                                print(f"[ART] Failed to create NSImage")
-                                                    except Exception as e:
-                                                        print(f"[ART] Download error: {e}")
-                                                threading.Thread(target=downloadArtwork, daemon=True).start()
-                                            else:
-                                                print(f"[ART] Using cached (same URL)")
-                                        else:
-                                            print(f"[ART] URL invalid or empty")
-                                    except Exception as e:
-                                        print(f"[ART] Spotify error: {e}")
-                            else:
-                                self.songTitle.setStringValue_("Locked In")
-                                # Reset artist position for default text
-                                artistFrame = self.artistName.frame()
-                                artistFrame.origin.y = 86
-                                self.artistName.setFrame_(artistFrame)
-                                self.artistName.setStringValue_("")
-                                self.playBtn.setTitle_("▶")
-                        else:
-                            # Fall back to AppleScript for Spotify
-                            script = '''
-                            tell application "System Events"
-                                if exists process "Spotify" then
-                                    tell application "Spotify"
-                                        set playerState to player state as string
-                                        if playerState is "playing" or playerState is "paused" then
-                                            return name of current track & "|" & artist of current track & "|" & player position & "|" & (duration of current track / 1000) & "|" & playerState & "|" & artwork url of current track
-                                        else
-                                            return "stopped"
-                                        end if
-                                    end tell
-                                else
-                                    return "not_running"
-                                end if
-                            end tell
-                            '''
-                            result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True)
-
-                            if result.stdout.strip() not in ["stopped", "not_running", ""]:
-                                info = result.stdout.strip().split("|")
-                                if len(info) >= 2:
-                                    self.songTitle.setStringValue_(info[0])
-                                    
-                                    # Check if title wraps to multiple lines and adjust artist position
-                                    # Move down 8px for every 20 characters
-                                    lines = (len(info[0]) // 20) + (1 if len(info[0]) % 20 > 0 else 0)
-                                    artistFrame = self.artistName.frame()
-                                    artistFrame.origin.y = 81 - (8 * (lines - 1))  # Base position minus 8px per extra line
-                                    self.artistName.setFrame_(artistFrame)
-                                    
-                                    self.artistName.setStringValue_(info[1][:15])
-                                    
-                                    if len(info) >= 5:
-                                        if "paused" in info[4]:
-                                            self.playBtn.setTitle_("▶")
-                                        else:
-                                            self.playBtn.setTitle_("❚❚")
-                                    
-                                    if len(info) >= 4:
-                                        try:
-                                            position = float(info[2])
-                                            duration = float(info[3])
-                                            if duration > 0:
-                                                percentage = (position / duration) * 100
-                                                # Only update if user hasn't touched slider in last 5 seconds
-                                                if time.time() - self.lastProgressSliderTouch > 5.0:
-                                                    self.progressSlider.setDoubleValue_(percentage)
-                                        except:
-                                            pass
-
-                                    # Download album artwork if available
-                                    if len(info) >= 6 and info[5]:
-                                        artworkUrl = info[5].strip()
-                                        # Cache check - don't redownload same artwork
-                                        if not hasattr(self, 'lastArtworkUrl') or self.lastArtworkUrl != artworkUrl:
-                                            self.lastArtworkUrl = artworkUrl
-                                            # Download in background thread to avoid blocking UI
-                                            def downloadArtwork():
-                                                try:
-                                                    with urllib.request.urlopen(artworkUrl, timeout=3) as response:
-                                                        imageBytes = response.read()
-                                                        imageData = NSData.dataWithBytes_length_(imageBytes, len(imageBytes))
-                                                        image = NSImage.alloc().initWithData_(imageData)
-                                                        if image:
-                                                            self.albumArt.setImage_(image)
-                                                except:
-                                                    pass
-                                            threading.Thread(target=downloadArtwork, daemon=True).start()
-                            else:
-                                self.songTitle.setStringValue_("Locked In")
-                                # Reset artist position for default text
-                                artistFrame = self.artistName.frame()
-                                artistFrame.origin.y = 86
-                                self.artistName.setFrame_(artistFrame)
-                                self.artistName.setStringValue_("")
-                                self.playBtn.setTitle_("▶")
-                    else:
-                        # Original AppleScript fallback
-                        script = '''
-                        tell application "System Events"
-                            if exists process "Spotify" then
-                                tell application "Spotify"
-                                    set playerState to player state as string
-                                    if playerState is "playing" or playerState is "paused" then
-                                        return name of current track & "|" & artist of current track & "|" & player position & "|" & (duration of current track / 1000) & "|" & playerState
-                                    else
-                                        return "stopped"
-                                    end if
-                                end tell
-                            else
-                                return "not_running"
-                            end if
-                        end tell
-                        '''
-                        result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True)
-                        
-                        if result.stdout.strip() not in ["stopped", "not_running", ""]:
-                            info = result.stdout.strip().split("|")
-                            if len(info) >= 2:
-                                self.songTitle.setStringValue_(info[0])
-                                self.artistName.setStringValue_(info[1][:15])
-                                
-                                if len(info) >= 5:
-                                    if "paused" in info[4]:
-                                        self.playBtn.setTitle_("▶")
-                                    else:
-                                        self.playBtn.setTitle_("❚❚")
-                                
-                                if len(info) >= 4:
-                                    try:
-                                        position = float(info[2])
-                                        duration = float(info[3])
-                                        if duration > 0:
-                                            percentage = (position / duration) * 100
-                                            # Only update if user hasn't touched slider in last 5 seconds
-                                            if time.time() - self.lastProgressSliderTouch > 5.0:
-                                                self.progressSlider.setDoubleValue_(percentage)
-                                    except:
-                                        pass
-                        else:
-                            self.songTitle.setStringValue_("Locked In")
-                            self.artistName.setStringValue_("")
-                            self.playBtn.setTitle_("▶")
+                    # One query to the active player per tick: volume, track, position, duration, state and artwork
+                    info = self.players.snapshot()
+                    self.lastPolledTrackId = info['trackId']
+                    if self.nowPlayingSource:
+                        self.nowPlayingSource.update(info)
+                    self.publishNowPlaying_(NowPlayingState.fromPollInfo(info))
                 except Exception as e:
                     print(f"Media update error: {e}")
-                    self.songTitle.setStringValue_("Locked In")
-                    self.artistName.setStringValue_("")
-                    self.playBtn.setTitle_("▶")
+                    self.publishNowPlaying_(IDLE_NOW_PLAYING)
                 
-                # Schedule next update in 1 second for smoother updates
-                threading.Timer(1.0, self.updateMediaInfo).start()
-            
-            threading.Thread(target=update).start()
+                # Schedule the next poll - the interval follows playback state and
+                # visibility, see AdaptivePollScheduler. Whatever happens, the chain re-arms.
+                try:
+                    interval = self.pollScheduler.mediaInterval(info, self.notificationsActive())
+                except Exception as e:
+                    print(f"Media poll interval error: {e}")
+                    interval = AdaptivePollScheduler.IDLE_INTERVAL
+                runtime.callSoon(finished, interval)
+
+            # The chain's bookkeeping lives on the runtime thread; the timer only
+            # hands the blocking query to a worker, so a slow player delays no timer
+            def start():
+                if self.mediaPollRunning:
+                    self.mediaPollAgain = True  # Poll again as soon as this one is back
+                    return
+                if self.mediaJob:
+                    self.mediaJob.cancel()
+                    self.mediaJob = None
+                self.mediaPollRunning = True
+                backgroundWork.submit(poll)
+
+            def finished(interval):
+                self.mediaPollRunning = False
+                if self.mediaPollAgain:
+                    self.mediaPollAgain = False
+                    start()
+                else:
+                    self.mediaJob = runtime.callLater(interval, start)
+
+            runtime.callSoon(start)
+
+        def notificationsActive(self):
+            """True while player notifications are actually arriving"""
+            return self.nowPlayingSource is not None and self.nowPlayingSource.isActive()
+
+        def publishNowPlaying_(self, state):
+            """Queue a snapshot for the next frame - a newer snapshot replaces an unapplied one"""
+            mainThreadQueue.submit('nowPlaying', self.applyNowPlaying_, state)
+
+        def applyNowPlaying_(self, polled):
+            """Reconcile a polled snapshot with pending commands and show the result (main thread)"""
+            self.showNowPlaying_(self.transport.reconcile(polled))
+
+        def showNowPlaying_(self, state):
+            """Diff a snapshot against what the views show and apply the changes (main thread)"""
+            changes = diffNowPlaying(self.nowPlayingState, state)
+            self.nowPlayingState = state
+            if changes:
+                self.applyNowPlaying_changes_(state, changes)
+
+        def applyNowPlaying_changes_(self, state, changes):
+            """Apply the changed NowPlayingState fields to the views in one batch (main thread)"""
+            if state.state == PLAYER_UNRESPONSIVE:
+                if changes.keys() & {'title', 'artist', 'state'}:
+                    self.showUnresponsiveMedia()
+            elif changes.keys() & {'title', 'artist', 'state'}:
+                if state.title:
+                    self.songTitle.setStringValue_(state.title)
+
+                    # Check if title wraps to multiple lines and adjust artist position
+                    # Move down 8px for every 20 characters
+                    lines = (len(state.title) // 20) + (1 if len(state.title) % 20 > 0 else 0)
+                    artistFrame = self.artistName.frame()
+                    artistFrame.origin.y = 81 - (8 * (lines - 1))  # Base position minus 8px per extra line
+                    self.artistName.setFrame_(artistFrame)
+
+                    self.artistName.setStringValue_(state.artist[:15])
+                else:
+                    self.showIdleMedia()
+
+            if 'state' in changes:
+                self.playBtn.setTitle_("❚❚" if state.isPlaying else "▶")
+
+            # Update volume slider to current system volume (only if not recently touched)
+            if 'volume' in changes and state.volume is not None:
+                # Only update if user hasn't touched slider in last 5 seconds
+                if time.time() - self.lastVolumeSliderTouch > 5.0:
+                    self.volumeSlider.setDoubleValue_(state.volume)
+
+            # The progress slider works in seconds of the current track
+            if 'duration' in changes and state.duration > 0:
+                self.progressSlider.setMaxValue_(state.duration)
+
+            # Update progress slider from the playback clock
+            if changes.keys() & {'trackId', 'state', 'position', 'duration'}:
+                self.playbackClock.sample(state.position, 1.0 if state.isPlaying else 0.0,
+                                          state.duration, state.trackId or state.title)
+                self.startProgressFrames()
+
+            if 'artworkKey' in changes:
+                if state.artworkKey.startswith(NOW_PLAYING_ARTWORK_PREFIX):
+                    self.loadNowPlayingArtwork_(state.artworkKey)
+                else:
+                    self.loadArtworkFromUrl_(state.artworkKey)
+
+        def drawDateTime_(self, now):
+            """Show the date and time labels for now (main thread)"""
+            yesterday = now - timedelta(days=1)
+            tomorrow = now + timedelta(days=1)
+
+            self.todayDate.setStringValue_(str(int(now.strftime("%d"))))
+            self.yesterdayDate.setStringValue_(str(int(yesterday.strftime("%d"))))
+            self.tomorrowDate.setStringValue_(str(int(tomorrow.strftime("%d"))))
+            self.timeLabel.setStringValue_(now.strftime("%I:%M"))
+            self.dayLabel.setStringValue_(now.strftime("%A"))
+
+        def islandDidExpand(self):
+            """Switch to expanded intervals and refresh everything right away"""
+            self.pollScheduler.setExpanded(True)
+            self.updateMediaInfo()
+            self.updateDateTime()
+            self.startProgressFrames()
+
+        def islandDidCollapse(self):
+            """Let the next ticks fall back to collapsed intervals"""
+            self.pollScheduler.setExpanded(False)
+
+        def runningAppChanged_running_(self, bundleId, running):
+            """Poll right away when a player launches or quits"""
+            if any(backend.bundleId == bundleId for backend in self.players.available):
+                print(f"[PLAYER] {bundleId} {'launched' if running else 'quit'}", flush=True)
+                self.updateMediaInfo()
+
+        def nowPlayingChanged_(self, info):
+            """Apply a now-playing change pushed by a player notification"""
+            print(f"[NOTIFY] {info['player']} {info['state']}: '{info['track']}'", flush=True)
+            if not self.players.notified(info):
+                print(f"[NOTIFY] Ignored, {info['player']} is not the active player", flush=True)
+                return
+            self.publishNowPlaying_(NowPlayingState.fromPollInfo(info))
+
+            # Notifications carry no artwork or volume - poll once when the track changes
+            if info['trackId'] != self.lastPolledTrackId:
+                self.lastPolledTrackId = info['trackId']
+                self.updateMediaInfo()
+
+        def startProgressFrames(self):
+            """Animate the progress slider from the playback clock"""
+            def resume():
+                if self.progressJob is None:
+                    self.progressFrame()
+
+            # Only the runtime thread touches progressJob
+            runtime.callSoon(resume)
+
+        def progressFrame(self):
+            """Draw one progress frame and keep going while expanded and playing"""
+            mainThreadQueue.submit('progress', self.drawProgressFrame)
+            if self.pollScheduler.expanded and self.playbackClock.isRunning():
+                self.progressJob = runtime.callLater(PROGRESS_FRAME_INTERVAL, self.progressFrame)
+            else:
+                self.progressJob = None
+
+        def drawProgressFrame(self):
+            """Move the progress slider to the extrapolated position"""
+            # Only update if user hasn't touched slider in last 5 seconds
+            if self.playbackClock.duration > 0 and time.time() - self.lastProgressSliderTouch > 5.0:
+                self.progressSlider.setDoubleValue_(self.playbackClock.position())
+
+        def showIdleMedia(self):
+            """Reset the media section when nothing is playing"""
+            self.songTitle.setStringValue_("Locked In")
+            # Reset artist position for default text
+            artistFrame = self.artistName.frame()
+            artistFrame.origin.y = 86
+            self.artistName.setFrame_(artistFrame)
+            self.artistName.setStringValue_("")
+            self.playBtn.setTitle_("▶")
+
+        def showUnresponsiveMedia(self):
+            """Tell the user the player stopped answering instead of freezing on stale info"""
+            self.showIdleMedia()
+            self.songTitle.setStringValue_("Player unresponsive")
+            self.artistName.setStringValue_("Retrying…")
+
+        def showCachedArtwork_(self, cached):
+            """Show artwork and theme the slider borders from its palette (main thread)"""
+            self.albumArt.setImage_(cached.image)
+            self.artworkBackdrop.setImage_(cached.backdrop)
+            self.progressSlider.layer().setBorderColor_(sliderBorderColor(cached.palette))
+            self.volumeSlider.layer().setBorderColor_(sliderBorderColor(cached.palette))
+
+        def showLastArtwork(self):
+            """Show the artwork from the previous launch instead of the placeholder
+
+            Reading and decoding happen on the artwork pool, so a newer track's
+            artwork that arrives first wins and startup is not held up.
+            """
+            diskCache = self.artworkDiskCache
+            if not diskCache:
+                return
+
+            def restoreArtwork():
+                artworkUrl, imageBytes = diskCache.lastEntry()
+                if imageBytes is None:
+                    raise ValueError("no artwork from the previous launch")
+                image = thumbnailFromBytes(imageBytes)
+                if not image:
+                    raise ValueError("could not create NSImage")
+                palette = paletteFromJson(diskCache.metadataFor(artworkUrl).get('palette'))
+                cached = cachedArtworkFromThumbnail(image, palette)
+                self.artworkCache.put(artworkUrl, cached, cachedArtworkCost(cached))
+                return cached
+
+            def showArtwork(cached):
+                mainThreadQueue.submit('albumArt', self.showCachedArtwork_, cached)
+                print(f"[ART] Restored last artwork from disk")
+
+            self.artworkPool.request(LAST_ARTWORK_KEY, restoreArtwork, showArtwork)
+
+        def loadNowPlayingArtwork_(self, artworkKey):
+            """Render MediaPlayer artwork to a thumbnail once per track, off the main thread"""
+            cached = self.artworkCache.get(artworkKey)
+            if cached is not None:
+                self.artworkPool.advance()  # Drop any download still running for an older track
+                self.showCachedArtwork_(cached)
+                return
+            artwork = self.players.backendNamed('mediaplayer').artwork()
+            if artwork is None:
+                return
+            pixels = ARTWORK_POINT_SIZE * ARTWORK_BACKING_SCALE
+
+            def renderArtwork():
+                source = artwork.imageWithSize_(NSSize(pixels, pixels))
+                if not source:
+                    raise ValueError("no artwork image")
+                image = makeArtworkThumbnail(source)
+                cached = cachedArtworkFromThumbnail(image)
+                self.artworkCache.put(artworkKey, cached, cachedArtworkCost(cached))
+                return cached
+
+            def showArtwork(cached):
+                mainThreadQueue.submit('albumArt', self.showCachedArtwork_, cached)
+                print(f"[ART] Set image from nowPlaying")
+
+            self.artworkPool.request(artworkKey, renderArtwork, showArtwork)
+
+        def loadArtworkFromUrl_(self, artworkUrl):
+            """Download album artwork unless it is already showing"""
+            if not artworkUrl or not artworkUrl.startswith('http'):
+                return
+
+            # Cache check - don't redownload same artwork
+            if hasattr(self, 'lastArtworkUrl') and self.lastArtworkUrl == artworkUrl:
+                return
+            self.lastArtworkUrl = artworkUrl
+
+            # Artwork seen recently is still decoded in memory
+            cached = self.artworkCache.get(artworkUrl)
+            if cached is not None:
+                print(f"[ART] Memory cache hit for {artworkUrl}")
+                self.artworkPool.advance()
+                mainThreadQueue.submit('albumArt', self.showCachedArtwork_, cached)
+                if self.artworkDiskCache:
+                    backgroundWork.submit(self.artworkDiskCache.setLastKey, artworkUrl)
+                return
+
+            # Read from disk or download on the artwork pool to avoid blocking UI
+            diskCache = self.artworkDiskCache
+            def fetchArtwork():
+                imageBytes = diskCache.get(artworkUrl) if diskCache else None
+                fromDisk = imageBytes is not None
+                result = None
+                if fromDisk:
+                    print(f"[ART] Disk cache hit for {artworkUrl}")
+                else:
+                    # Ask conditionally if an expired copy is still on disk
+                    etag, lastModified = diskCache.validatorsFor(artworkUrl) if diskCache else (None, None)
+                    print(f"[ART] Downloading from {artworkUrl}")
+                    result = self.artworkFetcher.fetch(artworkUrl, etag, lastModified)
+                    if result.notModified:
+                        imageBytes = diskCache.revalidated(artworkUrl)
+                        fromDisk = imageBytes is not None
+                        if not fromDisk:
+                            result = self.artworkFetcher.fetch(artworkUrl)
+                    if not fromDisk:
+                        imageBytes = result.body
+                # Decode once and keep only the display sized thumbnail
+                image = thumbnailFromBytes(imageBytes)
+                if not image:
+                    raise ValueError("could not create NSImage")
+                # The palette is extracted once and then travels with the cache entry
+                palette = paletteFromJson(diskCache.metadataFor(artworkUrl).get('palette')) if fromDisk else None
+                cached = cachedArtworkFromThumbnail(image, palette)
+                if diskCache and not fromDisk:
+                    encoded = thumbnailBytes(image)
+                    if encoded:
+                        diskCache.put(artworkUrl, encoded, etag=result.etag, lastModified=result.lastModified,
+                                      palette=cached.palette)
+                # Cached even if the track has moved on - it may come back
+                self.artworkCache.put(artworkUrl, cached, cachedArtworkCost(cached))
+                return cached
+
+            def showArtwork(cached):
+                mainThreadQueue.submit('albumArt', self.showCachedArtwork_, cached)
+                if diskCache:
+                    diskCache.setLastKey(artworkUrl)
+
+            self.artworkPool.request(artworkUrl, fetchArtwork, showArtwork)
         
         def playPause_(self, sender):
             # Update button immediately - no spam check, always respond instantly
-            if self.playBtn.title() == "❚❚":
-                self.playBtn.setTitle_("▶")
-            else:
-                self.playBtn.setTitle_("❚❚")
-
-            # Send the command in background
-            threading.Thread(target=lambda: subprocess.run(
-                ['osascript', '-e', 'tell application "Spotify" to playpause'], capture_output=True, timeout=0.5
-            )).start()
+            self.runOptimisticCommand_withArguments_('playPause', ())
         
         def nextTrack_(self, sender):
-            if not self.checkSpam_("nextTrack"):
-                threading.Thread(target=lambda: subprocess.run(
-                    ['osascript', '-e', 'tell application "Spotify" to next track'], capture_output=True
-                )).start()
+            if self.rateLimiter.allow("nextTrack", 'transport'):
+                self.runOptimisticCommand_withArguments_('nextTrack', ())
         
         def previousTrack_(self, sender):
-            if not self.checkSpam_("previousTrack"):
-                threading.Thread(target=lambda: subprocess.run(
-                    ['osascript', '-e', 'tell application "Spotify" to previous track'], capture_output=True
-                )).start()
-        
+            if self.rateLimiter.allow("previousTrack", 'transport'):
+                self.runOptimisticCommand_withArguments_('previousTrack', ())
+
+        def runOptimisticCommand_withArguments_(self, name, args):
+            """Show what a command will do right away, then queue it (main thread)"""
+            predicted = self.transport.predict(name, *args)
+            if predicted is not None:
+                self.showNowPlaying_(predicted)
+            self.runPlayerCommand_withArguments_(name, args)
+
+        def runPlayerCommand_withArguments_(self, name, args):
+            """Queue a command for the player it targets right now"""
+            target = self.players.commandTarget(name)
+            if target is None:
+                print(f"[PLAYER] No active player for {name}")
+                mainThreadQueue.submit(f'rollback:{name}', self.rollbackCommand_, name)
+                return
+            self.commandQueue.submit(target, name, *args)
+
+        def playerCommandFailed_error_(self, command, error):
+            """A queued command failed or expired - undo its prediction (command worker)"""
+            mainThreadQueue.submit(f'rollback:{command.name}', self.rollbackCommand_, command.name)
+
+        def rollbackCommand_(self, name):
+            """Put the views back to the polled state (main thread)"""
+            state = self.transport.fail(name)
+            if state is not None:
+                print(f"[PLAYER] Rolled back {name}")
+                self.showNowPlaying_(state)
+
+        def executePlayerCommand_name_arguments_(self, target, name, args):
+            """Run one queued command (player command worker)"""
+            self.players.command(name, *args, target=target)
+
         def seekTrack_(self, sender):
-            """Seek to position in track based on slider - smooth 60fps with debounced commands"""
+            """Seek to position in track based on slider - smooth 60fps with coalesced commands"""
             self.lastProgressSliderTouch = time.time()  # Mark slider as being touched
-            currentTime = time.time()
-
-            # Store the current slider value for debounced execution
-            self.pendingSeekValue = self.progressSlider.doubleValue()
-
-            # Only execute command if 0.1 seconds have passed since last command (max 10 updates/sec)
-            if currentTime - self.lastSeekCommandTime > 0.1:
-                self.lastSeekCommandTime = currentTime
-                seekValue = self.pendingSeekValue
-
-                # Execute in background thread to not block UI
-                def executeSeek():
-                    try:
-                        # Get current track duration from Spotify
-                        script = '''
-                        tell application "Spotify"
-                            set trackDuration to (duration of current track) / 1000
-                            return trackDuration
-                        end tell
-                        '''
-                        result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True, timeout=0.5)
-                        duration = float(result.stdout.strip())
-                        position = (seekValue / 100) * duration
-
-                        # Set position in Spotify
-                        seekScript = f'''
-                        tell application "Spotify"
-                            set player position to {position}
-                        end tell
-                        '''
-                        subprocess.run(['osascript', '-e', seekScript], capture_output=True, timeout=0.5)
-                    except:
-                        pass
-
-                threading.Thread(target=executeSeek).start()
-        
+            # The slider max is the polled duration, so its value already is the position
+            state = self.nowPlayingState
+            if state is None or state.duration <= 0:
+                return
+            position = min(self.progressSlider.doubleValue(), state.duration)
+            self.showNowPlaying_(self.transport.predict('seek', position))
+            self.seekChannel.push(position)
+
+        def sendSeek_(self, position):
+            """Seek the active player to a position in seconds - one command (runtime thread)"""
+            self.runPlayerCommand_withArguments_('seek', (position,))
+
         def changeVolume_(self, sender):
-            """Change system volume based on slider - smooth 60fps with debounced commands"""
+            """Change system volume based on slider - smooth 60fps with coalesced commands"""
             self.lastVolumeSliderTouch = time.time()  # Mark slider as being touched
-            currentTime = time.time()
-
-            # Store the current slider value for debounced execution
-            self.pendingVolumeValue = self.volumeSlider.doubleValue()
-
-            # Only execute command if 0.05 seconds have passed since last command (max 20 updates/sec for volume)
-            if currentTime - self.lastVolumeCommandTime > 0.05:
-                self.lastVolumeCommandTime = currentTime
-                volume = int(self.pendingVolumeValue)
-
-                # Execute in background thread to not block UI
-                def executeVolumeChange():
-                    try:
-                        # Use osascript to set system volume (0-100 scale)
-                        script = f'set volume output volume {volume}'
-                        subprocess.run(['osascript', '-e', script], capture_output=True, timeout=0.3)
-                    except:
-                        pass
-
-                threading.Thread(target=executeVolumeChange).start()
+            volume = int(self.volumeSlider.doubleValue())
+            self.showNowPlaying_(self.transport.predict('setVolume', volume))
+            self.volumeChannel.push(volume)
+
+        def sendVolume_(self, volume):
+            """Set system volume through the player backend, 0-100 scale (runtime thread)"""
+            self.runPlayerCommand_withArguments_('setVolume', (volume,))
         
         def createAppIconButton_x_y_action_(self, appPath, x, y, action):
             """Create a button with actual app icon"""
@@ -1237,66 +4100,23 @@ try:
 
 
         def loadSettings(self):
-            """Load settings from plist file"""
-            try:
-                import plistlib
-                import os
-
-                # Use ~/Library/Preferences for settings
-                prefs_path = os.path.expanduser("~/Library/Preferences/com.dynamicisland.plist")
-
-                if os.path.exists(prefs_path):
-                    with open(prefs_path, 'rb') as f:
-                        settings = plistlib.load(f)
-                        self.quickAppPaths = settings.get('quickAppPaths', [None, None, None, None])
-                        self.presetApps = settings.get('presetApps', {
-                            "Programming": [],
-                            "Chilling": [],
-                            "Debugging": [],
-                            "Focus Mode": []
-                        })
-                else:
-                    self.quickAppPaths = [None, None, None, None]
-                    self.presetApps = {
-                        "Programming": [],
-                        "Chilling": [],
-                        "Debugging": [],
-                        "Focus Mode": []
-                    }
-            except Exception as e:
-                print(f"Error loading settings: {e}")
-                self.quickAppPaths = [None, None, None, None]
-                self.presetApps = {
-                    "Programming": [],
-                    "Chilling": [],
-                    "Debugging": [],
-                    "Focus Mode": []
-                }
+            """Load settings from the in-memory settings store"""
+            # Empty Quick Access slots are stored as "" - plists can't hold None
+            quickAppPaths = settingsStore.get('quickAppPaths') or []
+            self.quickAppPaths = [path or None for path in quickAppPaths[:4]]
+            self.quickAppPaths += [None] * (4 - len(self.quickAppPaths))
+            self.presetApps = settingsStore.get('presetApps') or {
+                "Programming": [],
+                "Chilling": [],
+                "Debugging": [],
+                "Focus Mode": []
+            }
 
         def saveSettings(self):
-            """Save settings to plist file"""
-            try:
-                import plistlib
-                import os
-
-                # Prepare settings dictionary
-                settings = {
-                    'quickAppPaths': self.quickAppPaths
-                }
-
-                if hasattr(self, 'presetApps'):
-                    settings['presetApps'] = self.presetApps
-
-                # Save to ~/Library/Preferences
-                prefs_path = os.path.expanduser("~/Library/Preferences/com.dynamicisland.plist")
-                os.makedirs(os.path.dirname(prefs_path), exist_ok=True)
-
-                with open(prefs_path, 'wb') as f:
-                    plistlib.dump(settings, f)
-
-                print("Settings saved successfully")
-            except Exception as e:
-                print(f"Error saving settings: {e}")
+            """Save settings - the store writes the plist shortly after, off the main thread"""
+            settingsStore.set('quickAppPaths', [path or "" for path in self.quickAppPaths])
+            if hasattr(self, 'presetApps'):
+                settingsStore.set('presetApps', self.presetApps)
         
         def createCapsuleButton_x_y_action_(self, title, x, y, action):
             """Create a fully rounded capsule button"""
@@ -1345,15 +4165,6 @@ try:
 
             return button
         
-        def checkSpam_(self, buttonName):
-            """Anti-spam protection - 1 second cooldown"""
-            currentTime = time.time()
-            if buttonName in self.lastClickTime:
-                if currentTime - self.lastClickTime[buttonName] < 1.0:
-                    return True  # Is spam
-            self.lastClickTime[buttonName] = currentTime
-            return False
-        
         # Quick Access actions
         def launchQuickApp0_(self, sender):
             self.launchQuickApp_(0)
@@ -1370,49 +4181,79 @@ try:
         def launchQuickApp_(self, index):
             if index < len(self.quickAppPaths):
                 appPath = self.quickAppPaths[index]
-                if not self.checkSpam_(f"quickapp_{index}"):
-                    threading.Thread(target=lambda: subprocess.run(
+                if self.rateLimiter.allow(f"quickapp_{index}", 'quickApp'):
+                    backgroundWork.submit(lambda: subprocess.run(
                         ['open', appPath], capture_output=True
-                    )).start()
+                    ))
         
         def updateQuickAccessButton_withPath_(self, index, appPath):
             """Update a Quick Access button with new app"""
             if index < len(self.quickButtons) and index < len(self.quickAppPaths):
                 self.quickAppPaths[index] = appPath
+                self.rebuildQuickAccessButton_(index)
+
+                # Save settings after updating
+                self.saveSettings()
 
-                # Get position of old button
-                oldButton = self.quickButtons[index]
-                frame = oldButton.frame()
+        def rebuildQuickAccessButton_(self, index):
+            """Replace a Quick Access button with one for quickAppPaths[index]"""
+            appPath = self.quickAppPaths[index]
 
-                # Remove old button
-                oldButton.removeFromSuperview()
+            # Get position of old button
+            oldButton = self.quickButtons[index]
+            frame = oldButton.frame()
 
-                # Create new button with updated app
-                actions = [self.launchQuickApp0_, self.launchQuickApp1_, self.launchQuickApp2_, self.launchQuickApp3_]
-                if appPath:
-                    newButton = self.createAppIconButton_x_y_action_(appPath, frame.origin.x, frame.origin.y, actions[index])
-                else:
-                    newButton = self.createEmptyQuickAccessButtonAtX_y_index_(frame.origin.x, frame.origin.y, index)
-                self.quickButtons[index] = newButton
+            # Remove old button
+            oldButton.removeFromSuperview()
 
-                # Save settings after updating
-                self.saveSettings()
+            # Create new button with updated app
+            actions = [self.launchQuickApp0_, self.launchQuickApp1_, self.launchQuickApp2_, self.launchQuickApp3_]
+            if appPath:
+                newButton = self.createAppIconButton_x_y_action_(appPath, frame.origin.x, frame.origin.y, actions[index])
+            else:
+                newButton = self.createEmptyQuickAccessButtonAtX_y_index_(frame.origin.x, frame.origin.y, index)
+            self.quickButtons[index] = newButton
+
+        def settingsDidChange_(self, changedKeys):
+            """The settings file was edited from outside (watcher thread)"""
+            # Keyed so a burst of reloads is applied once - the apply step diffs everything anyway
+            mainThreadQueue.submit('settingsReload', self.applySettingsReload)
+
+        def applySettingsReload(self):
+            """Rebuild only the Quick Access buttons and preset displays that changed (main thread)"""
+            oldPaths = list(self.quickAppPaths)
+            oldPresets = dict(self.presetApps)
+            self.loadSettings()
+
+            for index, (old, new) in enumerate(zip(oldPaths, self.quickAppPaths)):
+                if old != new and index < len(self.quickButtons):
+                    print(f"[SETTINGS] Quick Access {index} -> {new}")
+                    self.rebuildQuickAccessButton_(index)
+
+            changedPresets = [key for key in set(oldPresets) | set(self.presetApps)
+                              if oldPresets.get(key) != self.presetApps.get(key)]
+            window = getattr(self, 'settingsWindow', None)
+            settingsView = getattr(window, 'settingsView', None) if window else None
+            if settingsView is not None:
+                settingsView.presetApps = self.presetApps
+                for presetKey in changedPresets:
+                    settingsView.updatePresetDisplay_(presetKey)
         
         # Setup actions
         def setupProgramming_(self, sender):
-            if not self.checkSpam_("programming"):
+            if self.rateLimiter.allow("programming", 'preset'):
                 self.launchPresetApps_("Programming")
 
         def setupChilling_(self, sender):
-            if not self.checkSpam_("chilling"):
+            if self.rateLimiter.allow("chilling", 'preset'):
                 self.launchPresetApps_("Chilling")
 
         def setupDebugging_(self, sender):
-            if not self.checkSpam_("debugging"):
+            if self.rateLimiter.allow("debugging", 'preset'):
                 self.launchPresetApps_("Debugging")
 
         def setupFocus_(self, sender):
-            if not self.checkSpam_("focus"):
+            if self.rateLimiter.allow("focus", 'preset'):
                 self.launchPresetApps_("Focus Mode")
 
         def launchPresetApps_(self, presetName):
@@ -1429,7 +4270,7 @@ try:
                             print(f"Failed to launch {appPath}: {e}")
                 else:
                     print(f"No apps configured for preset: {presetName}")
-            threading.Thread(target=launch).start()
+            backgroundWork.submit(launch)
     
     class DynamicIslandView(NSView):
         def initWithFrame_(self, frame):
@@ -1488,6 +4329,9 @@ try:
             self.isExpanded = True
             self.setupControlPanel()
 
+            # Poll immediately instead of waiting out a collapsed-state interval
+            self.controlPanel.islandDidExpand()
+
             window = self.window()
 
             # Calculate centered expansion frame
@@ -1504,14 +4348,7 @@ try:
             self.animateWindow_toFrame_duration_(window, frame, 0.25)
             
             # Show controls after animation
-            def showControls():
-                time.sleep(0.2)
-                self.performSelectorOnMainThread_withObject_waitUntilDone_(
-                    objc.selector(self.showControlPanel, signature=b'v@:'),
-                    None,
-                    False
-                )
-            threading.Thread(target=showControls).start()
+            runtime.callLater(0.2, mainThreadQueue.submit, 'showControlPanel', self.showControlPanel)
             
             # Strong haptic feedback pulse on hover
             performer = NSHapticFeedbackManager.defaultPerformer()
@@ -1528,14 +4365,8 @@ try:
         
         def checkMousePositionDelayed(self):
             """Check mouse position after a small delay to ensure proper closing"""
-            def checkPosition():
-                time.sleep(0.1)  # Small delay to let mouse settle
-                self.performSelectorOnMainThread_withObject_waitUntilDone_(
-                    objc.selector(self.checkAndClose, signature=b'v@:'),
-                    None,
-                    False
-                )
-            threading.Thread(target=checkPosition).start()
+            # Small delay to let mouse settle
+            runtime.callLater(0.1, mainThreadQueue.submit, 'checkAndClose', self.checkAndClose)
         
         def checkAndClose(self):
             """Actually check mouse position and close if outside buffer"""
@@ -1560,6 +4391,7 @@ try:
                 
                 if self.controlPanel:
                     self.controlPanel.setHidden_(True)
+                    self.controlPanel.islandDidCollapse()
 
                 # Calculate centered contracted frame
                 screen = NSScreen.mainScreen()
@@ -1599,6 +4431,9 @@ try:
             x = (screenFrame.size.width - width) / 2
             y = screenFrame.size.height - height + 12
             
+            # One background runtime owns every periodic and delayed job
+            runtime.start()
+
             # Create window
             self.window = NSWindow.alloc().initWithContentRect_styleMask_backing_defer_(
                 NSMakeRect(x, y, width, height),
@@ -1645,6 +4480,10 @@ try:
 
             print("Dynamic Island Clean running - optimized for performance")
 
+        def applicationWillTerminate_(self, notification):
+            """Write any settings still waiting for their debounced save"""
+            settingsStore.flush()
+
         def screenDidChange_(self, notification):
             """Recenter window when screen configuration changes"""
             self.recenterWindow()
@@ -1666,42 +4505,47 @@ try:
 
         def startPositionMonitoring(self):
             """Monitor window position and fix drift"""
+            def checkDrift():
+                """Compare the window with the centered position (main thread)"""
+                try:
+                    # Check if window has drifted from center
+                    screen = NSScreen.mainScreen()
+                    screenFrame = screen.frame()
+                    windowFrame = self.window.frame()
+
+                    # Calculate expected center position
+                    expectedX = (screenFrame.size.width - windowFrame.size.width) / 2
+                    expectedY = screenFrame.size.height - windowFrame.size.height + 12
+
+                    # Allow 5px tolerance for positioning
+                    if (abs(windowFrame.origin.x - expectedX) > 5 or
+                        abs(windowFrame.origin.y - expectedY) > 5):
+                        # Window has drifted, recenter it
+                        self.recenterWindow()
+                except:
+                    pass
+
             def monitor():
-                while True:
-                    try:
-                        time.sleep(5)  # Check every 5 seconds
-
-                        # Check if window has drifted from center
-                        screen = NSScreen.mainScreen()
-                        screenFrame = screen.frame()
-                        windowFrame = self.window.frame()
-
-                        # Calculate expected center position
-                        expectedX = (screenFrame.size.width - windowFrame.size.width) / 2
-                        expectedY = screenFrame.size.height - windowFrame.size.height + 12
-
-                        # Allow 5px tolerance for positioning
-                        if (abs(windowFrame.origin.x - expectedX) > 5 or
-                            abs(windowFrame.origin.y - expectedY) > 5):
-                            # Window has drifted, recenter it
-                            self.performSelectorOnMainThread_withObject_waitUntilDone_(
-                                objc.selector(self.recenterWindow, signature=b'v@:'),
-                                None,
-                                False
-                            )
-                    except:
-                        pass
-
-            threading.Thread(target=monitor, daemon=True).start()
+                # The runtime only keeps time - AppKit is only touched on the main thread
+                mainThreadQueue.submit('checkDrift', checkDrift)
+
+                # Check again in 5 seconds
+                runtime.callLater(5, monitor)
+
+            runtime.callLater(5, monitor)
     
     # Run the app
-    app = NSApplication.sharedApplication()
-    delegate = DynamicIslandDelegate.alloc().init()
-    app.setDelegate_(delegate)
-    AppHelper.runEventLoop()
+    if __name__ == "__main__":
+        app = NSApplication.sharedApplication()
+        delegate = DynamicIslandDelegate.alloc().init()
+        app.setDelegate_(delegate)
+        AppHelper.runEventLoop()
     
 except ImportError:
-    print("PyObjC not installed. Installing...")
-    import subprocess
-    subprocess.run(['pip3', 'install', 'pyobjc-framework-Cocoa'])
-    print("Please run the script again.")
\ No newline at end of file
+    # Only offer to install PyObjC when launched directly, so the AppKit-free
+    # helpers above can still be imported on their own
+    if __name__ == "__main__":
+        print("PyObjC not installed. Installing...")
+        import subprocess
+        subprocess.run(['pip3', 'install', 'pyobjc-framework-Cocoa'])
+        print("Please run the script again.")
\ No newline at end of file
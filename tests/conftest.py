@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# dynamic_island.py is a single module at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    """Injected in place of time.monotonic; tests move it forward by hand"""
+
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+    def advance(self, seconds):
+        self.time += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
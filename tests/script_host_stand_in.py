@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Stand-in for the osascript script host, for running ScriptHost off macOS
+
+Speaks the same protocol as SCRIPT_HOST_SOURCE: one JSON request per line on
+stdin, one JSON reply per line on stdout, scripts run one at a time. Scripts:
+
+    sleep <seconds> [result]   wait, then answer result (default "slept")
+    fail <message>             answer with an error
+    exit                       quit without answering
+    anything else              echoed back
+
+With `-e <script>` it runs a single script and exits, like `osascript -e`.
+"""
+
+import json
+import sys
+import time
+
+
+def runScript(script):
+    words = script.split(' ', 2)
+    if words[0] == 'sleep':
+        time.sleep(float(words[1]))
+        return words[2] if len(words) > 2 else 'slept'
+    if words[0] == 'fail':
+        raise RuntimeError(script[5:])
+    if words[0] == 'exit':
+        sys.exit(0)
+    return script
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '-e':
+        print(runScript(sys.argv[2]))
+        return
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        try:
+            reply = {'id': request['id'], 'ok': True, 'result': runScript(request['script'])}
+        except RuntimeError as e:
+            reply = {'id': request['id'], 'ok': False, 'error': str(e)}
+        sys.stdout.write(json.dumps(reply) + '\n')
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
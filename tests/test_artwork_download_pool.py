@@ -0,0 +1,137 @@
+import collections
+import http.server
+import threading
+import time
+import urllib.parse
+
+import pytest
+
+from dynamic_island import ArtworkDownloadPool, ArtworkFetcher
+
+
+class ArtworkHandler(http.server.BaseHTTPRequestHandler):
+    """/art/<name>?delay=<seconds> answers <name> as the body after the delay"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parts = urllib.parse.urlsplit(self.path)
+        self.server.hits[parts.path] += 1
+        delay = float(urllib.parse.parse_qs(parts.query).get('delay', ['0'])[0])
+        time.sleep(delay)
+        if not parts.path.startswith('/art/'):
+            self.send_error(404)
+            return
+        body = parts.path[len('/art/'):].encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), ArtworkHandler)
+    server.daemon_threads = True
+    server.hits = collections.Counter()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = ArtworkFetcher(timeout=5.0)
+    yield fetcher
+    fetcher.close()
+
+
+def artworkUrl(server, name, delay=0.0):
+    return f"http://127.0.0.1:{server.server_address[1]}/art/{name}?delay={delay}"
+
+
+def waitFor(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def settled(pool, downloads):
+    """True once `downloads` fetches finished, failed or were cancelled"""
+    stats = pool.stats()
+    return stats['fetched'] + stats['failed'] + stats['cancelled'] >= downloads
+
+
+def test_requests_for_the_same_url_share_one_download(server, fetcher):
+    pool = ArtworkDownloadPool(workers=2, log=lambda message: None)
+    url = artworkUrl(server, "cover", delay=0.2)
+    shown = []
+    for _ in range(5):
+        pool.request(url, lambda: fetcher.fetch(url), lambda result: shown.append(result.body))
+
+    assert waitFor(lambda: settled(pool, 1) and shown)
+    assert server.hits['/art/cover'] == 1
+    assert shown == [b"cover"]  # Only the newest request's callback runs
+    assert pool.stats()['merged'] == 4
+
+
+def test_slow_result_for_a_skipped_track_is_dropped(server, fetcher):
+    pool = ArtworkDownloadPool(workers=2, log=lambda message: None)
+    slow, fast = artworkUrl(server, "old", delay=0.4), artworkUrl(server, "new", delay=0.05)
+    shown = []
+    pool.request(slow, lambda: fetcher.fetch(slow), lambda result: shown.append(result.body))
+    assert waitFor(lambda: server.hits['/art/old'] == 1)  # Both downloads are running
+    pool.request(fast, lambda: fetcher.fetch(fast), lambda result: shown.append(result.body))
+
+    assert waitFor(lambda: settled(pool, 2) and shown)
+    assert server.hits['/art/old'] == 1  # Downloaded, but arrived last
+    assert shown == [b"new"]
+    assert pool.stats()['stale'] == 1
+
+
+def test_queued_download_nobody_wants_is_cancelled(server, fetcher):
+    pool = ArtworkDownloadPool(workers=1, log=lambda message: None)
+    busy = artworkUrl(server, "busy", delay=0.3)
+    skipped = artworkUrl(server, "skipped")
+    wanted = artworkUrl(server, "wanted")
+    shown = []
+    pool.request(busy, lambda: fetcher.fetch(busy), lambda result: shown.append(result.body))
+    assert waitFor(lambda: server.hits['/art/busy'] == 1)  # The only worker is taken
+    for url in (skipped, wanted):
+        pool.request(url, lambda url=url: fetcher.fetch(url), lambda result: shown.append(result.body))
+
+    assert waitFor(lambda: settled(pool, 3) and shown)
+    assert server.hits['/art/skipped'] == 0  # Never started
+    assert shown == [b"wanted"]
+    assert pool.stats()['cancelled'] == 1
+
+
+def test_failed_download_reaches_no_callback(server, fetcher):
+    errors = []
+    pool = ArtworkDownloadPool(workers=1, log=errors.append)
+    url = f"http://127.0.0.1:{server.server_address[1]}/missing"
+    shown = []
+    pool.request(url, lambda: fetcher.fetch(url), shown.append)
+
+    assert waitFor(lambda: settled(pool, 1))
+    assert shown == []
+    assert pool.stats()['failed'] == 1
+    assert "HTTP 404" in errors[0]
+
+
+def test_workers_are_bounded(server, fetcher):
+    pool = ArtworkDownloadPool(workers=2, log=lambda message: None)
+    for index in range(10):
+        url = artworkUrl(server, f"track{index}", delay=0.05)
+        pool.request(url, lambda url=url: fetcher.fetch(url), lambda result: None)
+    assert waitFor(lambda: settled(pool, 10))
+    assert pool.stats()['workers'] == 2
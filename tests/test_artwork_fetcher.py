@@ -0,0 +1,177 @@
+import collections
+import http.server
+import threading
+import time
+import urllib.parse
+
+import pytest
+
+from dynamic_island import ArtworkFetcher, ArtworkFetchError
+
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+class ValidatingHandler(http.server.BaseHTTPRequestHandler):
+    """/art/<name> with validators, /redirect/<hops>/<name> and ?delay=/?drop= knobs
+
+    ?drop=1 closes the kept-alive connection after answering, without saying
+    so, the way a server times out an idle connection.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parts = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(parts.query)
+        self.server.hits[parts.path] += 1
+        self.server.headers.append(self.headers)
+        time.sleep(float(query.get('delay', ['0'])[0]))
+        if query.get('drop') == ['1']:
+            self.close_connection = True
+
+        if parts.path.startswith('/redirect/'):
+            hops, name = parts.path[len('/redirect/'):].split('/', 1)
+            hops = int(hops)
+            location = f"/redirect/{hops - 1}/{name}" if hops > 1 else f"/art/{name}"
+            self.send_response(302)
+            self.send_header('Location', location)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if not parts.path.startswith('/art/'):
+            self.send_error(404)
+            return
+
+        name = parts.path[len('/art/'):]
+        etag = f'"{name}-v1"'
+        if self.headers.get('If-None-Match') == etag or self.headers.get('If-Modified-Since') == LAST_MODIFIED:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        body = name.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), ValidatingHandler)
+    server.daemon_threads = True
+    server.hits = collections.Counter()
+    server.headers = []
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = ArtworkFetcher(timeout=5.0)
+    yield fetcher
+    fetcher.close()
+
+
+def url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_fetch_returns_the_body_and_validators(server, fetcher):
+    result = fetcher.fetch(url(server, "/art/cover"))
+    assert (result.status, result.body, result.notModified) == (200, b"cover", False)
+    assert result.etag == '"cover-v1"'
+    assert result.lastModified == LAST_MODIFIED
+
+
+def test_matching_etag_is_not_modified(server, fetcher):
+    result = fetcher.fetch(url(server, "/art/cover"), etag='"cover-v1"')
+    assert server.headers[-1]['If-None-Match'] == '"cover-v1"'
+    assert (result.status, result.body, result.notModified) == (304, b"", True)
+    assert result.etag == '"cover-v1"'  # The validators passed in come back
+    assert fetcher.stats()['notModified'] == 1
+
+
+def test_matching_last_modified_is_not_modified(server, fetcher):
+    result = fetcher.fetch(url(server, "/art/cover"), lastModified=LAST_MODIFIED)
+    assert server.headers[-1]['If-Modified-Since'] == LAST_MODIFIED
+    assert result.notModified
+    assert result.lastModified == LAST_MODIFIED
+
+
+def test_stale_etag_gets_the_new_body(server, fetcher):
+    result = fetcher.fetch(url(server, "/art/cover"), etag='"cover-v0"')
+    assert (result.status, result.body, result.notModified) == (200, b"cover", False)
+    assert fetcher.stats()['notModified'] == 0
+
+
+def test_unconditional_fetch_sends_no_validators(server, fetcher):
+    fetcher.fetch(url(server, "/art/cover"))
+    assert 'If-None-Match' not in server.headers[-1]
+    assert 'If-Modified-Since' not in server.headers[-1]
+
+
+def test_connection_is_reused_for_the_same_host(server, fetcher):
+    for name in ("one", "two", "three"):
+        assert fetcher.fetch(url(server, f"/art/{name}")).body == name.encode()
+    stats = fetcher.stats()
+    assert stats['connectionsOpened'] == 1
+    assert stats['connectionsReused'] == 2
+    assert stats['requests'] == 3
+
+
+def test_dropped_keep_alive_connection_is_retried_on_a_fresh_one(server, fetcher):
+    assert fetcher.fetch(url(server, "/art/first?drop=1")).body == b"first"
+    assert fetcher.fetch(url(server, "/art/second")).body == b"second"
+    stats = fetcher.stats()
+    assert stats['connectionsReused'] == 1  # Tried the pooled connection first
+    assert stats['connectionsOpened'] == 2  # ...then fell back to a new one
+    assert stats['requests'] == 2
+
+
+def test_fresh_connection_failure_is_raised(fetcher):
+    with pytest.raises(OSError):
+        fetcher.fetch("http://127.0.0.1:9/art/cover")  # Nothing listens on the discard port
+
+
+def test_redirects_are_followed(server, fetcher):
+    result = fetcher.fetch(url(server, "/redirect/3/cover"))
+    assert result.body == b"cover"
+    assert server.hits['/art/cover'] == 1
+    assert fetcher.stats()['requests'] == 4
+    assert fetcher.stats()['connectionsOpened'] == 1  # Same host, one connection
+
+
+def test_too_many_redirects(server, fetcher):
+    with pytest.raises(ArtworkFetchError, match="too many redirects"):
+        fetcher.fetch(url(server, "/redirect/4/cover"))
+    assert server.hits['/art/cover'] == 0
+
+
+def test_error_status_raises(server, fetcher):
+    with pytest.raises(ArtworkFetchError, match="HTTP 404"):
+        fetcher.fetch(url(server, "/missing"))
+
+
+def test_unsupported_url_raises(fetcher):
+    with pytest.raises(ArtworkFetchError, match="unsupported"):
+        fetcher.fetch("file:///tmp/cover.png")
+
+
+def test_bytes_and_time_to_first_byte(server, fetcher):
+    assert fetcher.stats()['averageTimeToFirstByte'] is None
+    fetcher.fetch(url(server, "/art/slow?delay=0.2"))
+    fetcher.fetch(url(server, "/art/quick"))
+    stats = fetcher.stats()
+    assert stats['bytesReceived'] == len(b"slow") + len(b"quick")
+    assert stats['lastTimeToFirstByte'] < 0.2
+    assert stats['averageTimeToFirstByte'] >= 0.1  # Half of the slow one at least
@@ -0,0 +1,150 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from dynamic_island import (POLL_FIELD_SEPARATOR, PLAYER_UNRESPONSIVE, CircuitBreaker, PlayerBackend,
+                            PlayerRegistry, ScriptHost, ScriptHostError, ScriptHostTimeout, parsePollReply)
+
+STAND_IN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'script_host_stand_in.py')
+PLAYING = POLL_FIELD_SEPARATOR.join(["volume=30", "player=fake", "state=playing", "track=Song", "trackId=1"])
+
+
+class HangingBackend(PlayerBackend):
+    """Player on a stand-in script host that can be told to hang, error or break"""
+
+    name = "fake"
+    bundleId = "com.example.fake"
+    capabilities = frozenset({'transport', 'seek', 'volume'})
+    queryTimeout = 0.2
+    commandTimeout = 0.3
+
+    def __init__(self, host):
+        super().__init__(host=host)
+        self.mode = "ok"
+        self.pollDelay = 0.0
+        self.calls = 0
+
+    def probe(self, isInstalled):
+        return True
+
+    def snapshot(self):
+        self.calls += 1
+        if self.mode == "hang":
+            self.host.run("sleep 5", timeout=self.queryTimeout)
+        if self.mode == "error":
+            self.host.run("fail Can't get persistent ID of current track", timeout=self.queryTimeout)
+        if self.mode == "bug":
+            raise RuntimeError("backend bug")
+        return parsePollReply(self.host.run(f"sleep {self.pollDelay} {PLAYING}", timeout=self.queryTimeout))
+
+    def seek(self, seconds):
+        self.host.run("sleep 0.05 sought", timeout=self.commandTimeout)
+
+
+@pytest.fixture
+def host():
+    host = ScriptHost(command=[sys.executable, STAND_IN])
+    yield host
+    host.stop()
+
+
+@pytest.fixture
+def backend(host):
+    return HangingBackend(host)
+
+
+@pytest.fixture
+def registry(backend, clock):
+    registry = PlayerRegistry([backend], breakerFactory=lambda: CircuitBreaker(now=clock))
+    registry.probe(lambda bundleId: True)
+    return registry
+
+
+def breakerState(registry):
+    return registry.breakers["fake"].stats()['state']
+
+
+def trip(registry, backend):
+    backend.mode = "hang"
+    with pytest.raises(ScriptHostTimeout):
+        registry.snapshot()
+    assert registry.snapshot()['state'] == PLAYER_UNRESPONSIVE
+    assert breakerState(registry) == CircuitBreaker.OPEN
+
+
+def test_healthy_player_keeps_the_breaker_closed(registry):
+    for _ in range(3):
+        assert registry.snapshot()['track'] == "Song"
+    assert breakerState(registry) == CircuitBreaker.CLOSED
+
+
+def test_hanging_player_trips_the_breaker(registry, backend):
+    trip(registry, backend)
+    assert registry.breakers["fake"].stats()['trips'] == 1
+
+
+def test_open_breaker_fails_fast_without_asking_the_player(registry, backend, clock):
+    trip(registry, backend)
+    calls = backend.calls
+    started = time.monotonic()
+    for _ in range(5):
+        clock.advance(0.1)
+        assert registry.snapshot()['state'] == PLAYER_UNRESPONSIVE
+    assert time.monotonic() - started < 0.1
+    assert backend.calls == calls
+    assert registry.breakers["fake"].stats()['refused'] == 5
+
+
+def test_half_open_success_closes_the_breaker(registry, backend, clock):
+    trip(registry, backend)
+    backend.mode = "ok"
+    clock.advance(2.5)
+    assert registry.snapshot()['track'] == "Song"
+    assert breakerState(registry) == CircuitBreaker.CLOSED
+
+
+def test_half_open_failure_reopens_with_a_longer_delay(registry, backend, clock):
+    trip(registry, backend)
+    clock.advance(2.5)
+    assert registry.snapshot()['state'] == PLAYER_UNRESPONSIVE  # The trial hung again
+    stats = registry.breakers["fake"].stats()
+    assert stats['state'] == CircuitBreaker.OPEN
+    assert stats['retryIn'] == pytest.approx(4.0)
+
+
+def test_error_replies_do_not_count_as_unresponsive(registry, backend):
+    backend.mode = "error"
+    for _ in range(3):
+        with pytest.raises(ScriptHostError):
+            registry.snapshot()
+    assert breakerState(registry) == CircuitBreaker.CLOSED
+
+
+def test_unexpected_error_during_the_trial_releases_it(registry, backend, clock):
+    trip(registry, backend)
+    backend.mode = "bug"
+    clock.advance(2.5)
+    with pytest.raises(RuntimeError):
+        registry.snapshot()
+    backend.mode = "ok"
+    for later in (20, 100, 1000):
+        clock.time = later
+        assert registry.snapshot()['track'] == "Song"
+    assert breakerState(registry) == CircuitBreaker.CLOSED
+
+
+def test_command_queued_behind_a_healthy_poll_does_not_fail(registry, backend):
+    backend.queryTimeout = 1.5
+    backend.pollDelay = 0.4
+    results = {}
+    poll = threading.Thread(target=lambda: results.setdefault('poll', registry.snapshot()))
+    poll.start()
+    time.sleep(0.05)
+    registry.activate("fake")
+    assert registry.command('seek', 10.0)  # Waits behind the poll, but its deadline starts with it
+    poll.join()
+    assert results['poll']['track'] == "Song"
+    assert breakerState(registry) == CircuitBreaker.CLOSED
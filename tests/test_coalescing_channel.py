@@ -0,0 +1,83 @@
+import pytest
+
+from dynamic_island import CoalescingChannel, Runtime
+
+
+@pytest.fixture
+def runtime(clock):
+    return Runtime(now=clock)
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def channel(clock, runtime, sent):
+    return CoalescingChannel(sent.append, rate=10, now=clock, schedule=runtime.callLater, name="test")
+
+
+def test_first_value_goes_out_right_away(channel, runtime, sent):
+    channel.push(5)
+    runtime.runPending()
+    assert sent == [5]
+
+
+def test_drag_is_rate_limited_and_the_release_value_always_sent(channel, runtime, clock, sent):
+    # A 100 Hz drag for one second, released at 99
+    for value in range(100):
+        channel.push(value)
+        runtime.runPending()
+        clock.advance(0.01)
+    for _ in range(20):
+        runtime.runPending()
+        clock.advance(0.01)
+
+    assert sent[-1] == 99
+    assert len(sent) <= 11  # 10 per second plus the leading edge
+    assert sent == sorted(sent)  # Nothing stale goes out after a newer value
+    stats = channel.stats()
+    assert stats['pushed'] == 100
+    assert stats['sent'] == len(sent)
+    assert stats['superseded'] == 100 - len(sent)
+    assert not stats['pending']
+
+
+def test_value_pushed_between_sends_waits_for_the_slot(channel, runtime, clock, sent):
+    channel.push(1)
+    runtime.runPending()
+    clock.advance(0.03)
+    channel.push(2)
+    runtime.runPending()
+    assert sent == [1]  # Only 30 ms since the last send
+    clock.advance(0.07)
+    runtime.runPending()
+    assert sent == [1, 2]
+
+
+def test_push_after_a_quiet_period_is_sent_immediately(channel, runtime, clock, sent):
+    channel.push(1)
+    runtime.runPending()
+    clock.advance(5.0)
+    channel.push(2)
+    runtime.runPending()
+    assert sent == [1, 2]
+
+
+def test_failed_send_is_counted_and_the_channel_keeps_going(clock, runtime):
+    sent = []
+
+    def send(value):
+        if value == "bad":
+            raise RuntimeError("player gone")
+        sent.append(value)
+
+    channel = CoalescingChannel(send, rate=10, now=clock, schedule=runtime.callLater, name="test")
+    channel.push("bad")
+    runtime.runPending()
+    clock.advance(0.2)
+    channel.push("good")
+    runtime.runPending()
+    assert sent == ["good"]
+    assert channel.stats()['failed'] == 1
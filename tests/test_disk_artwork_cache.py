@@ -0,0 +1,117 @@
+import json
+import os
+
+import pytest
+
+from dynamic_island import DiskArtworkCache
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "artwork")
+
+
+@pytest.fixture
+def cache(directory, clock):
+    clock.time = 1000.0
+    return DiskArtworkCache(directory, maxBytes=100, ttl=30 * DAY, now=clock)
+
+
+def test_put_and_get(cache):
+    assert cache.put("https://example.com/a.jpg", b"image a")
+    assert cache.get("https://example.com/a.jpg") == b"image a"
+    assert cache.get("https://example.com/missing.jpg") is None
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (1, 1)
+
+
+def test_least_recently_used_is_evicted_under_the_cap(cache, clock):
+    for name in "abc":
+        cache.put(name, name.encode() * 40)
+        clock.advance(1)
+    # Three 40-byte entries against a 100-byte cap: "a" went when "c" arrived
+    assert cache.get("a") is None
+    assert cache.stats()['bytes'] == 80
+
+    clock.advance(1)
+    cache.get("b")  # "b" is now more recent than "c"
+    clock.advance(1)
+    cache.put("d", b"d" * 40)
+    assert cache.get("c") is None
+    assert cache.get("b") is not None
+    assert cache.stats()['evictions'] == 2
+
+
+def test_oversized_data_is_not_stored(cache):
+    assert not cache.put("huge", b"x" * 101)
+    assert cache.get("huge") is None
+
+
+def test_entry_expires_after_the_ttl(cache, clock):
+    cache.put("plain", b"bytes")
+    clock.advance(31 * DAY)
+    assert cache.get("plain") is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_entry_with_validators_is_kept_for_revalidation(cache, clock):
+    cache.put("validated", b"bytes", etag='"v1"', lastModified="Mon, 01 Jan 2024 00:00:00 GMT")
+    clock.advance(31 * DAY)
+    assert cache.get("validated") is None  # Stale - the caller must revalidate
+    assert cache.validatorsFor("validated") == ('"v1"', "Mon, 01 Jan 2024 00:00:00 GMT")
+
+    assert cache.revalidated("validated") == b"bytes"  # 304 - fresh TTL from now
+    assert cache.get("validated") == b"bytes"
+
+
+def test_entry_with_validators_goes_after_two_ttls(cache, clock):
+    cache.put("validated", b"bytes", etag='"v1"')
+    clock.advance(61 * DAY)
+    assert cache.get("validated") is None
+    assert cache.validatorsFor("validated") == (None, None)
+
+
+def test_revalidated_unknown_key(cache):
+    assert cache.revalidated("never stored") is None
+
+
+def test_metadata_round_trips_without_none_values(cache):
+    cache.put("a", b"bytes", etag='"v1"', lastModified=None, palette={'accent': [1, 0, 0]})
+    assert cache.metadataFor("a") == {'etag': '"v1"', 'palette': {'accent': [1, 0, 0]}}
+
+
+def test_index_is_reloaded_by_a_new_instance(cache, directory, clock):
+    cache.put("a", b"image a", etag='"v1"')
+    cache.setLastKey("a")
+
+    reopened = DiskArtworkCache(directory, maxBytes=100, ttl=30 * DAY, now=clock)
+    assert reopened.get("a") == b"image a"
+    assert reopened.validatorsFor("a") == ('"v1"', None)
+    assert reopened.lastEntry() == ("a", b"image a")
+
+
+def test_damaged_index_is_rebuilt_from_the_files(cache, directory, clock):
+    cache.put("a", b"image a")
+    cache.put("b", b"image b")
+    with open(os.path.join(directory, DiskArtworkCache.INDEX_NAME), 'w') as f:
+        f.write('{"entries": ')  # Cut off mid-write
+
+    rebuilt = DiskArtworkCache(directory, maxBytes=100, ttl=30 * DAY, now=clock)
+    assert rebuilt.get("a") == b"image a"
+    assert rebuilt.get("b") == b"image b"
+    assert rebuilt.stats()['bytes'] == 14
+
+
+def test_vanished_file_is_forgotten(cache, directory):
+    cache.put("a", b"image a")
+    os.unlink(os.path.join(directory, cache.nameFor("a")))
+    assert cache.get("a") is None
+    with open(os.path.join(directory, DiskArtworkCache.INDEX_NAME)) as f:
+        assert json.load(f)['entries'] == {}
+
+
+def test_last_entry_without_artwork(cache, directory, clock):
+    assert cache.lastEntry() == (None, None)
+    cache.setLastKey("gone")
+    assert DiskArtworkCache(directory, now=clock).lastEntry() == (None, None)
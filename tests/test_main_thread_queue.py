@@ -0,0 +1,34 @@
+from dynamic_island import MainThreadQueue
+
+
+def test_burst_costs_one_hop_posted_straight_to_the_main_thread():
+    posted = []
+    queue = MainThreadQueue(post=posted.append)
+    applied = []
+    for value in range(5):
+        queue.submit('progress', applied.append, value)
+    queue.submit('dateTime', applied.append, "date")
+
+    assert posted == [queue.drain]  # No detour through the runtime
+    posted.pop()()
+    assert applied == [4, "date"]
+    assert queue.stats() == {'submitted': 6, 'replaced': 4, 'applied': 2, 'hops': 1, 'pending': 0}
+
+
+def test_submit_after_drain_posts_again():
+    posted = []
+    queue = MainThreadQueue(post=posted.append)
+    queue.submit('a', lambda: None)
+    posted.pop()()
+    queue.submit('a', lambda: None)
+    assert len(posted) == 1
+
+
+def test_failing_mutation_does_not_stop_the_batch():
+    posted = []
+    queue = MainThreadQueue(post=posted.append)
+    applied = []
+    queue.submit('broken', lambda: 1 / 0)
+    queue.submit('fine', applied.append, "ok")
+    posted.pop()()
+    assert applied == ["ok"]
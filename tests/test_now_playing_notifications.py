@@ -0,0 +1,145 @@
+import pytest
+
+from dynamic_island import (NOTIFICATIONS_FRESH_FOR, POLL_DEFAULTS, NowPlayingNotificationSource, PlayerBackend,
+                            PlayerRegistry, parsePlayerNotification)
+
+SPOTIFY = "com.spotify.client.PlaybackStateChanged"
+MUSIC = "com.apple.Music.playerInfo"
+
+
+class FakeEmitter:
+    """Stands in for NSDistributedNotificationCenter"""
+
+    def __init__(self):
+        self.handlers = {}
+
+    def addObserverForName_handler_(self, name, handler):
+        self.handlers[name] = handler
+
+    def removeObservers(self):
+        self.handlers.clear()
+
+    def post(self, name, userInfo):
+        if name in self.handlers:
+            self.handlers[name](name, userInfo)
+
+
+def spotifyPayload(state="Playing", name="Song", trackId="spotify:track:1", position=None):
+    payload = {"Player State": state, "Name": name, "Artist": "Band", "Track ID": trackId, "Duration": 200000}
+    if position is not None:
+        payload["Playback Position"] = position
+    return payload
+
+
+@pytest.fixture
+def emitter():
+    return FakeEmitter()
+
+
+@pytest.fixture
+def source(emitter, clock):
+    return NowPlayingNotificationSource(emitter, now=clock)
+
+
+@pytest.fixture
+def received(source):
+    received = []
+    source.start(received.append)
+    return received
+
+
+def test_parse_spotify_payload():
+    info = parsePlayerNotification(SPOTIFY, spotifyPayload(position=12.5))
+    assert (info['player'], info['state'], info['track'], info['artist']) == ("spotify", "playing", "Song", "Band")
+    assert info['duration'] == 200.0
+    assert info['position'] == 12.5
+
+
+def test_parse_stopped_music_payload():
+    info = parsePlayerNotification(MUSIC, {"Player State": "Stopped"})
+    assert info['player'] == "music"
+    assert info['state'] == "stopped"
+    assert info['track'] == ""
+
+
+def test_notifications_reach_the_listener(emitter, source, received):
+    emitter.post(SPOTIFY, spotifyPayload(position=3.0))
+    assert [info['track'] for info in received] == ["Song"]
+    assert source.eventCount == 1
+
+
+def test_missing_position_keeps_the_last_one_for_the_same_track(emitter, received):
+    emitter.post(SPOTIFY, spotifyPayload(position=42.0))
+    emitter.post(SPOTIFY, spotifyPayload(state="Paused"))
+    assert received[-1]['position'] == 42.0
+
+
+def test_missing_position_on_a_new_track_starts_at_zero(emitter, received):
+    emitter.post(SPOTIFY, spotifyPayload(position=42.0))
+    emitter.post(SPOTIFY, spotifyPayload(name="Next", trackId="spotify:track:2"))
+    assert received[-1]['position'] == 0.0
+
+
+def test_volume_and_artwork_come_from_the_last_poll(emitter, source, received):
+    polled = dict(POLL_DEFAULTS, player="spotify", state="playing", track="Song", trackId="spotify:track:1",
+                  volume=35, artwork="https://example.com/cover.jpg")
+    source.update(polled)
+    emitter.post(SPOTIFY, spotifyPayload(state="Paused"))
+    assert received[-1]['volume'] == 35
+    assert received[-1]['artwork'] == "https://example.com/cover.jpg"
+
+    # A new track keeps the volume but not the old cover
+    emitter.post(SPOTIFY, spotifyPayload(name="Next", trackId="spotify:track:2"))
+    assert received[-1]['volume'] == 35
+    assert received[-1]['artwork'] == ""
+
+
+def test_is_active_only_while_notifications_are_recent(emitter, source, received, clock):
+    assert not source.isActive()  # Subscribed, but nothing arrived yet
+    emitter.post(SPOTIFY, spotifyPayload())
+    assert source.isActive()
+    clock.advance(NOTIFICATIONS_FRESH_FOR)
+    assert source.isActive()
+    clock.advance(1.0)
+    assert not source.isActive()
+
+
+def test_stop_unsubscribes(emitter, source, received):
+    source.stop()
+    emitter.post(SPOTIFY, spotifyPayload())
+    assert received == []
+    assert emitter.handlers == {}
+
+
+class NamedBackend(PlayerBackend):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+
+    def probe(self, isInstalled):
+        return True
+
+
+@pytest.fixture
+def registry():
+    registry = PlayerRegistry([NamedBackend("spotify"), NamedBackend("music")])
+    registry.probe(lambda bundleId: True)
+    return registry
+
+
+def test_other_player_stopping_does_not_take_over(registry):
+    registry.activate("spotify")
+    assert not registry.notified(parsePlayerNotification(MUSIC, {"Player State": "Stopped"}))
+    assert registry.active.name == "spotify"
+
+
+def test_other_player_starting_takes_over(registry):
+    registry.activate("spotify")
+    assert registry.notified(parsePlayerNotification(MUSIC, {"Player State": "Playing", "Name": "Tune"}))
+    assert registry.active.name == "music"
+
+
+def test_active_player_pausing_is_followed(registry):
+    registry.activate("spotify")
+    assert registry.notified(parsePlayerNotification(SPOTIFY, spotifyPayload(state="Paused")))
+    assert registry.active.name == "spotify"
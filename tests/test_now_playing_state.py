@@ -0,0 +1,47 @@
+from dynamic_island import (IDLE_NOW_PLAYING, PLAYER_UNRESPONSIVE, POLL_DEFAULTS, NowPlayingState,
+                            diffNowPlaying)
+
+
+def pollInfo(**fields):
+    info = dict(POLL_DEFAULTS)
+    info.update(fields)
+    return info
+
+
+PLAYING = pollInfo(player="spotify", state="playing", track="Song", artist="Band", trackId="spotify:track:1",
+                   position=12.0, duration=200.0, volume=40, artwork="https://example.com/cover.jpg")
+
+
+def test_from_poll_info_maps_every_field():
+    state = NowPlayingState.fromPollInfo(PLAYING)
+    assert state == NowPlayingState(trackId="spotify:track:1", title="Song", artist="Band", state="playing",
+                                    position=12.0, duration=200.0, volume=40,
+                                    artworkKey="https://example.com/cover.jpg")
+    assert state.isPlaying
+
+
+def test_track_name_stands_in_for_a_missing_track_id():
+    assert NowPlayingState.fromPollInfo(dict(PLAYING, trackId="")).trackId == "Song"
+
+
+def test_nothing_playing_maps_to_idle_keeping_the_volume():
+    state = NowPlayingState.fromPollInfo(pollInfo(volume=25))
+    assert state == IDLE_NOW_PLAYING._replace(volume=25)
+    assert not state.isPlaying
+
+
+def test_unresponsive_player_keeps_its_state():
+    state = NowPlayingState.fromPollInfo(pollInfo(player="spotify", state=PLAYER_UNRESPONSIVE))
+    assert state.state == PLAYER_UNRESPONSIVE
+    assert state.title == ""
+
+
+def test_diff_against_none_is_every_field():
+    state = NowPlayingState.fromPollInfo(PLAYING)
+    assert diffNowPlaying(None, state) == state._asdict()
+
+
+def test_diff_reports_only_changed_fields():
+    old = NowPlayingState.fromPollInfo(PLAYING)
+    assert diffNowPlaying(old, old._replace(position=15.0)) == {'position': 15.0}
+    assert diffNowPlaying(old, old) == {}
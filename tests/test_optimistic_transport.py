@@ -0,0 +1,97 @@
+import pytest
+
+from dynamic_island import NowPlayingState, OptimisticTransport
+
+PLAYING = NowPlayingState(trackId="spotify:track:1", title="Song", artist="Band", state="playing", position=30.0,
+                          duration=200.0, volume=40, artworkKey="")
+
+
+@pytest.fixture
+def transport(clock):
+    transport = OptimisticTransport(now=clock, grace=3.0)
+    transport.reconcile(PLAYING)
+    return transport
+
+
+def test_toggle_is_shown_before_the_player_answers(transport):
+    shown = transport.predict('playPause')
+    assert shown.state == "paused"
+    assert transport.shown == shown
+    assert transport.stats()['pending'] == 1
+
+
+def test_older_poll_does_not_undo_the_prediction(transport, clock):
+    transport.predict('playPause')
+    clock.advance(1.0)
+    assert transport.reconcile(PLAYING).state == "paused"  # Poll sent before the command landed
+    assert transport.stats()['pending'] == 1
+
+
+def test_matching_poll_confirms(transport, clock):
+    transport.predict('playPause')
+    clock.advance(0.5)
+    shown = transport.reconcile(PLAYING._replace(state="paused", position=30.5))
+    assert shown == PLAYING._replace(state="paused", position=30.5)
+    stats = transport.stats()
+    assert (stats['confirmed'], stats['pending']) == (1, 0)
+
+
+def test_poll_wins_after_the_grace_window(transport, clock):
+    transport.predict('playPause')
+    clock.advance(3.1)
+    assert transport.reconcile(PLAYING).state == "playing"
+    stats = transport.stats()
+    assert (stats['overruled'], stats['pending']) == (1, 0)
+
+
+def test_failed_command_rolls_back_to_the_last_poll(transport):
+    transport.predict('setVolume', 80)
+    assert transport.shown.volume == 80
+    assert transport.fail('setVolume') == PLAYING
+    assert transport.shown == PLAYING
+    stats = transport.stats()
+    assert (stats['rolledBack'], stats['pending']) == (1, 0)
+
+
+def test_failure_of_a_command_with_nothing_pending_changes_nothing(transport):
+    transport.predict('setVolume', 80)
+    assert transport.fail('playPause') is None
+    assert transport.shown.volume == 80
+
+
+def test_failure_keeps_other_predictions(transport):
+    transport.predict('playPause')
+    transport.predict('setVolume', 80)
+    shown = transport.fail('setVolume')
+    assert (shown.state, shown.volume) == ("paused", 40)
+
+
+def test_seek_overlay_extrapolates_while_playing(transport, clock):
+    assert transport.predict('seek', 100.0).position == 100.0
+    clock.advance(1.0)
+    # A poll from before the seek arrived: the overlay keeps moving from the target
+    assert transport.reconcile(PLAYING._replace(position=31.0)).position == pytest.approx(101.0)
+    clock.advance(0.5)
+    assert transport.reconcile(PLAYING._replace(position=101.0)).position == 101.0  # Within tolerance
+    assert transport.stats()['confirmed'] == 1
+
+
+def test_seek_overlay_holds_still_while_paused(transport, clock):
+    transport.reconcile(PLAYING._replace(state="paused"))
+    transport.predict('seek', 100.0)
+    clock.advance(2.0)
+    assert transport.reconcile(PLAYING._replace(state="paused")).position == 100.0
+
+
+def test_track_change_restarts_the_position_until_the_new_track_shows_up(transport, clock):
+    assert transport.predict('nextTrack').position == 0.0
+    clock.advance(0.5)
+    assert transport.reconcile(PLAYING._replace(position=31.0)).position == 0.0
+    shown = transport.reconcile(PLAYING._replace(trackId="spotify:track:2", title="Next", position=1.0))
+    assert (shown.title, shown.position) == ("Next", 1.0)
+    assert transport.stats()['pending'] == 0
+
+
+def test_unknown_command_is_not_predicted(transport):
+    assert transport.predict('shuffle') is None
+    assert transport.stats()['predicted'] == 0
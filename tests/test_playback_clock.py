@@ -0,0 +1,75 @@
+import pytest
+
+from dynamic_island import PlaybackClock
+
+
+@pytest.fixture
+def playback(clock):
+    return PlaybackClock(now=clock, threshold=1.5)
+
+
+def test_position_is_zero_before_any_sample(playback):
+    assert playback.position() == 0.0
+    assert playback.fraction() == 0.0
+    assert not playback.isRunning()
+
+
+def test_extrapolates_between_samples(playback, clock):
+    playback.sample(10.0, rate=1.0, duration=200.0, trackId="a")
+    clock.advance(2.5)
+    assert playback.position() == pytest.approx(12.5)
+    assert playback.fraction() == pytest.approx(12.5 / 200.0)
+    assert playback.isRunning()
+
+
+def test_paused_clock_stands_still(playback, clock):
+    playback.sample(42.0, rate=0.0, duration=200.0, trackId="a")
+    clock.advance(30.0)
+    assert playback.position() == 42.0
+    assert not playback.isRunning()
+
+
+def test_position_is_clamped_to_duration(playback, clock):
+    playback.sample(195.0, rate=1.0, duration=200.0, trackId="a")
+    clock.advance(60.0)
+    assert playback.position() == 200.0
+    assert playback.fraction() == 1.0
+
+
+def test_small_disagreement_keeps_the_anchor(playback, clock):
+    playback.sample(10.0, rate=1.0, duration=200.0, trackId="a")
+    clock.advance(5.0)
+    # The poll lags a little behind the extrapolation - no backwards jitter
+    assert not playback.sample(14.2, rate=1.0, trackId="a")
+    assert playback.position() == pytest.approx(15.0)
+    assert playback.corrections == 0
+
+
+def test_large_disagreement_is_taken_as_a_seek(playback, clock):
+    playback.sample(10.0, rate=1.0, duration=200.0, trackId="a")
+    clock.advance(5.0)
+    assert playback.sample(120.0, rate=1.0, trackId="a")
+    assert playback.position() == pytest.approx(120.0)
+    clock.advance(1.0)
+    assert playback.position() == pytest.approx(121.0)
+    assert playback.corrections == 1
+
+
+def test_rate_change_re_anchors(playback, clock):
+    playback.sample(10.0, rate=1.0, duration=200.0, trackId="a")
+    clock.advance(5.0)
+    # Paused close to the extrapolated position - still taken, the rate changed
+    assert playback.sample(15.2, rate=0.0, trackId="a")
+    clock.advance(10.0)
+    assert playback.position() == pytest.approx(15.2)
+    assert playback.corrections == 0
+
+
+def test_track_change_re_anchors(playback, clock):
+    playback.sample(10.0, rate=1.0, duration=200.0, trackId="a")
+    clock.advance(1.0)
+    assert playback.sample(11.0, rate=1.0, duration=90.0, trackId="b")
+    assert playback.trackId == "b"
+    assert playback.duration == 90.0
+    clock.advance(100.0)
+    assert playback.position() == 90.0
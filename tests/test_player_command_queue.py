@@ -0,0 +1,162 @@
+import threading
+import time
+
+import pytest
+
+from dynamic_island import PlayerCommandQueue
+
+
+def waitFor(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+class GatedPlayer:
+    """execute() stand-in that holds the first command until the gate opens"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.busy = threading.Event()
+        self.executed = []
+        self.failing = set()
+
+    def execute(self, target, name, args):
+        if not self.busy.is_set():
+            self.busy.set()
+            self.gate.wait(5.0)
+        if name in self.failing:
+            raise RuntimeError(f"{name} refused")
+        self.executed.append((name,) + tuple(args))
+
+
+@pytest.fixture
+def player():
+    player = GatedPlayer()
+    yield player
+    player.gate.set()
+
+
+@pytest.fixture
+def failures():
+    return []
+
+
+@pytest.fixture
+def commands(player, clock, failures):
+    return PlayerCommandQueue(player.execute, now=clock, onFailure=lambda command, error: failures.append(
+        (command.name, error)), log=lambda message: None)
+
+
+def hold(commands, player):
+    """Submit a command that keeps the worker busy so later ones stay queued"""
+    commands.submit("spotify", 'seek', 0.0)
+    assert player.busy.wait(2.0)
+
+
+def settled(stats):
+    """True once every issued command ran, failed, expired or was merged away"""
+    return stats['executed'] + stats['failed'] + stats['expired'] + stats['merged'] == stats['issued']
+
+
+def finish(commands, player):
+    player.gate.set()
+    assert waitFor(lambda: settled(commands.stats()))
+    return commands.stats()
+
+
+def test_commands_run_in_the_order_issued(commands, player):
+    hold(commands, player)
+    commands.submit("spotify", 'nextTrack')
+    commands.submit("spotify", 'setVolume', 30)
+    commands.submit("spotify", 'playPause')
+    finish(commands, player)
+    assert player.executed == [('seek', 0.0), ('nextTrack',), ('setVolume', 30), ('playPause',)]
+
+
+def test_two_toggles_cancel_out(commands, player):
+    hold(commands, player)
+    commands.submit("spotify", 'playPause')
+    commands.submit("spotify", 'playPause')
+    assert commands.pendingCount() == 0
+    stats = finish(commands, player)
+    assert player.executed == [('seek', 0.0)]
+    assert (stats['issued'], stats['executed'], stats['merged']) == (3, 1, 2)
+
+
+def test_toggles_cancel_across_a_volume_change(commands, player):
+    hold(commands, player)
+    commands.submit("spotify", 'playPause')
+    commands.submit("spotify", 'setVolume', 30)
+    commands.submit("spotify", 'playPause')
+    finish(commands, player)
+    assert player.executed == [('seek', 0.0), ('setVolume', 30)]
+
+
+def test_toggles_around_a_track_change_are_kept(commands, player):
+    hold(commands, player)
+    commands.submit("spotify", 'playPause')
+    commands.submit("spotify", 'nextTrack')
+    commands.submit("spotify", 'playPause')
+    finish(commands, player)
+    assert player.executed == [('seek', 0.0), ('playPause',), ('nextTrack',), ('playPause',)]
+
+
+def test_third_toggle_survives(commands, player):
+    hold(commands, player)
+    for _ in range(3):
+        commands.submit("spotify", 'playPause')
+    finish(commands, player)
+    assert player.executed == [('seek', 0.0), ('playPause',)]
+
+
+def test_volume_change_replaces_every_queued_one(commands, player):
+    hold(commands, player)
+    commands.submit("spotify", 'setVolume', 10)
+    commands.submit("spotify", 'nextTrack')
+    commands.submit("spotify", 'setVolume', 20)
+    stats = finish(commands, player)
+    assert player.executed == [('seek', 0.0), ('nextTrack',), ('setVolume', 20)]
+    assert stats['merged'] == 1
+
+
+def test_seek_replaces_only_a_seek_right_before_it(commands, player):
+    hold(commands, player)
+    commands.submit("spotify", 'seek', 10.0)
+    commands.submit("spotify", 'seek', 20.0)
+    commands.submit("spotify", 'nextTrack')
+    commands.submit("spotify", 'seek', 5.0)
+    finish(commands, player)
+    assert player.executed == [('seek', 0.0), ('seek', 20.0), ('nextTrack',), ('seek', 5.0)]
+
+
+def test_command_that_waited_too_long_is_dropped(commands, player, clock, failures):
+    hold(commands, player)
+    commands.submit("spotify", 'nextTrack')
+    clock.advance(PlayerCommandQueue.TIMEOUTS['nextTrack'] + 0.1)
+    commands.submit("spotify", 'setVolume', 30)  # Issued just now, still in time
+    stats = finish(commands, player)
+    assert player.executed == [('seek', 0.0), ('setVolume', 30)]
+    assert stats['expired'] == 1
+    assert [(name, type(error)) for name, error in failures] == [('nextTrack', TimeoutError)]
+
+
+def test_failed_command_reaches_on_failure_and_the_queue_keeps_going(commands, player, failures):
+    player.failing.add('nextTrack')
+    hold(commands, player)
+    commands.submit("spotify", 'nextTrack')
+    commands.submit("spotify", 'playPause')
+    stats = finish(commands, player)
+    assert player.executed == [('seek', 0.0), ('playPause',)]
+    assert (stats['issued'], stats['executed'], stats['failed']) == (3, 2, 1)
+    assert [(name, str(error)) for name, error in failures] == [('nextTrack', "nextTrack refused")]
+
+
+def test_each_player_has_its_own_queue(commands, player):
+    hold(commands, player)  # Holds only the spotify worker
+    commands.submit("music", 'nextTrack')
+    assert waitFor(lambda: ('nextTrack',) in player.executed)
+    finish(commands, player)
@@ -0,0 +1,150 @@
+import pytest
+
+from dynamic_island import POLL_DEFAULTS, PlayerBackend, PlayerRegistry
+
+
+class FakeBackend(PlayerBackend):
+    """In-memory player: snapshot() returns whatever `playing` says"""
+
+    def __init__(self, name, capabilities=('transport', 'seek', 'volume'), installed=True, tracker=None):
+        super().__init__(tracker=tracker)
+        self.name = name
+        self.bundleId = f"com.example.{name}"
+        self.capabilities = frozenset(capabilities)
+        self.installed = installed
+        self.playing = None  # Track name, or None when nothing plays
+        self.snapshots = 0
+        self.commands = []
+
+    def probe(self, isInstalled):
+        return self.installed
+
+    def snapshot(self):
+        self.snapshots += 1
+        info = dict(POLL_DEFAULTS)
+        if self.playing:
+            info.update(player=self.name, state="playing", track=self.playing, trackId=self.playing)
+        return info
+
+    def playPause(self):
+        self.commands.append(('playPause',))
+
+    def seek(self, seconds):
+        self.commands.append(('seek', seconds))
+
+    def setVolume(self, volume):
+        self.commands.append(('setVolume', volume))
+
+
+class FakeTracker:
+    def __init__(self, running=()):
+        self.running = set(running)
+
+    def isRunning(self, bundleId):
+        return bundleId in self.running
+
+
+@pytest.fixture
+def backends():
+    return [FakeBackend("spotify"), FakeBackend("music"), FakeBackend("radio", capabilities=())]
+
+
+@pytest.fixture
+def registry(backends):
+    registry = PlayerRegistry(backends)
+    registry.probe(lambda bundleId: True)
+    return registry
+
+
+def test_probe_keeps_usable_backends_only():
+    broken = FakeBackend("broken")
+    broken.probe = lambda isInstalled: 1 / 0
+    registry = PlayerRegistry([FakeBackend("spotify"), FakeBackend("gone", installed=False), broken])
+    assert [backend.name for backend in registry.probe(lambda bundleId: True)] == ["spotify"]
+
+
+def test_snapshot_without_players_is_idle():
+    registry = PlayerRegistry([FakeBackend("gone", installed=False)])
+    registry.probe(lambda bundleId: True)
+    assert registry.snapshot() == POLL_DEFAULTS
+
+
+def test_idle_ticks_rotate_through_backends_one_query_each(registry, backends):
+    for _ in range(6):
+        assert registry.snapshot()['player'] == "none"
+    assert [backend.snapshots for backend in backends] == [2, 2, 2]
+    assert registry.active is None
+
+
+def test_playing_backend_becomes_the_only_one_queried(registry, backends):
+    spotify, music, radio = backends
+    music.playing = "Song"
+    for _ in range(2):
+        registry.snapshot()
+    assert registry.active is music
+
+    for _ in range(5):
+        assert registry.snapshot()['track'] == "Song"
+    assert (spotify.snapshots, music.snapshots, radio.snapshots) == (1, 6, 0)
+
+
+def test_stopped_player_hands_over_to_the_next_one(registry, backends):
+    spotify, music, radio = backends
+    spotify.playing = "Song"
+    registry.snapshot()
+    assert registry.active is spotify
+    spotify.playing = None
+    registry.snapshot()
+    assert registry.active is None
+    registry.snapshot()
+    assert music.snapshots == 1
+
+
+def test_only_running_players_are_asked():
+    tracker = FakeTracker(running={"com.example.music"})
+    spotify, music = FakeBackend("spotify", tracker=tracker), FakeBackend("music", tracker=tracker)
+    registry = PlayerRegistry([spotify, music])
+    registry.probe(lambda bundleId: True)
+    for _ in range(4):
+        registry.snapshot()
+    assert (spotify.snapshots, music.snapshots) == (0, 4)
+
+
+def test_activate_switches_straight_to_a_player(registry, backends):
+    spotify, music, radio = backends
+    music.playing = "Song"
+    registry.activate("music")
+    assert registry.snapshot()['track'] == "Song"
+    assert spotify.snapshots == 0
+    registry.activate("not installed")
+    assert registry.active is music
+
+
+def test_command_target_filters_on_capabilities(registry, backends):
+    spotify, music, radio = backends
+    assert registry.commandTarget('playPause') is None  # Nothing active
+
+    registry.activate("radio")
+    assert registry.commandTarget('playPause') is None
+    assert registry.commandTarget('seek') is None
+    assert registry.commandTarget('setVolume') is None  # Active but read only
+
+    registry.activate("music")
+    assert registry.commandTarget('playPause') is music
+    assert registry.commandTarget('seek') is music
+
+
+def test_volume_goes_to_any_capable_backend_while_idle(registry, backends):
+    assert registry.commandTarget('setVolume') is backends[0]
+    assert registry.command('setVolume', 40)
+    assert backends[0].commands == [('setVolume', 40)]
+
+
+def test_command_reaches_the_active_backend(registry, backends):
+    spotify, music, radio = backends
+    assert not registry.command('playPause')
+    registry.activate("music")
+    assert registry.command('seek', 12.5)
+    assert registry.command('playPause')
+    assert music.commands == [('seek', 12.5), ('playPause',)]
+    assert spotify.commands == []
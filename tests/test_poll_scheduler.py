@@ -0,0 +1,37 @@
+from dynamic_island import POLL_DEFAULTS, AdaptivePollScheduler
+
+
+def pollInfo(**fields):
+    info = dict(POLL_DEFAULTS)
+    info.update(fields)
+    return info
+
+
+def test_not_running_backs_off_to_the_cap():
+    scheduler = AdaptivePollScheduler(log=lambda message: None)
+    intervals = [scheduler.mediaInterval(None) for _ in range(8)]
+    assert intervals == [2.0, 4.0, 8.0, 16.0, 32.0, 60.0, 60.0, 60.0]
+
+
+def test_long_idle_never_overflows():
+    # 17 hours of polls with no player used to raise OverflowError
+    scheduler = AdaptivePollScheduler(log=lambda message: None)
+    for _ in range(5000):
+        assert scheduler.mediaInterval(None) <= AdaptivePollScheduler.NOT_RUNNING_MAX_INTERVAL
+    assert scheduler.mediaInterval(None) == AdaptivePollScheduler.NOT_RUNNING_MAX_INTERVAL
+
+
+def test_player_showing_up_resets_the_backoff():
+    scheduler = AdaptivePollScheduler(log=lambda message: None)
+    for _ in range(10):
+        scheduler.mediaInterval(None)
+    scheduler.setExpanded(True)
+    assert scheduler.mediaInterval(pollInfo(player="spotify", state="playing", track="x")) == 2.0
+    assert scheduler.mediaInterval(None) == 2.0
+
+
+def test_notifications_stretch_the_idle_poll():
+    scheduler = AdaptivePollScheduler(log=lambda message: None)
+    paused = pollInfo(player="spotify", state="paused", track="x")
+    assert scheduler.mediaInterval(paused) == AdaptivePollScheduler.IDLE_INTERVAL
+    assert scheduler.mediaInterval(paused, notificationsActive=True) == 10.0
@@ -0,0 +1,97 @@
+import pytest
+
+from dynamic_island import (APP_LAUNCHED_NOTIFICATION, APP_TERMINATED_NOTIFICATION, SPOTIFY_POLL_SCRIPT,
+                            SYSTEM_VOLUME_SCRIPT, RunningAppTracker, SpotifyBackend)
+
+
+class FakeAppSource:
+    """Stands in for NSWorkspace: running apps plus launch/terminate notifications"""
+
+    def __init__(self, running=()):
+        self.running = list(running)
+        self.handlers = {}
+
+    def runningBundleIds(self):
+        return list(self.running)
+
+    def addObserverForName_handler_(self, name, handler):
+        self.handlers[name] = handler
+
+    def removeObservers(self):
+        self.handlers.clear()
+
+    def post(self, name, bundleId):
+        if name in self.handlers:
+            self.handlers[name](name, {'bundleId': bundleId})
+
+
+class FakeHost:
+    def __init__(self, reply):
+        self.reply = reply
+        self.scripts = []
+
+    def run(self, script, timeout=None):
+        self.scripts.append(script)
+        return self.reply
+
+
+@pytest.fixture
+def source():
+    return FakeAppSource(running=["com.apple.finder", "com.spotify.client", None])
+
+
+@pytest.fixture
+def changes():
+    return []
+
+
+@pytest.fixture
+def tracker(source, changes):
+    tracker = RunningAppTracker(source, listener=lambda bundleId, running: changes.append((bundleId, running)))
+    tracker.start()
+    return tracker
+
+
+def test_seeded_after_subscribing(tracker, source):
+    assert set(source.handlers) == {APP_LAUNCHED_NOTIFICATION, APP_TERMINATED_NOTIFICATION}
+    assert tracker.isRunning("com.spotify.client")
+    assert tracker.isRunning("com.apple.finder")
+    assert not tracker.isRunning("com.apple.Music")
+
+
+def test_launch_and_terminate_update_the_set(tracker, source, changes):
+    source.post(APP_LAUNCHED_NOTIFICATION, "com.apple.Music")
+    assert tracker.isRunning("com.apple.Music")
+    source.post(APP_TERMINATED_NOTIFICATION, "com.spotify.client")
+    assert not tracker.isRunning("com.spotify.client")
+    assert changes == [("com.apple.Music", True), ("com.spotify.client", False)]
+    assert (tracker.launches, tracker.terminations) == (1, 1)
+
+
+def test_notification_without_bundle_id_is_ignored(tracker, source, changes):
+    source.post(APP_LAUNCHED_NOTIFICATION, None)
+    source.post(APP_TERMINATED_NOTIFICATION, "")
+    assert changes == []
+    assert (tracker.launches, tracker.terminations) == (0, 0)
+
+
+def test_stop_unsubscribes(tracker, source, changes):
+    tracker.stop()
+    source.post(APP_LAUNCHED_NOTIFICATION, "com.apple.Music")
+    assert not tracker.isRunning("com.apple.Music")
+    assert changes == []
+
+
+def test_backend_skips_the_player_query_while_not_running(tracker, source):
+    host = FakeHost("volume=20")
+    backend = SpotifyBackend(host=host, tracker=tracker)
+    source.post(APP_TERMINATED_NOTIFICATION, "com.spotify.client")
+
+    info = backend.snapshot()
+    assert host.scripts == [SYSTEM_VOLUME_SCRIPT]
+    assert info['volume'] == 20
+    assert info['player'] == "none"
+
+    source.post(APP_LAUNCHED_NOTIFICATION, "com.spotify.client")
+    backend.snapshot()
+    assert host.scripts[-1] == SPOTIFY_POLL_SCRIPT
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from dynamic_island import Runtime, WorkerPool
+
+
+def waitFor(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+def test_due_jobs_run_in_order(clock):
+    runtime = Runtime(now=clock)
+    ran = []
+    runtime.callLater(2.0, ran.append, "late")
+    runtime.callLater(1.0, ran.append, "early")
+    runtime.callSoon(ran.append, "soon")
+
+    assert runtime.runPending() == 1
+    clock.time = 1.5
+    runtime.runPending()
+    clock.time = 3.0
+    runtime.runPending()
+    assert ran == ["soon", "early", "late"]
+
+
+def test_cancelled_job_does_not_run(clock):
+    runtime = Runtime(now=clock)
+    ran = []
+    runtime.callLater(1.0, ran.append, "cancelled").cancel()
+    clock.time = 2.0
+    assert runtime.runPending() == 0
+    assert ran == []
+
+
+def test_thread_count_stays_constant_over_10000_ticks(clock):
+    runtime = Runtime(now=clock)
+    workers = WorkerPool(workers=2, name="test")
+    ticks = []
+
+    def tick():
+        # What a poll chain does: hand the blocking part off, re-arm the timer
+        workers.submit(ticks.append, clock.time)
+        runtime.callLater(1.0, tick)
+
+    runtime.callSoon(tick)
+    runtime.runPending()
+    assert waitFor(lambda: workers.stats()['completed'] == 1)
+    threadsBefore = threading.active_count()
+
+    for _ in range(10000):
+        clock.time += 1.0
+        runtime.runPending()
+
+    assert waitFor(lambda: workers.stats()['completed'] == 10001)
+    assert threading.active_count() == threadsBefore
+    assert workers.stats()['threads'] == 2
+    assert len(ticks) == 10001
+
+
+def test_blocking_work_does_not_delay_timers():
+    runtime = Runtime()
+    workers = WorkerPool(workers=1, name="test")
+    runtime.start()
+    try:
+        fired = threading.Event()
+        started = time.monotonic()
+        runtime.callSoon(workers.submit, time.sleep, 0.5)  # A slow poll
+        runtime.callLater(0.05, fired.set)  # A hover delay
+        assert fired.wait(1.0)
+        assert time.monotonic() - started < 0.3
+    finally:
+        runtime.stop()
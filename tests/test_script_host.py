@@ -0,0 +1,96 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from dynamic_island import ScriptHost, ScriptHostError, ScriptHostExited, ScriptHostTimeout
+
+STAND_IN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'script_host_stand_in.py')
+
+
+@pytest.fixture
+def host():
+    host = ScriptHost(command=[sys.executable, STAND_IN], timeout=2.0)
+    yield host
+    host.stop()
+
+
+def runInThread(host, script, timeout, results):
+    def run():
+        try:
+            results[script] = host.run(script, timeout=timeout)
+        except Exception as e:
+            results[script] = e
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_requests_share_one_interpreter(host):
+    for index in range(20):
+        assert host.run(f"echo {index}") == f"echo {index}"
+    assert host.spawnCount == 1
+    assert host.requestCount == 20
+
+
+def test_concurrent_callers_get_their_own_replies(host):
+    results = {}
+    threads = [runInThread(host, f"sleep 0.01 reply-{index}", 2.0, results) for index in range(10)]
+    for thread in threads:
+        thread.join()
+    assert results == {f"sleep 0.01 reply-{index}": f"reply-{index}" for index in range(10)}
+    assert host.spawnCount == 1
+
+
+def test_script_error_is_not_a_host_failure(host):
+    with pytest.raises(ScriptHostError) as error:
+        host.run("fail Can't get persistent ID of current track")
+    assert not isinstance(error.value, (ScriptHostTimeout, ScriptHostExited))
+    assert "persistent ID" in str(error.value)
+    assert host.run("still here") == "still here"
+    assert host.spawnCount == 1
+
+
+def test_exited_interpreter_is_restarted(host):
+    with pytest.raises(ScriptHostExited):
+        host.run("exit")
+    assert host.run("back") == "back"
+    assert host.spawnCount == 2
+
+
+def test_stuck_script_restarts_interpreter(host):
+    with pytest.raises(ScriptHostTimeout):
+        host.run("sleep 5", timeout=0.2)
+    assert host.timeoutCount == 1
+    assert host.run("fresh") == "fresh"
+    assert host.spawnCount == 2
+
+
+def test_deadline_counts_from_when_the_script_starts(host):
+    # A short command queued behind a slower, healthy poll must not time out,
+    # and must not take the poll down with it
+    results = {}
+    poll = runInThread(host, "sleep 0.4 polled", 1.5, results)
+    time.sleep(0.05)
+    command = runInThread(host, "sleep 0.05 commanded", 0.3, results)
+    poll.join()
+    command.join()
+    assert results == {"sleep 0.4 polled": "polled", "sleep 0.05 commanded": "commanded"}
+    assert host.timeoutCount == 0
+    assert host.spawnCount == 1
+
+
+def test_queued_requests_survive_a_stuck_script(host):
+    # Only the stuck caller fails; what was queued behind it runs on a fresh interpreter
+    results = {}
+    stuck = runInThread(host, "sleep 5", 0.3, results)
+    time.sleep(0.05)
+    queued = runInThread(host, "sleep 0.01 queued", 0.3, results)
+    stuck.join()
+    queued.join()
+    assert isinstance(results["sleep 5"], ScriptHostTimeout)
+    assert results["sleep 0.01 queued"] == "queued"
+    assert host.resentCount == 1
+    assert host.spawnCount == 2
@@ -0,0 +1,114 @@
+import os
+import plistlib
+
+import pytest
+
+from dynamic_island import FileChangeWatcher, Runtime, SettingsStore
+
+
+def runNow(function, *args):
+    function(*args)
+
+
+@pytest.fixture
+def runtime(clock):
+    return Runtime(now=clock)
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "settings.plist")
+    writeOutside(path, {'volume': 40, 'theme': "dark"})
+    return path
+
+
+@pytest.fixture
+def changes():
+    return []
+
+
+@pytest.fixture
+def store(path, runtime, changes):
+    store = SettingsStore(path, schedule=runtime.callLater, run=runNow)
+    store.watch(changes.append, watcher=FileChangeWatcher(path, store.reload, interval=1.0,
+                                                           schedule=runtime.callLater, run=runNow,
+                                                           useKqueue=False))
+    return store
+
+
+def writeOutside(path, values):
+    """Another process saving the file: a new file renamed over the old one"""
+    with open(path + ".tmp", 'wb') as f:
+        plistlib.dump(values, f)
+    os.replace(path + ".tmp", path)
+
+
+def tick(runtime, clock, seconds=1.0):
+    clock.advance(seconds)
+    runtime.runPending()
+
+
+def test_loads_the_file_at_start(store):
+    assert store.get('volume') == 40
+    assert store.get('missing', "default") == "default"
+
+
+def test_outside_edit_reports_exactly_the_changed_keys(store, path, runtime, clock, changes):
+    writeOutside(path, {'volume': 40, 'theme': "light", 'hotkey': "F5"})
+    tick(runtime, clock)
+    assert changes == [{'theme', 'hotkey'}]
+    assert store.get('theme') == "light"
+    assert store.stats()['reloads'] == 1
+
+
+def test_removed_key_is_reported(store, path, runtime, clock, changes):
+    writeOutside(path, {'volume': 40})
+    tick(runtime, clock)
+    assert changes == [{'theme'}]
+    assert store.get('theme') is None
+
+
+def test_own_write_is_not_reported(store, runtime, clock, changes):
+    store.set('volume', 70)
+    tick(runtime, clock, SettingsStore.DEBOUNCE)
+    assert store.stats()['writes'] == 1
+    for _ in range(3):
+        tick(runtime, clock)
+    assert changes == []
+    assert store.watcher.changes == 0
+    with open(store.path, 'rb') as f:
+        assert plistlib.load(f)['volume'] == 70
+
+
+def test_half_written_file_keeps_the_old_values(store, path, runtime, clock, changes):
+    data = plistlib.dumps({'volume': 90, 'theme': "light"})
+    with open(path, 'wb') as f:
+        f.write(data[:len(data) // 2])
+    tick(runtime, clock)
+    assert changes == []
+    assert (store.get('volume'), store.get('theme')) == (40, "dark")
+
+    with open(path, 'wb') as f:
+        f.write(data)  # The writer finishes
+    tick(runtime, clock)
+    assert changes == [{'volume', 'theme'}]
+    assert store.get('volume') == 90
+
+
+def test_file_without_a_dictionary_keeps_the_old_values(store, path, runtime, clock, changes):
+    writeOutside(path, ["not", "settings"])
+    tick(runtime, clock)
+    assert changes == []
+    assert store.get('volume') == 40
+
+
+def test_deleted_file_keeps_the_current_values(store, path, runtime, clock, changes):
+    os.unlink(path)
+    tick(runtime, clock)
+    assert changes == []
+    assert store.get('volume') == 40
+
+    writeOutside(path, {'volume': 10, 'theme': "dark"})
+    tick(runtime, clock)
+    assert changes == [{'volume'}]
+